@@ -3,41 +3,80 @@ OAuth authentication for Cloud Control Center
 """
 
 import os
-from authlib.integrations.starlette_client import OAuth
+import threading
 from dotenv import load_dotenv
 
 # Load .env file from project root
 project_root = os.path.join(os.path.dirname(__file__), '..')
 env_path = os.path.join(project_root, '.env')
-print(f"Looking for .env at: {os.path.abspath(env_path)}")
 load_dotenv(env_path)
 
 # Session configuration
 SESSION_SECRET = os.getenv('SESSION_SECRET', 'dev-secret-change-in-production')
 
+# Google's OpenID discovery document
+GOOGLE_METADATA_URL = 'https://accounts.google.com/.well-known/openid-configuration'
+
+# Identity provider to log in with (e.g. the fake IdP from fake_idp.py for offline testing)
+OIDC_METADATA_URL = os.getenv('OIDC_METADATA_URL', GOOGLE_METADATA_URL)
+
+# Fetch the OpenID configuration and keys in the background at start-up
+OIDC_PREFETCH = os.getenv('OIDC_PREFETCH', 'false').lower() in ('1', 'true', 'yes')
+
 # Check if OAuth credentials exist
 client_id = os.getenv('GOOGLE_CLIENT_ID')
 client_secret = os.getenv('GOOGLE_CLIENT_SECRET')
 
 if not client_id or not client_secret:
-    print("WARNING: GOOGLE_CLIENT_ID or GOOGLE_CLIENT_SECRET not found in .env")
-    print(f".env file exists: {os.path.exists(env_path)}")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            print(f".env contents preview: {f.read()[:100]}")
-
-# OAuth configuration
-oauth = OAuth()
-
-oauth.register(
-    name='google',
-    client_id=client_id,
-    client_secret=client_secret,
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile'
-    }
-)
-
-print(f"OAuth configured with Client ID: {client_id}")
+    print(f"⚠️ GOOGLE_CLIENT_ID or GOOGLE_CLIENT_SECRET not set (.env looked for at {os.path.abspath(env_path)})")
+
+_provider = None
+_google = None
+_google_lock = threading.Lock()
+
+
+def get_oidc_provider():
+    """Get the cached OpenID configuration/JWKS of the identity provider, created on first use."""
+    global _provider
+    if _provider is None:
+        with _google_lock:
+            if _provider is None:
+                from oidc import OIDCProvider, make_document_store
+                _provider = OIDCProvider(OIDC_METADATA_URL, store=make_document_store())
+    return _provider
+
+
+def get_google_client():
+    """
+    Get the Google OAuth client, registered on first use.
+
+    authlib (and the HTTP/JOSE stack under it) is only imported here, so
+    a cold start that serves no login never pays for it. The client takes
+    its OpenID metadata and signing keys from get_oidc_provider(), so ID
+    tokens are verified locally against cached keys.
+
+    Example:
+        return await get_google_client().authorize_redirect(request, redirect_uri)
+    """
+    global _google
+    if _google is None:
+        provider = get_oidc_provider()
+        with _google_lock:
+            if _google is None:
+                from authlib.integrations.starlette_client import OAuth
+                from oidc import cached_oauth_app_class
 
+                oauth = OAuth()
+                oauth.register(
+                    name='google',
+                    client_id=client_id,
+                    client_secret=client_secret,
+                    server_metadata_url=OIDC_METADATA_URL,
+                    client_cls=cached_oauth_app_class(provider),
+                    client_kwargs={
+                        'scope': 'openid email profile'
+                    }
+                )
+                _google = oauth.google
+                print(f"✅ OAuth configured with Client ID: {client_id}")
+    return _google
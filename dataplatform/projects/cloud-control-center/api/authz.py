@@ -0,0 +1,209 @@
+"""
+Authorization dependencies for Cloud Control Center.
+Resolves the caller's session user and Cloud Control Center role once per
+request, from a short-lived role cache instead of an IAM lookup.
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable, Tuple, Callable
+
+from fastapi import Request, Depends
+from starlette.requests import HTTPConnection
+from starlette.concurrency import run_in_threadpool
+
+from reusables.python.gcp import get_user_role_level, get_project_iam_policy, gcloud_deadline
+from metrics import count_cache_lookup, IAM_LOOKUP_DURATION
+
+
+# Seconds a resolved role is trusted before IAM is consulted again. The
+# cache is per process: invalidate_roles() only clears this instance, so on
+# a multi-instance deployment other instances keep serving a changed or
+# revoked role for up to this long (lower it, or use 0 to disable caching)
+AUTHZ_CACHE_TTL = float(os.getenv('AUTHZ_CACHE_TTL', '60'))
+
+# Seconds a request waits for an IAM policy read, retries included
+AUTHZ_IAM_DEADLINE = float(os.getenv('AUTHZ_IAM_DEADLINE', '15'))
+
+ROLE_LEVELS = {'none': 0, 'viewer': 1, 'operator': 2, 'admin': 3}
+
+
+class AuthError(Exception):
+    """Authentication/authorization failure, rendered as {"error": message}."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class RoleCache:
+    """
+    Thread-safe TTL cache of (project_id, email) -> role level.
+
+    Usage:
+        role_cache.set('my-project', 'a@example.com', 'admin')
+        role_cache.get('my-project', 'a@example.com')  # 'admin' until the TTL expires
+        role_cache.invalidate('my-project', ['a@example.com'])
+    """
+
+    def __init__(self, ttl: float = AUTHZ_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        # Bumped on invalidation so lookups that started earlier don't store stale roles
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, project_id: str, email: str) -> Optional[str]:
+        key = (project_id, email.lower())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[0]
+
+    def set(self, project_id: str, email: str, role: str, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[(project_id, email.lower())] = (role, time.monotonic() + self.ttl)
+
+    def invalidate(self, project_id: Optional[str] = None, emails: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop cached roles.
+
+        Args:
+            project_id: Only this project (default: all)
+            emails: Only these users (default: everyone in scope)
+        """
+        wanted = {e.lower() for e in emails} if emails is not None else None
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                if project_id is not None and key[0] != project_id:
+                    continue
+                if wanted is not None and key[1] not in wanted:
+                    continue
+                del self._entries[key]
+
+
+role_cache = RoleCache()
+
+
+def read_policy(project_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a project's IAM policy on a request path, within AUTHZ_IAM_DEADLINE.
+
+    Returns:
+        Policy dictionary, or None if it couldn't be read in time
+    """
+    with gcloud_deadline(AUTHZ_IAM_DEADLINE):
+        return get_project_iam_policy(project_id)
+
+
+def get_role(email: str, project_id: str, policy: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Get a user's Cloud Control Center role level, cached for AUTHZ_CACHE_TTL.
+
+    Only roles resolved from a policy that was actually read are cached: if
+    the IAM policy can't be read (throttled, unavailable), the request gets
+    'none' and the next one tries again.
+
+    Args:
+        email: User email
+        project_id: GCP project ID
+        policy: IAM policy already fetched for this request, used on a cache miss
+
+    Returns:
+        'admin', 'operator', 'viewer', or 'none' (no access to the project)
+    """
+    role = role_cache.get(project_id, email)
+    count_cache_lookup('role', role is not None)
+    if role is None:
+        generation = role_cache.generation
+        started = time.perf_counter()
+        if policy is None:
+            policy = read_policy(project_id)
+        IAM_LOOKUP_DURATION.observe(time.perf_counter() - started)
+        if policy is None:
+            return 'none'
+        role = get_user_role_level(email, project_id, policy=policy)
+        role_cache.set(project_id, email, role, generation=generation)
+    return role
+
+
+def invalidate_roles(project_id: str, emails: Optional[Iterable[str]] = None) -> None:
+    """
+    Forget cached roles after a role change (everyone in the project if no emails).
+
+    Only affects this process; other instances pick the change up when
+    their cached role expires (AUTHZ_CACHE_TTL).
+    """
+    role_cache.invalidate(project_id, emails)
+
+
+def session_user(request: Request) -> Dict[str, Any]:
+    """
+    Dependency: the logged-in user from the session (no IAM lookup).
+
+    Raises:
+        AuthError: 401 if not logged in
+    """
+    user = request.session.get('user')
+    if not user:
+        raise AuthError(401, "Not authenticated")
+    return user
+
+
+async def current_user(request: Request, user: Dict[str, Any] = Depends(session_user)) -> Dict[str, Any]:
+    """
+    Dependency: the session user with 'project_id' and cached 'role' added.
+
+    The role is resolved at most once per request (FastAPI caches
+    dependencies per request) and served from the role cache in between
+    IAM lookups.
+    """
+    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
+    email = user.get('email', '')
+    role = role_cache.get(project_id, email)
+    if role is None:
+        role = await run_in_threadpool(get_role, email, project_id)
+    else:
+        count_cache_lookup('role', True)
+    return {**user, 'project_id': project_id, 'role': role}
+
+
+async def is_admin(connection: HTTPConnection) -> bool:
+    """Check whether the session user of a request is an admin (for middleware)."""
+    user = connection.session.get('user') if 'session' in connection.scope else None
+    if not user:
+        return False
+    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
+    return await run_in_threadpool(get_role, user.get('email', ''), project_id) == 'admin'
+
+
+def require_role(level: str) -> Callable[..., Any]:
+    """
+    Dependency factory: the current user, if their role is at least `level`.
+
+    Example:
+        @app.get("/api/users")
+        async def get_users(user: dict = Depends(require_role('admin'))):
+            ...
+
+    Raises:
+        AuthError: 401 if not logged in, 403 if the role is too low
+    """
+    async def dependency(user: Dict[str, Any] = Depends(current_user)) -> Dict[str, Any]:
+        if ROLE_LEVELS.get(user['role'], 0) < ROLE_LEVELS[level]:
+            raise AuthError(403, f"{level.title()} access required")
+        return user
+    return dependency
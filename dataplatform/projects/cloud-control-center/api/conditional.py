@@ -0,0 +1,108 @@
+"""
+Conditional GET helpers for Cloud Control Center.
+ETag / Last-Modified validators and 304 responses, so polling clients
+skip unchanged payloads.
+"""
+
+import json
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Any
+
+from fastapi import Request, Response
+
+from responses import FastJSONResponse
+
+
+# Responses are per user, so shared caches must not store them and
+# browsers must revalidate before reuse
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from version parts (no payload serialization).
+
+    Example:
+        make_etag('resources', project_id, version)  # 'W/"3f2a..."'
+    """
+    digest = hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def content_etag(payload: Any) -> str:
+    """Build a weak ETag from the canonical JSON of a payload."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return make_etag(hashlib.sha1(canonical.encode('utf-8')).hexdigest())
+
+
+def _opaque(tag: str) -> str:
+    # Weak comparison: W/"x" matches "x"
+    tag = tag.strip()
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Check If-None-Match (or, without it, If-Modified-Since) against validators.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag
+        last_modified: Current modification time (UNIX seconds)
+
+    Returns:
+        True if the client's copy is current and a 304 can be sent
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(',')}
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[float] = None,
+    cache_control: str = PRIVATE_CACHE_CONTROL
+) -> dict:
+    """ETag, Last-Modified and Cache-Control headers."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[float] = None, cache_control: str = PRIVATE_CACHE_CONTROL) -> Response:
+    """Empty 304 response carrying the validators."""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified, cache_control))
+
+
+def conditional_json(
+    request: Request,
+    payload: Any,
+    etag: Optional[str] = None,
+    last_modified: Optional[float] = None,
+    cache_control: str = PRIVATE_CACHE_CONTROL
+) -> Response:
+    """
+    JSON response with validators, or 304 if the client's copy is current.
+
+    Pass an etag derived from versions when you have one; otherwise it is
+    hashed from the payload (saves bandwidth, not serialization).
+
+    Example:
+        return conditional_json(request, {"users": users}, etag=make_etag('users', policy['etag']))
+    """
+    etag = etag or content_etag(payload)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, cache_control)
+    return FastJSONResponse(payload, headers=validator_headers(etag, last_modified, cache_control))
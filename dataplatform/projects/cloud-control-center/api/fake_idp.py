@@ -0,0 +1,191 @@
+"""
+Fake OpenID Connect identity provider for offline testing.
+Serves discovery, JWKS, an authorization endpoint that logs in straight
+away (no consent screen) and a token endpoint issuing RS256 ID tokens,
+so the whole login flow runs without Google.
+
+Usage:
+    python api/fake_idp.py --port 9100 --email admin@example.com
+
+    # In the API's environment
+    OIDC_METADATA_URL=http://127.0.0.1:9100/.well-known/openid-configuration
+    GOOGLE_CLIENT_ID=fake-client GOOGLE_CLIENT_SECRET=fake-secret
+
+Log in as another user with /auth/login?login_hint=someone@example.com.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import secrets
+import argparse
+from collections import Counter
+from typing import Dict, Any
+from urllib.parse import urlencode, parse_qsl
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse
+from starlette.routing import Route
+
+
+# Cache lifetime advertised for discovery and JWKS (like Google's)
+DOCUMENT_MAX_AGE = 3600
+
+# Seconds an authorization code stays valid
+CODE_TTL = 60
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _int_b64url(value: int) -> str:
+    return _b64url(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+
+
+class FakeIdentityProvider:
+    """
+    Issues real, verifiable ID tokens for any requested email.
+
+    `requests` counts calls per endpoint, so tests can check how often
+    discovery and JWKS were fetched; rotate_key() starts signing with a
+    new key (the old one stays published, like a real rotation).
+
+    Usage:
+        idp = FakeIdentityProvider('http://127.0.0.1:9100')
+        uvicorn.run(idp.app, port=9100)
+    """
+
+    def __init__(self, issuer: str, email: str = 'admin@example.com', name: str = 'Fake User'):
+        self.issuer = issuer.rstrip('/')
+        self.email = email
+        self.name = name
+        self.requests: Counter = Counter()
+        self._keys: Dict[str, Any] = {}
+        self._kid = ''
+        self._codes: Dict[str, Dict[str, Any]] = {}
+        self.rotate_key()
+        self.app = Starlette(routes=[
+            Route('/.well-known/openid-configuration', self.configuration),
+            Route('/jwks', self.jwks),
+            Route('/authorize', self.authorize),
+            Route('/token', self.token, methods=['POST']),
+            Route('/userinfo', self.userinfo),
+        ])
+
+    def rotate_key(self) -> str:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._kid = secrets.token_hex(8)
+        self._keys[self._kid] = key
+        return self._kid
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """Sign claims as an RS256 JWT with the current key."""
+        header = {'alg': 'RS256', 'typ': 'JWT', 'kid': self._kid}
+        signing_input = (
+            _b64url(json.dumps(header, separators=(',', ':')).encode()) + '.' +
+            _b64url(json.dumps(claims, separators=(',', ':')).encode())
+        )
+        signature = self._keys[self._kid].sign(signing_input.encode('ascii'), padding.PKCS1v15(), hashes.SHA256())
+        return signing_input + '.' + _b64url(signature)
+
+    def _cached(self, content: Dict[str, Any]) -> JSONResponse:
+        return JSONResponse(content, headers={'Cache-Control': f'public, max-age={DOCUMENT_MAX_AGE}'})
+
+    async def configuration(self, request: Request) -> JSONResponse:
+        self.requests['configuration'] += 1
+        return self._cached({
+            'issuer': self.issuer,
+            'authorization_endpoint': f'{self.issuer}/authorize',
+            'token_endpoint': f'{self.issuer}/token',
+            'userinfo_endpoint': f'{self.issuer}/userinfo',
+            'jwks_uri': f'{self.issuer}/jwks',
+            'response_types_supported': ['code'],
+            'subject_types_supported': ['public'],
+            'id_token_signing_alg_values_supported': ['RS256'],
+            'scopes_supported': ['openid', 'email', 'profile'],
+            'token_endpoint_auth_methods_supported': ['client_secret_basic', 'client_secret_post'],
+        })
+
+    async def jwks(self, request: Request) -> JSONResponse:
+        self.requests['jwks'] += 1
+        keys = []
+        for kid, key in self._keys.items():
+            numbers = key.public_key().public_numbers()
+            keys.append({
+                'kty': 'RSA', 'alg': 'RS256', 'use': 'sig', 'kid': kid,
+                'n': _int_b64url(numbers.n), 'e': _int_b64url(numbers.e),
+            })
+        return self._cached({'keys': keys})
+
+    async def authorize(self, request: Request) -> RedirectResponse:
+        self.requests['authorize'] += 1
+        params = request.query_params
+        code = secrets.token_urlsafe(16)
+        self._codes[code] = {
+            'client_id': params.get('client_id', ''),
+            'nonce': params.get('nonce'),
+            'email': params.get('login_hint') or self.email,
+            'expires_at': time.time() + CODE_TTL,
+        }
+        query = urlencode({'code': code, 'state': params.get('state', '')})
+        return RedirectResponse(f"{params['redirect_uri']}?{query}", status_code=302)
+
+    async def token(self, request: Request) -> JSONResponse:
+        self.requests['token'] += 1
+        # Token requests are application/x-www-form-urlencoded (no multipart parser needed)
+        form = dict(parse_qsl((await request.body()).decode('utf-8')))
+        grant = self._codes.pop(form.get('code', ''), None)
+        if grant is None or grant['expires_at'] < time.time():
+            return JSONResponse({'error': 'invalid_grant'}, status_code=400)
+
+        now = int(time.time())
+        email = grant['email']
+        claims = {
+            'iss': self.issuer,
+            'aud': grant['client_id'],
+            'sub': hashlib.sha256(email.encode()).hexdigest()[:21],
+            'email': email,
+            'email_verified': True,
+            'name': self.name,
+            'picture': None,
+            'iat': now,
+            'exp': now + 3600,
+        }
+        if grant['nonce']:
+            claims['nonce'] = grant['nonce']
+        return JSONResponse({
+            'access_token': secrets.token_urlsafe(24),
+            'token_type': 'Bearer',
+            'expires_in': 3600,
+            'scope': 'openid email profile',
+            'id_token': self.sign(claims),
+        })
+
+    async def userinfo(self, request: Request) -> JSONResponse:
+        self.requests['userinfo'] += 1
+        return JSONResponse({'email': self.email, 'email_verified': True, 'name': self.name})
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Fake OpenID Connect provider for offline logins')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('FAKE_IDP_PORT', '9100')))
+    parser.add_argument('--email', default=os.getenv('FAKE_IDP_EMAIL', 'admin@example.com'),
+                        help='Email every login gets (unless the login sends login_hint)')
+    args = parser.parse_args()
+
+    idp = FakeIdentityProvider(f'http://{args.host}:{args.port}', email=args.email)
+    print(f"🔑 Fake IdP: OIDC_METADATA_URL=http://{args.host}:{args.port}/.well-known/openid-configuration")
+    uvicorn.run(idp.app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Shared inventory state for Cloud Control Center.
+Keeps the last resource snapshot per project in an InventoryStore and a
+ResourceIndex built from it, refreshed in the background so requests
+never wait on gcloud.
+"""
+
+import os
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from reusables.python.gcp import InventoryStore, ResourceIndex, ProviderScheduler, resource_fingerprint
+
+
+# Seconds between background refresh ticks; each tick only re-lists the
+# providers whose own refresh interval has elapsed (0 disables the refresher)
+REFRESH_INTERVAL = float(os.getenv('INVENTORY_REFRESH_INTERVAL', '30'))
+
+# Snapshots older than this are reported as stale (seconds)
+STALE_AFTER = float(os.getenv('INVENTORY_STALE_AFTER', str(max(REFRESH_INTERVAL, 30) * 3)))
+
+
+class InventoryState:
+    """
+    Inventory snapshot and search index for one project.
+
+    Usage:
+        state = get_inventory_state('my-project')
+        state.ensure_synced()
+        page = state.index.search(status='RUNNING')
+    """
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.scheduler = ProviderScheduler(project_id, projection='summary')
+        # Incremental listing happens in the scheduler
+        self.store = InventoryStore(project_id, incremental=False)
+        self.index = ResourceIndex()
+        self.indexed = False
+        # Shared snapshot version and fingerprints the index reflects; another
+        # instance writing to a Redis snapshot moves the version past this
+        self.indexed_version = 0
+        self._indexed: Dict[str, Dict[str, str]] = {}
+        self.synced_at: Optional[float] = None
+        self.changed_at: Optional[float] = None
+        self.last_errors: Dict[str, str] = {}
+        # Provider key -> time.time() of the first failure in its current
+        # run of failed listings (cleared by its next successful listing)
+        self.failing_since: Dict[str, float] = {}
+        # Called as listener(version, deltas) from the syncing thread after changes
+        self.listeners: List[Callable[[int, Dict[str, Dict[str, Any]]], None]] = []
+        # _sync_lock serializes syncs (held while gcloud runs); _lock only
+        # guards swapping in the new snapshot version and index, so readers
+        # never wait on gcloud
+        self._sync_lock = threading.RLock()
+        self._lock = threading.RLock()
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last sync that fetched anything (None if none has)."""
+        return None if self.synced_at is None else time.time() - self.synced_at
+
+    @property
+    def stale(self) -> bool:
+        """True if never synced, older than STALE_AFTER, or a provider has failed for longer than that."""
+        age = self.age
+        if age is None or age > STALE_AFTER:
+            return True
+        now = time.time()
+        return any(now - since > STALE_AFTER for since in self.failing_since.values())
+
+    def sync(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Re-list due providers (all when forced), update the snapshot and
+        apply the changes to the index.
+
+        Providers whose listing failed keep their previous snapshot. A
+        refresh where every due provider failed keeps the previous sync
+        time, and a provider failing for longer than STALE_AFTER marks the
+        snapshot stale even while others succeed.
+
+        Args:
+            force: Re-list every provider regardless of its refresh interval
+
+        When the shared snapshot has moved past what this process indexed
+        (another instance synced it), the index is brought up to date and
+        the missed changes are reported as well.
+
+        Returns:
+            InventoryStore.sync() deltas
+        """
+        with self._sync_lock:
+            result = self.scheduler.collect(force=force or not self.indexed)
+            self.last_errors = result['errors']
+            now = time.time()
+            for key in result['errors']:
+                self.failing_since.setdefault(key, now)
+            for key in result['collected']:
+                self.failing_since.pop(key, None)
+            fetched = bool(result['collected']) or not result['errors']
+
+            with self._lock:
+                deltas = self.store.sync(result['resources'], errors=result['errors'])
+                version = self.store.version
+                if not self.indexed:
+                    # A shared (Redis) snapshot may predate this process, so the
+                    # first index is built from the whole snapshot, not the deltas
+                    snapshot = self.store.snapshot()
+                    self.index.build(snapshot)
+                    self._indexed = {
+                        resource_type: {key: resource_fingerprint(resource_type, item) for key, item in items.items()}
+                        for resource_type, items in snapshot.items()
+                    }
+                    self.indexed = True
+                elif version != self.indexed_version + (1 if deltas else 0):
+                    # Another instance changed the shared snapshot since this
+                    # process last indexed it: replay everything it missed
+                    deltas = self._replay(self.store.snapshot())
+                    self.index.apply(deltas)
+                else:
+                    self.index.apply(deltas)
+                    self._track(deltas)
+                self.indexed_version = version
+                if fetched:
+                    self.synced_at = time.time()
+                if deltas or self.changed_at is None:
+                    self.changed_at = time.time()
+
+            if deltas:
+                for listener in self.listeners:
+                    try:
+                        listener(version, deltas)
+                    except Exception as e:
+                        print(f"❌ Inventory listener failed: {e}")
+            return deltas
+
+    def _track(self, deltas: Dict[str, Dict[str, Any]]) -> None:
+        """Record the fingerprints of applied deltas."""
+        for resource_type, delta in deltas.items():
+            fingerprints = self._indexed.setdefault(resource_type, {})
+            for key, item in {**delta['added'], **delta['changed']}.items():
+                fingerprints[key] = resource_fingerprint(resource_type, item)
+            for key in delta['removed']:
+                fingerprints.pop(key, None)
+
+    def _replay(self, snapshot: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Diff a snapshot against what is indexed, in InventoryStore.sync() delta shape."""
+        deltas = {}
+        for resource_type in set(snapshot) | set(self._indexed):
+            items = snapshot.get(resource_type, {})
+            previous = self._indexed.get(resource_type, {})
+            fingerprints = {key: resource_fingerprint(resource_type, item) for key, item in items.items()}
+            delta = {
+                'added': {key: items[key] for key in fingerprints if key not in previous},
+                'changed': {
+                    key: items[key] for key, fingerprint in fingerprints.items()
+                    if key in previous and previous[key] != fingerprint
+                },
+                'removed': [key for key in previous if key not in fingerprints],
+            }
+            self._indexed[resource_type] = fingerprints
+            if delta['added'] or delta['changed'] or delta['removed']:
+                deltas[resource_type] = delta
+        return deltas
+
+    def ensure_synced(self) -> None:
+        """Sync once if nothing has been indexed yet (e.g., before the first refresh)."""
+        if self.indexed:
+            return
+        with self._sync_lock:
+            if not self.indexed:
+                self.sync()
+
+    def resources(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the snapshot in list_all_resources() shape.
+
+        Returns:
+            Dictionary of resource_type -> [items]
+        """
+        return {resource_type: list(items.values()) for resource_type, items in self.store.snapshot().items()}
+
+    def versioned_snapshot(self) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """
+        Get the snapshot together with its version, consistently.
+
+        Returns:
+            (version, {resource_type: {key: item}})
+        """
+        with self._lock:
+            return self.indexed_version, self.store.snapshot()
+
+    def freshness(self) -> Dict[str, Any]:
+        """Snapshot age fields for API responses."""
+        age = self.age
+        return {
+            "snapshot_age": None if age is None else round(age, 1),
+            "stale_after": STALE_AFTER,
+            "stale": self.stale,
+            "failing": sorted(self.failing_since),
+        }
+
+
+_states: Dict[str, InventoryState] = {}
+_states_lock = threading.Lock()
+
+
+def get_inventory_state(project_id: str) -> InventoryState:
+    """
+    Get (or create) the inventory state for a project.
+
+    Args:
+        project_id: GCP project ID
+
+    Returns:
+        Shared InventoryState instance
+    """
+    with _states_lock:
+        state = _states.get(project_id)
+        if state is None:
+            state = _states[project_id] = InventoryState(project_id)
+        return state
+
+
+class InventoryRefresher:
+    """
+    Background task keeping a project's inventory snapshot fresh.
+
+    Started and stopped from the FastAPI lifespan. Syncs run in a worker
+    thread, every REFRESH_INTERVAL seconds or immediately when triggered.
+
+    Usage:
+        refresher = InventoryRefresher('my-project')
+        await refresher.start()
+        await refresher.refresh_now()  # Waits for a forced refresh
+        await refresher.stop()
+    """
+
+    def __init__(self, project_id: str, interval: float = REFRESH_INTERVAL):
+        self.state = get_inventory_state(project_id)
+        self.interval = interval
+        self.refresh_count = 0
+        self._in_flight = False
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refreshed: Optional[asyncio.Condition] = None
+        self._force = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the refresh loop (no-op if the interval is 0)."""
+        if self.running or self.interval <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._refreshed = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+        print(f"✅ Inventory refresher started for {self.state.project_id} (every {self.interval:g}s)")
+
+    async def stop(self) -> None:
+        """Stop the refresh loop, waiting for an in-flight sync to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            force, self._force = self._force, False
+            self._in_flight = True
+            try:
+                deltas = await asyncio.to_thread(self.state.sync, force)
+                if deltas:
+                    changed = sum(len(d['added']) + len(d['changed']) + len(d['removed']) for d in deltas.values())
+                    print(f"🔄 Inventory refreshed: {changed} change(s) in {', '.join(deltas)}")
+            except Exception as e:
+                print(f"❌ Inventory refresh failed: {e}")
+
+            self._in_flight = False
+            self.refresh_count += 1
+            async with self._refreshed:
+                self._refreshed.notify_all()
+
+            # Sleep until the next provider is due, capped by the interval,
+            # or until someone asks for a refresh
+            timeout = min(self.interval, max(1.0, self.state.scheduler.next_due_in()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def trigger(self) -> None:
+        """Request a forced refresh without waiting for it (call from the event loop)."""
+        if self.running:
+            self._force = True
+            self._wakeup.set()
+        elif self._pending is None or self._pending.done():
+            self._pending = asyncio.get_running_loop().create_task(self.refresh_now())
+
+    async def refresh_now(self, timeout: float = 120) -> bool:
+        """
+        Force a refresh of every provider and wait for it to finish.
+
+        Falls back to an inline sync if the background loop isn't running.
+
+        Returns:
+            True if the refresh finished within the timeout
+        """
+        if not self.running:
+            await asyncio.to_thread(self.state.sync, True)
+            return True
+
+        target = self.refresh_count + 1
+        # A sync already in flight may predate the trigger, so wait for the next one
+        if self._in_flight:
+            target += 1
+        self.trigger()
+        try:
+            async with self._refreshed:
+                await asyncio.wait_for(
+                    self._refreshed.wait_for(lambda: self.refresh_count >= target),
+                    timeout=timeout
+                )
+            return True
+        except asyncio.TimeoutError:
+            return False
@@ -0,0 +1,481 @@
+"""
+Background jobs for Cloud Control Center.
+Slow cloud mutations (role changes) are accepted as jobs and run on a
+bounded executor; clients poll, long-poll or stream the job's status
+instead of holding a request open for the whole gcloud call. Job records
+live in Redis when several instances serve the API.
+"""
+
+import os
+import json
+import time
+import asyncio
+import secrets
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+
+# Jobs running at once (each holds one gcloud call at a time)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+
+# Queued + running jobs accepted before new ones are rejected with 429
+JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '100'))
+
+# Seconds finished jobs (and their idempotency keys) are kept
+JOB_RETENTION = float(os.getenv('JOB_RETENTION', '3600'))
+
+# 'memory' (one instance only) or 'redis' (job records, idempotency keys and
+# per-project locks shared by every instance; use on Cloud Run)
+JOB_BACKEND = os.getenv('JOB_BACKEND', 'memory').lower()
+
+# Longest a per-project job lock is held in Redis, in case its instance dies
+JOB_LOCK_TIMEOUT = float(os.getenv('JOB_LOCK_TIMEOUT', '900'))
+
+# Seconds between status reads while waiting on a job another instance runs,
+# and between tries for a serialization lock held elsewhere
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '0.5'))
+
+
+class JobQueueFull(Exception):
+    """Raised when JOB_MAX_PENDING jobs are already queued or running."""
+
+
+class Job:
+    """One background operation and its outcome."""
+
+    def __init__(self, kind: str, owner: str, params: Dict[str, Any], idempotency_key: Optional[str] = None):
+        self.job_id = secrets.token_hex(8)
+        self.kind = kind
+        self.owner = owner
+        self.params = params
+        self.idempotency_key = idempotency_key
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+        }
+
+    def to_record(self) -> str:
+        """Serialize for a shared job store (includes owner and idempotency key)."""
+        return json.dumps(
+            {**self.to_dict(), 'owner': self.owner, 'idempotency_key': self.idempotency_key},
+            default=str
+        )
+
+    @classmethod
+    def from_record(cls, record: str) -> 'Job':
+        """Rebuild a job from to_record() output."""
+        data = json.loads(record)
+        job = cls(data['kind'], data['owner'], data['params'], data.get('idempotency_key'))
+        for name in ('job_id', 'status', 'created_at', 'started_at', 'finished_at', 'result', 'error'):
+            setattr(job, name, data.get(name))
+        return job
+
+
+class MemoryJobStore:
+    """In-process job records (one instance only; for development and benchmarks)."""
+
+    def __init__(self, retention: float = JOB_RETENTION):
+        self.retention = retention
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._idempotency: Dict[Tuple[str, str], str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._mutex = threading.Lock()
+
+    def _prune(self) -> None:
+        # Long-running jobs can finish out of order, so check them all
+        cutoff = time.time() - self.retention
+        expired = [
+            job for job in self._jobs.values()
+            if job.done and job.finished_at is not None and job.finished_at <= cutoff
+        ]
+        for job in expired:
+            del self._jobs[job.job_id]
+            if job.idempotency_key:
+                self._idempotency.pop((job.owner, job.idempotency_key), None)
+
+    def find(self, owner: str, idempotency_key: str) -> Optional[Job]:
+        with self._mutex:
+            self._prune()
+            return self._jobs.get(self._idempotency.get((owner, idempotency_key), ''))
+
+    def add(self, job: Job) -> Optional[Job]:
+        """Store a new job; returns the existing job instead if its idempotency key is taken."""
+        with self._mutex:
+            self._prune()
+            if job.idempotency_key:
+                existing = self._jobs.get(self._idempotency.get((job.owner, job.idempotency_key), ''))
+                if existing is not None:
+                    return existing
+                self._idempotency[(job.owner, job.idempotency_key)] = job.job_id
+            self._jobs[job.job_id] = job
+            return None
+
+    def save(self, job: Job) -> None:
+        # Jobs are stored by reference
+        pass
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._mutex:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit: int) -> List[Job]:
+        with self._mutex:
+            self._prune()
+            return list(reversed(self._jobs.values()))[:limit]
+
+    def lock(self, key: str) -> threading.Lock:
+        with self._mutex:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+class RedisJobStore:
+    """
+    Job records on the shared Redis reusable, so any instance can report a
+    job, idempotency keys hold across instances, and jobs sharing a
+    `serialize` key run one at a time cluster-wide.
+
+    Each job is one JSON string under '<prefix>:<id>' (expiring
+    JOB_RETENTION seconds after its last update), idempotency keys are
+    claimed with SET NX, and '<prefix>:recent' orders jobs by creation.
+    """
+
+    def __init__(self, prefix: Optional[str] = None, client=None, retention: float = JOB_RETENTION):
+        from reusables.python.redis import get_redis_client, make_key
+
+        self.prefix = prefix or make_key('cloud-control-center', 'job')
+        self.retention = retention
+        self._client = client or get_redis_client()
+
+    def _key(self, *parts: str) -> str:
+        return ':'.join([self.prefix, *parts])
+
+    def _load(self, job_id: Optional[str]) -> Optional[Job]:
+        record = self._client.get(self._key(job_id)) if job_id else None
+        return Job.from_record(record) if record else None
+
+    def find(self, owner: str, idempotency_key: str) -> Optional[Job]:
+        return self._load(self._client.get(self._key('idempotency', owner, idempotency_key)))
+
+    def add(self, job: Job) -> Optional[Job]:
+        """Store a new job; returns the existing job instead if its idempotency key is taken."""
+        ttl = int(self.retention)
+        # The record goes first, so whoever finds the claimed key can load it
+        self._client.set(self._key(job.job_id), job.to_record(), ex=ttl)
+        if job.idempotency_key:
+            claimed = self._client.set(
+                self._key('idempotency', job.owner, job.idempotency_key), job.job_id, nx=True, ex=ttl
+            )
+            if not claimed:
+                self._client.delete(self._key(job.job_id))
+                return self.find(job.owner, job.idempotency_key) or job
+
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(self._key('recent'), {job.job_id: job.created_at})
+        pipe.zremrangebyscore(self._key('recent'), '-inf', time.time() - self.retention)
+        pipe.execute()
+        return None
+
+    def save(self, job: Job) -> None:
+        self._client.set(self._key(job.job_id), job.to_record(), ex=int(self.retention))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._load(job_id)
+
+    def recent(self, limit: int) -> List[Job]:
+        job_ids = self._client.zrevrange(self._key('recent'), 0, limit - 1)
+        if not job_ids:
+            return []
+        records = self._client.mget([self._key(job_id) for job_id in job_ids])
+        return [Job.from_record(record) for record in records if record]
+
+    def lock(self, key: str):
+        return self._client.lock(self._key('lock', key), timeout=JOB_LOCK_TIMEOUT)
+
+
+def make_job_store(backend: str = JOB_BACKEND, retention: float = JOB_RETENTION):
+    """
+    Create the job store for a backend name.
+
+    Args:
+        backend: 'redis' or 'memory'
+    """
+    if backend == 'redis':
+        return RedisJobStore(retention=retention)
+    if backend == 'memory':
+        if os.getenv('K_SERVICE'):
+            print("⚠️ JOB_BACKEND=memory on Cloud Run: jobs are only visible on the instance "
+                  "that accepted them; deploy with --max-instances=1 or set JOB_BACKEND=redis")
+        return MemoryJobStore(retention)
+    raise ValueError(f"Unknown job backend: {backend}")
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool, with idempotency keys.
+
+    A job function returns a result dict; {'success': False, 'message': ...}
+    marks the job failed. Jobs sharing a `serialize` key run one at a time
+    (e.g. all IAM changes of a project, which would only conflict on the
+    policy etag otherwise), in submission order on each instance; a job
+    waiting for its key doesn't hold a worker, so other keys keep running.
+    Resubmitting an idempotency key returns the
+    original job instead of running the operation again.
+
+    Job records come from a job store (JOB_BACKEND); with Redis, any
+    instance can report a job and the idempotency and serialization
+    guarantees hold across instances. The work itself runs on the instance
+    that accepted the job, after the response is sent, so on Cloud Run the
+    service needs CPU always allocated (--no-cpu-throttling).
+
+    Usage:
+        jobs = JobManager()
+        job, created = jobs.submit('assign-role', run, owner='a@example.com',
+                                   params={'email': 'b@example.com'}, idempotency_key=key)
+        await jobs.wait(job, timeout=10)
+        print(job.status, job.result)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = JOB_WORKERS,
+        max_pending: int = JOB_MAX_PENDING,
+        retention: float = JOB_RETENTION,
+        store=None
+    ):
+        self.max_pending = max_pending
+        self.retention = retention
+        self.store = store if store is not None else make_job_store(retention=retention)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        # Jobs queued or running on this instance (waiters are notified directly)
+        self._local: Dict[str, Job] = {}
+        # serialize key -> this instance's jobs for it, in order; only the
+        # first one is scheduled (the rest start as it finishes)
+        self._serial: Dict[str, deque] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or running on this instance."""
+        return self._pending
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[[], Dict[str, Any]],
+        owner: str,
+        params: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        serialize: Optional[str] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Queue a job (or find the one already submitted with this idempotency key).
+
+        Args:
+            kind: Job type, e.g. 'assign-role'
+            func: Function doing the work, returning a result dict
+            owner: Email of the submitting user (idempotency keys are per owner)
+            params: Job parameters, echoed in the status
+            idempotency_key: Client-chosen key; a retry with the same key
+                             returns the original job
+            serialize: Jobs with the same key never run concurrently
+
+        Returns:
+            (job, created)
+
+        Raises:
+            JobQueueFull: Too many jobs pending
+            ValueError: Idempotency key reused with different parameters
+        """
+        params = params or {}
+        if idempotency_key:
+            existing = self.store.find(owner, idempotency_key)
+            if existing is not None:
+                return self._existing(existing, kind, params), False
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs ({self._pending}); try again shortly")
+            self._pending += 1
+
+        job = Job(kind, owner, params, idempotency_key)
+        try:
+            existing = self.store.add(job)
+        except Exception:
+            self._release_slot()
+            raise
+        if existing is not None:
+            # Another request claimed the key first
+            self._release_slot()
+            return self._existing(existing, kind, params), False
+
+        with self._lock:
+            self._local[job.job_id] = job
+            if serialize:
+                queue = self._serial.setdefault(serialize, deque())
+                queue.append((job, func))
+                if len(queue) > 1:
+                    return job, True
+        self._executor.submit(self._run, job, func, serialize)
+        return job, True
+
+    @staticmethod
+    def _existing(job: Job, kind: str, params: Dict[str, Any]) -> Job:
+        if job.kind != kind or job.params != params:
+            raise ValueError("Idempotency-Key was already used for a different request")
+        return job
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _run(self, job: Job, func: Callable[[], Dict[str, Any]], serialize: Optional[str] = None) -> None:
+        lock = None
+        deferred = False
+        try:
+            if serialize:
+                candidate = self.store.lock(serialize)
+                # Never block a worker on the lock: jobs of other keys would
+                # queue behind it for as long as it is held
+                if not candidate.acquire(blocking=False):
+                    deferred = True
+                    return
+                lock = candidate
+            job.status = 'running'
+            job.started_at = time.time()
+            self.store.save(job)
+            result = func()
+            job.result = result
+            if result.get('success', True):
+                job.status = 'succeeded'
+            else:
+                job.status = 'failed'
+                job.error = result.get('message') or result.get('error')
+        except Exception as e:
+            print(f"❌ Job {job.kind} {job.job_id} failed: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            if lock:
+                try:
+                    lock.release()
+                except Exception as e:
+                    # A Redis lock that outlived JOB_LOCK_TIMEOUT is already gone
+                    print(f"⚠️ Job lock for {job.kind} {job.job_id} was lost: {e}")
+            if deferred:
+                # Held by another instance's job: try again shortly
+                timer = threading.Timer(JOB_POLL_INTERVAL, self._resubmit, (job, func, serialize))
+                timer.daemon = True
+                timer.start()
+            else:
+                self._finish(job)
+                if serialize:
+                    self._start_next(serialize)
+
+    def _resubmit(self, job: Job, func: Callable[[], Dict[str, Any]], serialize: str) -> None:
+        try:
+            self._executor.submit(self._run, job, func, serialize)
+        except RuntimeError:
+            # Shut down: queued jobs are dropped
+            pass
+
+    def _start_next(self, serialize: str) -> None:
+        """Start the next job waiting on a serialize key, after the previous one finished."""
+        with self._lock:
+            queue = self._serial.get(serialize)
+            if queue:
+                queue.popleft()
+            if not queue:
+                self._serial.pop(serialize, None)
+                return
+            job, func = queue[0]
+        self._resubmit(job, func, serialize)
+
+    def _finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        try:
+            self.store.save(job)
+        except Exception as e:
+            print(f"❌ Could not store job {job.kind} {job.job_id}: {e}")
+        with self._lock:
+            self._pending -= 1
+            self._local.pop(job.job_id, None)
+            waiters, job._waiters = job._waiters, []
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._local.get(job_id)
+        return job if job is not None else self.store.get(job_id)
+
+    def list(self, limit: int = 50) -> List[Job]:
+        """Most recent jobs first."""
+        return self.store.recent(limit)
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """
+        Wait up to `timeout` seconds for a job to finish.
+
+        Jobs running on this instance notify their waiters; others (another
+        instance's, with a shared store) are re-read every JOB_POLL_INTERVAL.
+
+        Returns:
+            The job's latest state, finished or not
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            local = self._local.get(job.job_id)
+            if local is not None:
+                future = loop.create_future()
+                local._waiters.append((loop, future))
+        if job.done:
+            return job
+
+        if local is not None:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                pass
+            return local
+
+        deadline = loop.time() + timeout
+        while not job.done and loop.time() < deadline:
+            await asyncio.sleep(min(JOB_POLL_INTERVAL, max(0.0, deadline - loop.time())))
+            latest = await asyncio.to_thread(self.store.get, job.job_id)
+            if latest is None:
+                break
+            job = latest
+        return job
+
+    def shutdown(self) -> None:
+        """Stop accepting work; running jobs finish, queued ones are dropped."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,200 @@
+"""
+Live resource updates for Cloud Control Center.
+Broadcasts inventory deltas from the background refresher to any number of
+Server-Sent Events clients, with per-client backpressure and resume via
+Last-Event-ID.
+"""
+
+import os
+import json
+import asyncio
+from collections import deque
+from typing import Optional, Dict, Any, AsyncIterator, Deque, Set, Tuple
+
+from inventory_state import InventoryState
+
+
+# Delta events kept for clients resuming with Last-Event-ID
+HISTORY_SIZE = int(os.getenv('LIVE_HISTORY_SIZE', '256'))
+
+# Events buffered per client before it is considered too slow
+CLIENT_QUEUE_SIZE = int(os.getenv('LIVE_CLIENT_QUEUE_SIZE', '64'))
+
+# Seconds between keep-alive comments on idle streams
+HEARTBEAT_INTERVAL = float(os.getenv('LIVE_HEARTBEAT_INTERVAL', '15'))
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[Any] = None) -> str:
+    """Format one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"), default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Parse an 'epoch:version' event id (as sent back in Last-Event-ID).
+
+    Returns:
+        (epoch, version), or None if missing or malformed
+    """
+    epoch, _, version = (event_id or '').rpartition(':')
+    if not epoch or not version.isdigit():
+        return None
+    return epoch, int(version)
+
+
+class _Client:
+    def __init__(self):
+        # (epoch, version, message) tuples; message None asks for a resync
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class ResourceBroadcaster:
+    """
+    Fans inventory deltas out to connected stream clients.
+
+    Each sync that finds changes is serialized once and the same message
+    is queued for every client. A client that falls CLIENT_QUEUE_SIZE
+    events behind has its queue dropped and gets a fresh snapshot instead,
+    so one slow connection never holds up the others or grows memory.
+
+    Event ids are 'epoch:version'. Versions are only comparable within the
+    snapshot's epoch (an in-memory snapshot numbers its versions per
+    instance), so a client resuming with an id from another epoch, e.g.
+    after reconnecting to a different instance, gets a full snapshot, and
+    so does a connected client when the epoch changes under it.
+
+    Usage:
+        broadcaster = ResourceBroadcaster(get_inventory_state('my-project'))
+
+        @app.get("/stream")
+        async def stream(request: Request):
+            return StreamingResponse(broadcaster.stream(), media_type="text/event-stream")
+    """
+
+    def __init__(self, state: InventoryState):
+        self.state = state
+        self._clients: Set[_Client] = set()
+        self._history: Deque[Tuple[int, str]] = deque(maxlen=HISTORY_SIZE)
+        # Epoch of the versions in _history
+        self._epoch: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        state.listeners.append(self._on_sync)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def _on_sync(self, version: int, deltas: Dict[str, Dict[str, Any]]) -> None:
+        # Called from the sync worker thread
+        if self._loop is not None and not self._loop.is_closed():
+            epoch = self.state.store.epoch
+            self._loop.call_soon_threadsafe(self._publish, epoch, version, deltas)
+
+    def _publish(self, epoch: str, version: int, deltas: Dict[str, Dict[str, Any]]) -> None:
+        if epoch != self._epoch:
+            # Versions restarted: older history can't be resumed from
+            self._history.clear()
+            self._epoch = epoch
+        message = format_event('delta', {'version': version, 'deltas': deltas}, event_id=f'{epoch}:{version}')
+        self._history.append((version, message))
+
+        for client in self._clients:
+            if client.overflowed:
+                continue
+            try:
+                client.queue.put_nowait((epoch, version, message))
+            except asyncio.QueueFull:
+                client.overflowed = True
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                # Wake the client so it resyncs
+                client.queue.put_nowait((epoch, version, None))
+
+    def _missed_events(self, last_event_id: int, current_version: int) -> Optional[list]:
+        """Messages after last_event_id, or None if history can't cover the gap."""
+        missed = [(v, m) for v, m in self._history if v > last_event_id]
+        if [v for v, _ in missed] != list(range(last_event_id + 1, current_version + 1)):
+            return None
+        return missed
+
+    async def _snapshot_event(self) -> Tuple[str, int, str]:
+        # Epoch first: if it changes meanwhile, the next delta's epoch
+        # won't match and the client resyncs again
+        epoch = await asyncio.to_thread(lambda: self.state.store.epoch)
+        version, snapshot = await asyncio.to_thread(self.state.versioned_snapshot)
+        message = format_event(
+            'snapshot',
+            {'version': version, 'resources': snapshot, **self.state.freshness()},
+            event_id=f'{epoch}:{version}'
+        )
+        return epoch, version, message
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream a snapshot followed by deltas as Server-Sent Events.
+
+        Args:
+            last_event_id: Event id the client already has (reconnects); if
+                           it is from the current epoch and the missed
+                           deltas are still in history only those are sent,
+                           otherwise a full snapshot
+
+        Yields:
+            'snapshot' and 'delta' events (id = 'epoch:version') and
+            keep-alive comments
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        client = _Client()
+        # Subscribe before reading the snapshot so no delta falls in between
+        self._clients.add(client)
+        try:
+            yield 'retry: 3000\n\n'
+
+            await asyncio.to_thread(self.state.ensure_synced)
+            current = self.state.indexed_version
+            epoch = await asyncio.to_thread(lambda: self.state.store.epoch)
+            resume = parse_event_id(last_event_id)
+            missed = None
+            if resume is not None and resume[0] == epoch and self._epoch in (None, epoch) and resume[1] <= current:
+                missed = self._missed_events(resume[1], current)
+
+            # The client has everything up to `floor` in `client_epoch`
+            if missed is None:
+                client_epoch, floor, message = await self._snapshot_event()
+                yield message
+            else:
+                client_epoch, floor = epoch, resume[1]
+                for version, message in missed:
+                    floor = version
+                    yield message
+
+            while True:
+                try:
+                    epoch, version, message = await asyncio.wait_for(client.queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+
+                # Fell behind, or versions restarted (their floor means
+                # nothing in the new epoch): send a fresh snapshot
+                if client.overflowed or epoch != client_epoch:
+                    client.overflowed = False
+                    while not client.queue.empty():
+                        client.queue.get_nowait()
+                    client_epoch, floor, message = await self._snapshot_event()
+                    yield message
+                    continue
+
+                if version > floor:
+                    floor = version
+                    yield message
+        finally:
+            self._clients.discard(client)
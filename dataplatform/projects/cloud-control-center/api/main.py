@@ -8,35 +8,123 @@ import os
 
 # Add parent directories to path for reusables
 reusables_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
-sys.path.insert(0, reusables_path)
-sys.path.insert(0, os.path.dirname(__file__))
+for path in (reusables_path, os.path.dirname(os.path.abspath(__file__))):
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
-print(f"Reusables path: {reusables_path}")
-
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import RedirectResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, HTTPException, Query, Depends
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse, Response, HTMLResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
-from pydantic import BaseModel
-from auth import oauth, SESSION_SECRET
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Set
+import asyncio
+from auth import get_google_client, get_oidc_provider, SESSION_SECRET, OIDC_PREFETCH
+from inventory_state import get_inventory_state, InventoryRefresher
+from live import ResourceBroadcaster, format_event
+from responses import FastJSONResponse, CompressionMiddleware, dumps
+from metrics import MetricsMiddleware, render_metrics, metrics_authorized
+from sessions import SESSION_BACKEND, ServerSessionMiddleware, make_session_store
+from conditional import make_etag, conditional_json, is_not_modified, not_modified
+from authz import (
+    AuthError, session_user, current_user, require_role, get_role, read_policy, invalidate_roles, is_admin, role_cache
+)
+from profiling import ProfilingMiddleware, make_profile_store, run_sync
+from jobs import JobManager, JobQueueFull
+from static import StaticAssets
 from reusables.python.gcp import (
-    check_user_has_project_access, 
     list_all_resources, 
-    get_user_role_level,
     list_project_iam_members,
     assign_role_to_user,
-    revoke_role_from_user
+    revoke_role_from_user,
+    apply_role_changes,
+    get_project_iam_policy
 )
 
+# Keeps the inventory snapshot fresh so requests never wait on gcloud
+refresher = InventoryRefresher(os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud'))
+
+# Pushes the refresher's deltas to /api/resources/stream clients
+broadcaster = ResourceBroadcaster(refresher.state)
+
+# Runs role changes in the background so requests return immediately
+jobs = JobManager()
+
+# Start-up work left running in the background; referenced here so it isn't
+# garbage collected mid-run, and cancelled at shutdown
+background_tasks: Set[asyncio.Task] = set()
+
+
+def _background_done(task: asyncio.Task) -> None:
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ {task.get_name()} failed: {task.exception()}")
+
+
+def spawn(coro, name: str) -> asyncio.Task:
+    """Run coro in the background, logging a failure instead of losing it."""
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+dashboard_path = os.path.join(os.path.dirname(__file__), '..', 'dashboard', 'build')
+dashboard = StaticAssets(dashboard_path) if os.path.exists(dashboard_path) else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await refresher.start()
+    if OIDC_PREFETCH:
+        spawn(get_oidc_provider().warm(), "OIDC prefetch")
+    if dashboard is not None:
+        # Index (and compress) the dashboard build without delaying start-up
+        spawn(dashboard.load(), "Dashboard indexing")
+    yield
+    for task in list(background_tasks):
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await refresher.stop()
+    jobs.shutdown()
+    # Sessions, OIDC and profiling share the async Redis client; only loaded
+    # (and needing a close) when one of them uses Redis
+    redis_client = sys.modules.get('reusables.python.redis.client')
+    if redis_client is not None:
+        await redis_client.AsyncRedisClient.close()
+
+
 app = FastAPI(
     title="Cloud Control Center",
     description="GCP resource management dashboard",
     version="0.1.0",
-    docs_url="/api/docs"
+    docs_url="/api/docs",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
-# Add session middleware
-app.add_middleware(SessionMiddleware, secret_key=SESSION_SECRET)
+# Profile requests on demand (added before the session middleware, so it
+# runs inside it and can check the caller's role)
+profile_store = make_profile_store()
+app.add_middleware(ProfilingMiddleware, store=profile_store, is_admin=is_admin)
+
+# Add session middleware (server-side sessions share state across instances)
+if SESSION_BACKEND == 'cookie':
+    app.add_middleware(SessionMiddleware, secret_key=SESSION_SECRET)
+else:
+    app.add_middleware(ServerSessionMiddleware, store=make_session_store(SESSION_BACKEND))
+
+# Compress large responses
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv('COMPRESSION_MIN_SIZE', '1024')))
+
+# Request metrics (added last, so it wraps everything including compression)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(AuthError)
+async def auth_error_handler(request: Request, exc: AuthError):
+    return JSONResponse({"error": exc.message}, status_code=exc.status_code)
 
 
 # Pydantic models for request bodies
@@ -45,14 +133,22 @@ class RoleAssignmentRequest(BaseModel):
     role: str  # viewer, operator, or admin
 
 
+class RoleBatchRequest(BaseModel):
+    grants: List[RoleAssignmentRequest] = Field(default_factory=list)
+    revokes: List[RoleAssignmentRequest] = Field(default_factory=list)
+
+
+SERVICE_INFO = {
+    "service": "Cloud Control Center",
+    "version": "0.1.0",
+    "description": "GCP management dashboard"
+}
+
+
 @app.get("/api")
 def root():
     """API root endpoint."""
-    return {
-        "service": "Cloud Control Center",
-        "version": "0.1.0",
-        "description": "GCP management dashboard"
-    }
+    return SERVICE_INFO
 
 
 @app.get("/api/health")
@@ -61,27 +157,145 @@ def health():
     return {"status": "healthy"}
 
 
-@app.get("/api/resources")
-async def get_resources(request: Request):
-    """Get all GCP resources for the project."""
-    user = request.session.get('user')
-    if not user:
+@app.get("/api/metrics")
+def get_metrics(request: Request):
+    """Prometheus metrics (Bearer METRICS_TOKEN required when set)."""
+    if not metrics_authorized(request.headers.get('authorization')):
         return JSONResponse({"error": "Not authenticated"}, status_code=401)
-    
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
+def _resources_payload(project_id: str, resources: Dict[str, list], freshness: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "project_id": project_id,
+        "resources": resources,
+        "counts": {key: len(items) for key, items in resources.items()},
+        **freshness
+    }
+
+
+@app.get("/api/resources")
+async def get_resources(request: Request, projection: str = "summary", user: dict = Depends(session_user)):
+    """Get all GCP resources for the project (summary fields unless projection=full)."""
     project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
+    if projection not in ('summary', 'full'):
+        return JSONResponse({"error": "projection must be 'summary' or 'full'"}, status_code=400)
+    
+    try:
+        etag = last_modified = None
+        if projection == 'summary':
+            # Served from the background-refreshed snapshot; its version is
+            # the ETag, so unchanged polls get a 304 before any serialization.
+            # The ETag also covers stale/failing, so dashboards see a snapshot
+            # going stale even though its version doesn't change
+            state = get_inventory_state(project_id)
+            await run_sync(state.ensure_synced)
+            freshness = state.freshness()
+            etag = make_etag(
+                'resources', project_id, state.store.version, state.changed_at,
+                freshness['stale'], ','.join(freshness['failing'])
+            )
+            # If-Modified-Since alone can't see freshness changes
+            degraded = freshness['stale'] or freshness['failing']
+            last_modified = None if degraded else state.changed_at
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+            resources = state.resources()
+        else:
+            # Same types as the snapshot: every registered provider
+            resources = await run_sync(list_all_resources, project_id, projection=None, resource_types='all')
+            freshness = {"snapshot_age": 0, "stale_after": None, "stale": False, "failing": []}
+        return conditional_json(
+            request, _resources_payload(project_id, resources, freshness), etag=etag, last_modified=last_modified
+        )
+    except Exception as e:
+        return JSONResponse(
+            {"success": False, "error": str(e)},
+            status_code=500
+        )
+
+
+@app.post("/api/resources/refresh")
+async def refresh_resources(request: Request, wait: bool = True, user: dict = Depends(session_user)):
+    """Refresh the inventory snapshot now (waits for it unless wait=false)."""
+    state = refresher.state
     
     try:
-        resources = list_all_resources(project_id)
+        if not wait:
+            refresher.trigger()
+            return JSONResponse({"success": True, "queued": True}, status_code=202)
+        
+        finished = await refresher.refresh_now()
         return {
+            "success": finished,
+            "errors": state.last_errors,
+            **state.freshness()
+        }
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+
+@app.get("/api/resources/stream")
+async def stream_resources(request: Request, last_event_id: Optional[str] = None, user: dict = Depends(session_user)):
+    """Stream the inventory snapshot, then deltas, as Server-Sent Events."""
+    # EventSource sends Last-Event-ID itself when it reconnects
+    last_event_id = request.headers.get('last-event-id') or last_event_id
+    
+    return StreamingResponse(
+        broadcaster.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _split_values(values: List[str]) -> List[str]:
+    """Accept both repeated (?status=A&status=B) and comma-separated (?status=A,B) values."""
+    return [v.strip() for value in values for v in value.split(',') if v.strip()]
+
+
+@app.get("/api/resources/search")
+def search_resources(
+    request: Request,
+    type: List[str] = Query(default=[]),
+    name: Optional[str] = None,
+    status: List[str] = Query(default=[]),
+    location: List[str] = Query(default=[]),
+    label: List[str] = Query(default=[]),
+    sort: str = "name",
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_resource: bool = True,
+    user: dict = Depends(session_user)
+):
+    """Search the indexed inventory (filters, sorting and cursor pagination)."""
+    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
+    
+    try:
+        state = get_inventory_state(project_id)
+        state.ensure_synced()
+        result = state.index.search(
+            types=_split_values(type),
+            name_prefix=name,
+            status=_split_values(status),
+            location=_split_values(location),
+            labels=label,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+            include_resource=include_resource
+        )
+        return FastJSONResponse({
             "success": True,
             "project_id": project_id,
-            "resources": resources,
-            "counts": {
-                "compute_instances": len(resources.get('compute_instances', [])),
-                "cloud_run_services": len(resources.get('cloud_run_services', [])),
-                "storage_buckets": len(resources.get('storage_buckets', []))
-            }
-        }
+            "total": result['total'],
+            "items": result['items'],
+            "next_cursor": result['next_cursor'],
+            **state.freshness()
+        })
+    except ValueError as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=400)
     except Exception as e:
         return JSONResponse(
             {"success": False, "error": str(e)},
@@ -89,25 +303,47 @@ async def get_resources(request: Request):
         )
 
 
+@app.get("/api/admin/profiles")
+async def list_profiles(request: Request, limit: int = Query(default=50, ge=1, le=500), user: dict = Depends(require_role('admin'))):
+    """List stored request profiles, newest first (admin only)."""
+    return {"profiles": await profile_store.list(limit)}
+
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(request: Request, profile_id: str, format: str = "html", user: dict = Depends(require_role('admin'))):
+    """Get a stored profile as an HTML call tree or plain text (admin only)."""
+    content = await profile_store.get(profile_id, format)
+    if content is None:
+        return JSONResponse({"error": "Profile not found"}, status_code=404)
+    if format == 'text':
+        return PlainTextResponse(content)
+    return HTMLResponse(content)
+
+
 @app.get("/auth/login")
 async def login(request: Request):
-    """Redirect to Google OAuth login."""
+    """Redirect to Google OAuth login (?login_hint=email preselects the account)."""
     redirect_uri = request.url_for('auth_callback')
-    return await oauth.google.authorize_redirect(request, redirect_uri)
+    hint = request.query_params.get('login_hint')
+    return await get_google_client().authorize_redirect(request, redirect_uri, **({'login_hint': hint} if hint else {}))
 
 
 @app.get("/auth/callback")
 async def auth_callback(request: Request):
-    """Handle OAuth callback from Google."""
-    token = await oauth.google.authorize_access_token(request)
+    """Handle OAuth callback from Google (the ID token is verified locally against cached keys)."""
+    try:
+        token = await get_google_client().authorize_access_token(request)
+    except Exception as e:
+        print(f"❌ Login failed: {e}")
+        return RedirectResponse(url='/?error=login_failed')
     user = token.get('userinfo')
     
     if user:
         email = user.get('email', '')
         project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
         
-        # Check if user has IAM access to GCP project
-        if not check_user_has_project_access(email, project_id):
+        # Check if user has IAM access to GCP project (also warms the role cache)
+        if await run_in_threadpool(get_role, email, project_id) == 'none':
             return RedirectResponse(url='/?error=unauthorized')
         
         request.session['user'] = dict(user)
@@ -129,101 +365,278 @@ async def get_user(request: Request):
     if not user:
         return JSONResponse({"authenticated": False}, status_code=401)
     
-    # Get user's role level
-    email = user.get('email', '')
-    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
-    role_level = get_user_role_level(email, project_id)
+    # Get user's role level (cached)
+    user = await current_user(request, user)
     
-    return {
+    return conditional_json(request, {
         "authenticated": True,
         "email": user.get('email'),
         "name": user.get('name'),
         "picture": user.get('picture'),
-        "role": role_level
-    }
+        "role": user['role']
+    })
 
 
 @app.get("/api/users")
-async def get_users(request: Request):
-    """Get all users with Cloud Control Center roles."""
-    user = request.session.get('user')
-    if not user:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+async def get_users(request: Request, user: dict = Depends(require_role('admin'))):
+    """Get all users with Cloud Control Center roles (admin only)."""
+    project_id = user['project_id']
     
-    # Check if user has access
+    try:
+        # The IAM policy etag versions the user list (gcloud runs off the event loop)
+        policy = await run_sync(read_policy, project_id)
+        etag = make_etag('users', project_id, policy['etag']) if policy and policy.get('etag') else None
+        if etag and is_not_modified(request, etag):
+            return not_modified(etag)
+        
+        # Get all users with Cloud Control Center roles, from the policy just read
+        users = await run_sync(
+            list_project_iam_members, project_id, filter_cloud_control_only=True, policy=policy
+        )
+        return conditional_json(request, {"users": users}, etag=etag)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+def _bootstrap_access(user: dict, project_id: str) -> Dict[str, Any]:
+    """The user's role and, for admins, the user list, from at most one IAM policy read."""
     email = user.get('email', '')
-    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
+    cached = role_cache.get(project_id, email)
+    policy = read_policy(project_id) if cached in (None, 'admin') else None
+    role = get_role(email, project_id, policy=policy)
     
-    if not check_user_has_project_access(email, project_id):
-        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+    access = {
+        "user": {
+            "authenticated": True,
+            "email": email,
+            "name": user.get('name'),
+            "picture": user.get('picture'),
+            "role": role
+        }
+    }
+    if role == 'admin':
+        access["users"] = {"users": list_project_iam_members(project_id, filter_cloud_control_only=True, policy=policy)}
+    return access
+
+
+def _bootstrap_resources(project_id: str) -> Dict[str, Any]:
+    state = get_inventory_state(project_id)
+    state.ensure_synced()
+    # Epoch first: if it changes meanwhile, the id can't be resumed and the
+    # stream falls back to a snapshot
+    epoch = state.store.epoch
+    version, snapshot = state.versioned_snapshot()
+    payload = _resources_payload(
+        project_id, {key: list(items.values()) for key, items in snapshot.items()}, state.freshness()
+    )
+    # Item keys (parallel to each list) and the stream event id this
+    # snapshot matches, so the dashboard can open /api/resources/stream
+    # from here and only receive deltas
+    payload["keys"] = {key: list(items) for key, items in snapshot.items()}
+    payload["event_id"] = f'{epoch}:{version}'
+    return payload
+
+
+async def _bootstrap_parts(user: dict):
+    """Yield (section, payload) for the dashboard's initial load, each as soon as it is ready."""
+    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
+    yield "service", SERVICE_INFO
     
-    # Get user's role - only admins can view all users
-    role_level = get_user_role_level(email, project_id)
-    if role_level != 'admin':
-        return JSONResponse({"error": "Admin access required"}, status_code=403)
+    # Role/users and the inventory load concurrently
+    resources = asyncio.ensure_future(run_sync(_bootstrap_resources, project_id))
+    try:
+        access = await run_sync(_bootstrap_access, user, project_id)
+    except BaseException:
+        resources.cancel()
+        raise
+    for section, payload in access.items():
+        yield section, payload
     
+    # Inventory only once the role is known to allow it
+    if access["user"]["role"] == 'none':
+        resources.cancel()
+        return
     try:
-        # Get all users with Cloud Control Center roles
-        users = list_project_iam_members(project_id, filter_cloud_control_only=True)
-        return {"users": users}
+        yield "resources", await resources
     except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
+        yield "resources", {"success": False, "error": str(e)}
 
 
-@app.post("/api/users/assign-role")
-async def assign_role(request: Request, assignment: RoleAssignmentRequest):
-    """Assign a Cloud Control Center role to a user."""
-    user = request.session.get('user')
-    if not user:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
-    
-    # Check if user has admin access
-    email = user.get('email', '')
-    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
-    role_level = get_user_role_level(email, project_id)
+@app.get("/api/bootstrap")
+async def bootstrap(request: Request, stream: bool = False, user: dict = Depends(session_user)):
+    """
+    Everything the dashboard needs on load in one round trip: service info,
+    the user and role, the inventory summary and (admins) the user list.
     
-    if role_level != 'admin':
-        return JSONResponse({"error": "Admin access required"}, status_code=403)
+    Each section has the shape of its own endpoint (/api, /api/user,
+    /api/resources, /api/users). With stream=true, sections arrive as
+    newline-delimited JSON ({"section": ..., "data": ...}) as each one
+    is ready.
+    """
+    if stream:
+        async def lines():
+            try:
+                async for section, payload in _bootstrap_parts(user):
+                    yield dumps({"section": section, "data": payload}) + b'\n'
+            except Exception as e:
+                yield dumps({"section": "error", "data": {"error": str(e)}}) + b'\n'
+        
+        return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-store"})
     
     try:
-        result = assign_role_to_user(assignment.email, assignment.role, project_id)
-        if result['success']:
-            return {"success": True, "message": result['message']}
-        else:
-            return JSONResponse({"error": result['message']}, status_code=400)
+        return {section: payload async for section, payload in _bootstrap_parts(user)}
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+def _role_job(project_id: str, emails: List[str], change):
+    """Wrap an IAM change so the role cache and IAM policy cache are fresh when it finishes."""
+    def run():
+        result = change()
+        invalidate_roles(project_id, emails)
+        if result['success']:
+            # Warm the policy cache so the dashboard's /api/users re-fetch is fast
+            get_project_iam_policy(project_id)
+        return result
+    return run
+
+
+def _job_status(job) -> dict:
+    return {**job.to_dict(), "status_url": f"/api/jobs/{job.job_id}"}
+
+
+async def _submit_role_job(request: Request, user: dict, kind: str, params: dict, change, emails: List[str], wait: float):
+    """Queue a role change as a job; 202 with the job status (200 if it finished within `wait`)."""
+    project_id = user['project_id']
+    
+    try:
+        job, created = await run_sync(
+            jobs.submit,
+            kind,
+            _role_job(project_id, emails, change),
+            owner=user['email'],
+            params=params,
+            idempotency_key=request.headers.get('idempotency-key'),
+            # IAM changes of a project would only race on the policy etag
+            serialize=f"iam:{project_id}"
+        )
+    except JobQueueFull as e:
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "5"})
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    
+    if wait > 0:
+        job = await jobs.wait(job, wait)
+    return JSONResponse(
+        _job_status(job),
+        status_code=200 if job.done else 202,
+        headers={"Location": f"/api/jobs/{job.job_id}"}
+    )
+
+
+@app.post("/api/users/assign-role")
+async def assign_role(
+    request: Request,
+    assignment: RoleAssignmentRequest,
+    wait: float = Query(default=0, ge=0, le=30),
+    user: dict = Depends(require_role('admin'))
+):
+    """Assign a Cloud Control Center role to a user (as a background job)."""
+    project_id = user['project_id']
+    return await _submit_role_job(
+        request, user, 'assign-role', assignment.model_dump(),
+        lambda: assign_role_to_user(assignment.email, assignment.role, project_id),
+        [assignment.email], wait
+    )
+
+
 @app.post("/api/users/revoke-role")
-async def revoke_role(request: Request, assignment: RoleAssignmentRequest):
-    """Revoke a Cloud Control Center role from a user."""
-    user = request.session.get('user')
-    if not user:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+async def revoke_role(
+    request: Request,
+    assignment: RoleAssignmentRequest,
+    wait: float = Query(default=0, ge=0, le=30),
+    user: dict = Depends(require_role('admin'))
+):
+    """Revoke a Cloud Control Center role from a user (as a background job)."""
+    project_id = user['project_id']
+    return await _submit_role_job(
+        request, user, 'revoke-role', assignment.model_dump(),
+        lambda: revoke_role_from_user(assignment.email, assignment.role, project_id),
+        [assignment.email], wait
+    )
+
+
+@app.post("/api/users/roles/batch")
+async def batch_roles(
+    request: Request,
+    batch: RoleBatchRequest,
+    wait: float = Query(default=0, ge=0, le=30),
+    user: dict = Depends(require_role('admin'))
+):
+    """Grant and revoke many roles in a single IAM policy update (as a background job)."""
+    project_id = user['project_id']
+    return await _submit_role_job(
+        request, user, 'batch-roles', batch.model_dump(),
+        lambda: apply_role_changes(
+            grants=[(g.email, g.role) for g in batch.grants],
+            revokes=[(r.email, r.role) for r in batch.revokes],
+            project_id=project_id
+        ),
+        [c.email for c in batch.grants + batch.revokes], wait
+    )
+
+
+@app.get("/api/jobs")
+async def list_jobs(request: Request, limit: int = Query(default=50, ge=1, le=500), user: dict = Depends(require_role('admin'))):
+    """Recent jobs, newest first (admin only); `pending` counts this instance's queue."""
+    recent = await run_sync(jobs.list, limit)
+    return {"jobs": [_job_status(job) for job in recent], "pending": jobs.pending}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(
+    request: Request,
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=30),
+    user: dict = Depends(require_role('admin'))
+):
+    """Job status; with ?wait=N, long-polls up to N seconds for the job to finish."""
+    job = await run_sync(jobs.get, job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
     
-    # Check if user has admin access
-    email = user.get('email', '')
-    project_id = os.getenv('GCP_PROJECT_ID', 'noah-sjursen-cloud')
-    role_level = get_user_role_level(email, project_id)
+    if wait > 0 and not job.done:
+        job = await jobs.wait(job, wait)
+    return _job_status(job)
+
+
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_job(request: Request, job_id: str, user: dict = Depends(require_role('admin'))):
+    """Stream a job's status as Server-Sent Events until it finishes."""
+    found = await run_sync(jobs.get, job_id)
+    if found is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
     
-    if role_level != 'admin':
-        return JSONResponse({"error": "Admin access required"}, status_code=403)
+    async def events():
+        job = found
+        yield format_event('status', _job_status(job))
+        while not job.done:
+            job = await jobs.wait(job, 15)
+            if await request.is_disconnected():
+                return
+            # Comment lines keep proxies from closing an idle stream
+            yield format_event('status', _job_status(job)) if job.done else ': keep-alive\n\n'
     
-    try:
-        result = revoke_role_from_user(assignment.email, assignment.role, project_id)
-        if result['success']:
-            return {"success": True, "message": result['message']}
-        else:
-            return JSONResponse({"error": result['message']}, status_code=400)
-    except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # Mount dashboard (after all API routes)
-dashboard_path = os.path.join(os.path.dirname(__file__), '..', 'dashboard', 'build')
-if os.path.exists(dashboard_path):
-    app.mount("/", StaticFiles(directory=dashboard_path, html=True), name="dashboard")
+if dashboard is not None:
+    app.mount("/", dashboard, name="dashboard")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+"""
+Prometheus metrics for Cloud Control Center.
+Request counts and latency per route, in-flight requests, and timings
+from the gcp reusable (gcloud subprocesses, cache lookups) and the
+role cache, exposed at /api/metrics.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before start-up: each worker then writes its samples to its
+own memory-mapped file and a scrape aggregates all of them.
+"""
+
+import os
+import time
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from reusables.python.gcp import add_observer
+
+
+NAMESPACE = 'ccc'
+
+# Bearer token required to scrape /api/metrics (unset: open)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests', ['method', 'route', 'status'], namespace=NAMESPACE
+)
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency (event streams excluded)',
+    ['method', 'route', 'status'], namespace=NAMESPACE, buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'HTTP requests being served', ['method'],
+    namespace=NAMESPACE, multiprocess_mode='livesum'
+)
+GCLOUD_DURATION = Histogram(
+    'gcloud_command_duration_seconds', 'gcloud subprocess wall time',
+    ['family', 'outcome', 'mode'], namespace=NAMESPACE, buckets=LATENCY_BUCKETS
+)
+GCLOUD_THROTTLE = Counter(
+    'gcloud_throttle_seconds_total', 'Time spent waiting for gcloud rate limit tokens',
+    ['family'], namespace=NAMESPACE
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Cache lookups by cache and result', ['cache', 'result'], namespace=NAMESPACE
+)
+IAM_LOOKUP_DURATION = Histogram(
+    'iam_lookup_duration_seconds', 'Role resolutions that went to the IAM policy (role cache misses)',
+    namespace=NAMESPACE, buckets=LATENCY_BUCKETS
+)
+
+
+def _on_gcp_event(event: str, value: float, labels: dict) -> None:
+    if event == 'gcloud.command':
+        GCLOUD_DURATION.labels(labels['family'], labels['outcome'], 'buffered').observe(value)
+    elif event == 'gcloud.stream':
+        GCLOUD_DURATION.labels(labels['family'], labels['outcome'], 'stream').observe(value)
+    elif event == 'gcloud.throttle':
+        GCLOUD_THROTTLE.labels(labels['family']).inc(value)
+    elif event == 'gcloud.cache':
+        CACHE_LOOKUPS.labels('gcloud', labels['result']).inc()
+
+
+add_observer(_on_gcp_event)
+
+
+def count_cache_lookup(cache: str, hit: bool) -> None:
+    """Count an API-side cache lookup (e.g. 'role', 'session')."""
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        (body, content type); aggregated over all workers when
+        PROMETHEUS_MULTIPROC_DIR is set
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def metrics_authorized(authorization: Optional[str]) -> bool:
+    """Check an Authorization header against METRICS_TOKEN (always True if unset)."""
+    if not METRICS_TOKEN:
+        return True
+    return authorization == f"Bearer {METRICS_TOKEN}"
+
+
+def _route_label(scope: Scope) -> str:
+    # Route templates keep cardinality bounded ('/api/users/{id}', not every id)
+    route = scope.get('route')
+    path = getattr(route, 'path', None)
+    if path is not None:
+        return path or '/'
+    endpoint = scope.get('endpoint')
+    return getattr(endpoint, '__name__', 'unmatched')
+
+
+class MetricsMiddleware:
+    """
+    Records request count, latency and in-flight requests per route.
+
+    Latency runs until the last body chunk is sent; Server-Sent Events
+    streams are counted but left out of the latency histogram, since
+    their duration is the connection's lifetime.
+
+    Usage:
+        app.add_middleware(MetricsMiddleware)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        started = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, streaming
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                for name, value in message.get('headers', ()):
+                    if name == b'content-type':
+                        streaming = value.startswith(b'text/event-stream')
+                        break
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = _route_label(scope)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            if not streaming:
+                HTTP_LATENCY.labels(method, route, str(status)).observe(time.perf_counter() - started)
@@ -0,0 +1,247 @@
+"""
+Cached OpenID Connect discovery for Cloud Control Center.
+Keeps the identity provider's OpenID configuration and signing keys
+(JWKS) in memory, and optionally in Redis, refreshing them in the
+background before they expire, so logins verify ID tokens locally
+without a discovery round trip.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+from typing import Optional, Dict, Any
+
+
+# Seconds a document is kept when the response has no Cache-Control max-age
+OIDC_CACHE_TTL = float(os.getenv('OIDC_CACHE_TTL', '3600'))
+
+# Documents this close to expiry are refreshed in the background while served
+OIDC_REFRESH_AHEAD = float(os.getenv('OIDC_REFRESH_AHEAD', '300'))
+
+# Seconds past expiry a document is still used when the provider can't be reached
+OIDC_MAX_STALE = float(os.getenv('OIDC_MAX_STALE', str(24 * 3600)))
+
+# 'memory' (per instance) or 'redis' (shared, so new instances skip discovery)
+OIDC_CACHE_BACKEND = os.getenv('OIDC_CACHE_BACKEND', 'memory').lower()
+
+# Minimum seconds between forced JWKS re-fetches (tokens signed with an unknown key)
+JWKS_MIN_REFRESH = 60
+
+# Seconds to wait before contacting an unreachable provider again (stale copies are served meanwhile)
+RETRY_AFTER = 30
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class _Document:
+    __slots__ = ('value', 'fetched_at', 'expires_at')
+
+    def __init__(self, value: Dict[str, Any], fetched_at: float, expires_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+
+class RedisDocumentStore:
+    """Shares fetched documents between instances (JSON with a TTL)."""
+
+    def __init__(self, max_stale: float = OIDC_MAX_STALE):
+        from reusables.python.redis import get_async_redis_client, make_key
+
+        self.max_stale = max_stale
+        self.prefix = make_key('cloud-control-center', 'oidc')
+        self._client = get_async_redis_client()
+
+    def _key(self, url: str) -> str:
+        return f"{self.prefix}:{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}"
+
+    async def load(self, url: str) -> Optional[_Document]:
+        raw = await self._client.get(self._key(url))
+        if not raw:
+            return None
+        data = json.loads(raw)
+        return _Document(data['value'], data['fetched_at'], data['expires_at'])
+
+    async def save(self, url: str, document: _Document) -> None:
+        ttl = max(1, int(document.expires_at - time.time() + self.max_stale))
+        payload = {'value': document.value, 'fetched_at': document.fetched_at, 'expires_at': document.expires_at}
+        await self._client.set(self._key(url), json.dumps(payload), ex=ttl)
+
+
+class OIDCProvider:
+    """
+    Cached OpenID configuration and JWKS of one identity provider.
+
+    Documents live for the provider's Cache-Control max-age (or
+    OIDC_CACHE_TTL). Within OIDC_REFRESH_AHEAD of expiry they are still
+    served while a background task re-fetches them; concurrent misses
+    share one fetch, and an unreachable provider is bridged with the
+    stale copy for up to OIDC_MAX_STALE.
+
+    Usage:
+        provider = OIDCProvider('https://accounts.google.com/.well-known/openid-configuration')
+        metadata = await provider.metadata()
+        jwks = await provider.jwks()
+    """
+
+    def __init__(
+        self,
+        metadata_url: str,
+        ttl: float = OIDC_CACHE_TTL,
+        refresh_ahead: float = OIDC_REFRESH_AHEAD,
+        max_stale: float = OIDC_MAX_STALE,
+        store: Optional[RedisDocumentStore] = None,
+        timeout: float = 10
+    ):
+        self.metadata_url = metadata_url
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.max_stale = max_stale
+        self.store = store
+        self.timeout = timeout
+        self._documents: Dict[str, _Document] = {}
+        self._fetches: Dict[str, asyncio.Task] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._forced_at = 0.0
+
+    async def metadata(self) -> Dict[str, Any]:
+        """The OpenID configuration (discovery document)."""
+        return await self._get(self.metadata_url)
+
+    async def jwks(self, force: bool = False) -> Dict[str, Any]:
+        """
+        The provider's signing keys.
+
+        Args:
+            force: Re-fetch now (a token named an unknown key, e.g. after a
+                   key rotation); at most once per JWKS_MIN_REFRESH seconds
+        """
+        url = (await self.metadata())['jwks_uri']
+        if force and time.time() - self._forced_at >= JWKS_MIN_REFRESH:
+            self._forced_at = time.time()
+            return (await self._fetch(url)).value
+        return await self._get(url)
+
+    async def warm(self) -> None:
+        """Load both documents ahead of the first login (errors are only logged)."""
+        try:
+            await self.jwks()
+        except Exception as e:
+            print(f"⚠️ Failed to prefetch OpenID configuration: {e}")
+
+    async def _get(self, url: str) -> Dict[str, Any]:
+        now = time.time()
+        document = self._documents.get(url)
+        if document is None and self.store is not None:
+            document = await self._load_shared(url)
+
+        if document is not None and now < document.expires_at:
+            if document.expires_at - now <= self.refresh_ahead:
+                self._refresh_in_background(url)
+            return document.value
+
+        usable = document is not None and now < document.expires_at + self.max_stale
+        if usable and now - self._failed_at.get(url, 0) < RETRY_AFTER:
+            return document.value
+
+        try:
+            return (await self._fetch(url)).value
+        except Exception as e:
+            self._failed_at[url] = time.time()
+            if usable:
+                print(f"⚠️ Serving stale {url} ({e})")
+                return document.value
+            raise
+
+    async def _load_shared(self, url: str) -> Optional[_Document]:
+        try:
+            document = await self.store.load(url)
+        except Exception as e:
+            print(f"⚠️ Failed to read cached {url} from Redis: {e}")
+            return None
+        if document is not None:
+            self._documents[url] = document
+        return document
+
+    def _pending(self, url: str) -> Optional[asyncio.Task]:
+        task = self._fetches.get(url)
+        # A fetch started on another (since closed) event loop can't be awaited here
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _refresh_in_background(self, url: str) -> None:
+        if self._pending(url) is not None:
+            return
+        task = self._start_fetch(url)
+        # Retrieve the exception so a failed background refresh isn't reported as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def _fetch(self, url: str) -> 'asyncio.Future[_Document]':
+        task = self._pending(url) or self._start_fetch(url)
+        # Callers share one fetch; shield it so a cancelled caller doesn't cancel the others
+        return asyncio.shield(task)
+
+    def _start_fetch(self, url: str) -> asyncio.Task:
+        task = asyncio.ensure_future(self._download(url))
+        self._fetches[url] = task
+        task.add_done_callback(lambda t: self._fetches.pop(url, None) if self._fetches.get(url) is t else None)
+        return task
+
+    async def _download(self, url: str) -> _Document:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+            value = response.json()
+
+        now = time.time()
+        document = _Document(value, now, now + self._max_age(response.headers.get('cache-control', '')))
+        self._documents[url] = document
+        self._failed_at.pop(url, None)
+        if self.store is not None:
+            try:
+                await self.store.save(url, document)
+            except Exception as e:
+                print(f"⚠️ Failed to share {url} through Redis: {e}")
+        return document
+
+    def _max_age(self, cache_control: str) -> float:
+        match = _MAX_AGE.search(cache_control)
+        if match and 'no-store' not in cache_control and 'no-cache' not in cache_control:
+            return max(60.0, float(match.group(1)))
+        return self.ttl
+
+
+def make_document_store(backend: str = OIDC_CACHE_BACKEND) -> Optional[RedisDocumentStore]:
+    """The shared store for a backend name ('memory': none, 'redis')."""
+    if backend == 'redis':
+        return RedisDocumentStore()
+    if backend == 'memory':
+        return None
+    raise ValueError(f"Unknown OIDC cache backend: {backend}")
+
+
+def cached_oauth_app_class(provider: OIDCProvider):
+    """
+    An authlib Starlette OAuth2 app class that reads its metadata and
+    signing keys from `provider` instead of fetching them itself.
+
+    ID tokens are still checked by authlib (signature, issuer, audience,
+    expiry, nonce), locally, against the cached keys.
+    """
+    from authlib.integrations.starlette_client import StarletteOAuth2App
+
+    class CachedOIDCApp(StarletteOAuth2App):
+        async def load_server_metadata(self):
+            self.server_metadata.update(await provider.metadata())
+            return self.server_metadata
+
+        async def fetch_jwk_set(self, force=False):
+            return await provider.jwks(force=force)
+
+    return CachedOIDCApp
@@ -0,0 +1,295 @@
+"""
+Opt-in request profiling for Cloud Control Center.
+Runs a sampling profiler (pyinstrument) around single requests, triggered
+by an admin with `X-Profile: 1` / `?profile=1` or by a sampling rate, and
+stores the call tree for retrieval through the admin API.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import secrets
+import contextvars
+from urllib.parse import parse_qsl, urlencode
+from typing import Optional, Dict, Any, List, Callable
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.session import Session as ProfilerSession
+except ImportError:
+    Profiler = None
+    ProfilerSession = None
+
+
+# Fraction of all requests profiled without being asked (0 disables)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+
+# Sampling interval in seconds
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.001'))
+
+# 'disk' (this instance only) or 'redis' (shared by all instances)
+PROFILE_STORE = os.getenv('PROFILE_STORE', 'disk').lower()
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join('/tmp', 'cloud-control-center-profiles'))
+
+# Profiles kept (disk) / seconds each is kept (redis)
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))
+PROFILE_TTL = int(os.getenv('PROFILE_TTL', str(24 * 3600)))
+
+_PROFILE_ID = re.compile(r'^\d+-[0-9a-f]{8}$')
+
+# Set while the current request is being profiled
+_active: contextvars.ContextVar[Optional['RequestProfile']] = contextvars.ContextVar('active_profile', default=None)
+
+
+class RequestProfile:
+    """Profiler state for one request (event loop plus threadpool calls)."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.profile_id = f"{int(time.time() * 1000)}-{secrets.token_hex(4)}"
+        self.profiler = Profiler(interval=interval, async_mode='enabled')
+        self.thread_sessions: List[Any] = []
+
+    def run_in_thread(self, func: Callable, *args, **kwargs):
+        # pyinstrument samples one thread, so worker threads get their own profiler
+        profiler = Profiler(interval=self.profiler.interval, async_mode='disabled')
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            self.thread_sessions.append(profiler.last_session)
+
+    def session(self):
+        session = self.profiler.last_session
+        for thread_session in self.thread_sessions:
+            session = ProfilerSession.combine(session, thread_session)
+        return session
+
+
+async def run_sync(func: Callable, *args, **kwargs):
+    """
+    run_in_threadpool() that is included in the request's profile when profiled.
+
+    Example:
+        resources = await run_sync(list_all_resources, project_id)
+    """
+    profile = _active.get()
+    if profile is None:
+        return await run_in_threadpool(func, *args, **kwargs)
+    return await run_in_threadpool(profile.run_in_thread, func, *args, **kwargs)
+
+
+class DiskProfileStore:
+    """Profiles as files in PROFILE_DIR, newest PROFILE_KEEP kept."""
+
+    def __init__(self, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+
+    def _save(self, profile_id: str, meta: Dict[str, Any], html: str, text: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        for suffix, content in (('html', html), ('txt', text), ('json', json.dumps(meta))):
+            path = os.path.join(self.directory, f"{profile_id}.{suffix}")
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+
+        for stale in self._ids()[self.keep:]:
+            for suffix in ('html', 'txt', 'json'):
+                try:
+                    os.remove(os.path.join(self.directory, f"{stale}.{suffix}"))
+                except FileNotFoundError:
+                    pass
+
+    def _ids(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        ids = [name[:-5] for name in os.listdir(self.directory) if name.endswith('.json')]
+        # Ids start with a millisecond timestamp
+        return sorted(ids, key=lambda i: int(i.split('-')[0]), reverse=True)
+
+    def _read(self, profile_id: str, suffix: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.{suffix}"), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def save(self, profile_id: str, meta: Dict[str, Any], html: str, text: str) -> None:
+        await asyncio.to_thread(self._save, profile_id, meta, html, text)
+
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        def read_all():
+            metas = (self._read(i, 'json') for i in self._ids()[:limit])
+            return [json.loads(m) for m in metas if m]
+        return await asyncio.to_thread(read_all)
+
+    async def get(self, profile_id: str, fmt: str = 'html') -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        return await asyncio.to_thread(self._read, profile_id, 'txt' if fmt == 'text' else 'html')
+
+
+class RedisProfileStore:
+    """Profiles in Redis (hash per profile with a TTL, plus a sorted-set index)."""
+
+    def __init__(self, ttl: int = PROFILE_TTL, keep: int = PROFILE_KEEP):
+        from reusables.python.redis import get_async_redis_client, make_key
+
+        self.ttl = ttl
+        self.keep = keep
+        self.prefix = make_key('cloud-control-center', 'profile')
+        self.index_key = make_key('cloud-control-center', 'profiles')
+        self._client = get_async_redis_client()
+
+    async def save(self, profile_id: str, meta: Dict[str, Any], html: str, text: str) -> None:
+        key = f"{self.prefix}:{profile_id}"
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={'meta': json.dumps(meta), 'html': html, 'text': text})
+            pipe.expire(key, self.ttl)
+            pipe.zadd(self.index_key, {profile_id: meta['started_at']})
+            pipe.zremrangebyscore(self.index_key, 0, time.time() - self.ttl)
+            pipe.zremrangebyrank(self.index_key, 0, -self.keep - 1)
+            await pipe.execute()
+
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        ids = await self._client.zrevrange(self.index_key, 0, limit - 1)
+        if not ids:
+            return []
+        async with self._client.pipeline(transaction=False) as pipe:
+            for profile_id in ids:
+                pipe.hget(f"{self.prefix}:{profile_id}", 'meta')
+            metas = await pipe.execute()
+        return [json.loads(m) for m in metas if m]
+
+    async def get(self, profile_id: str, fmt: str = 'html') -> Optional[str]:
+        return await self._client.hget(f"{self.prefix}:{profile_id}", 'text' if fmt == 'text' else 'html')
+
+
+def make_profile_store(backend: str = PROFILE_STORE):
+    """Create the profile store for a backend name ('disk' or 'redis')."""
+    if backend == 'redis':
+        return RedisProfileStore()
+    if backend == 'disk':
+        return DiskProfileStore()
+    raise ValueError(f"Unknown profile store: {backend}")
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that ask for it, at no cost to those that don't.
+
+    A request is profiled when it carries `X-Profile: 1` or `?profile=1`
+    and the caller is an admin (checked only for flagged requests), or
+    when it falls in PROFILE_SAMPLE_RATE. The response carries
+    `X-Profile-Id`; the call tree is at /api/admin/profiles/{id}.
+
+    Must be added before the session middleware (so it runs inside it
+    and can see the session).
+
+    Usage:
+        app.add_middleware(ProfilingMiddleware, store=DiskProfileStore(), is_admin=is_admin)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store,
+        is_admin: Callable[[HTTPConnection], Any],
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        interval: float = PROFILE_INTERVAL
+    ):
+        self.app = app
+        self.store = store
+        self.is_admin = is_admin
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _flagged(self, scope: Scope) -> bool:
+        if b'profile=' in scope.get('query_string', b''):
+            query = HTTPConnection(scope).query_params
+            if query.get('profile') in ('1', 'true'):
+                return True
+        for name, value in scope['headers']:
+            if name == b'x-profile':
+                return value in (b'1', b'true')
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or Profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        if self._flagged(scope):
+            if await self.is_admin(HTTPConnection(scope)):
+                trigger = 'flag'
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trigger = 'sample'
+
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self._profile(scope, receive, send, trigger)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, trigger: str) -> None:
+        profile = RequestProfile(self.interval)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                MutableHeaders(scope=message).append('X-Profile-Id', profile.profile_id)
+            await send(message)
+
+        token = _active.set(profile)
+        started = time.time()
+        profile.profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.profiler.stop()
+            _active.reset(token)
+            try:
+                session = profile.session()
+                meta = {
+                    'id': profile.profile_id,
+                    'method': scope['method'],
+                    'path': scope['path'],
+                    'query': _redact_query(scope.get('query_string', b'')),
+                    'status': status,
+                    'trigger': trigger,
+                    'started_at': started,
+                    'duration': round(time.time() - started, 6),
+                    'samples': session.sample_count,
+                }
+                await self.store.save(profile.profile_id, meta, _render_html(session), _render_text(session))
+                print(f"🔬 Profiled {scope['method']} {scope['path']} ({trigger}): {profile.profile_id}")
+            except Exception as e:
+                print(f"⚠️ Failed to store profile {profile.profile_id}: {e}")
+
+
+def _redact_query(query_string: bytes) -> str:
+    """Parameter names only: values (OAuth code/state, emails) aren't stored with profiles."""
+    params = parse_qsl(query_string.decode('latin-1'), keep_blank_values=True)
+    return urlencode([(name, '-') for name, _ in params], safe='-')
+
+
+def _render_html(session) -> str:
+    from pyinstrument.renderers import HTMLRenderer
+    return HTMLRenderer().render(session)
+
+
+def _render_text(session) -> str:
+    from pyinstrument.renderers import ConsoleRenderer
+    return ConsoleRenderer(unicode=True, color=False, show_all=False).render(session)
@@ -0,0 +1,227 @@
+"""
+Fast JSON responses and response compression for Cloud Control Center.
+"""
+
+import json
+import zlib
+from typing import Any, Optional, List, Tuple, Iterable
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson (falls back to json).
+
+    Used as the app's default response class. Returning an instance
+    directly from a route also skips FastAPI's jsonable_encoder pass, which
+    dominates the cost of large inventory payloads.
+
+    Usage:
+        return FastJSONResponse({"resources": resources})
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Bodies smaller than this are sent uncompressed (not worth the overhead)
+DEFAULT_MINIMUM_SIZE = 1024
+
+# Streams that must reach the client unbuffered
+EXCLUDED_CONTENT_TYPES = ('text/event-stream',)
+
+# Formats that are compressed already (recompressing only costs CPU)
+COMPRESSED_CONTENT_TYPES = (
+    'image/png', 'image/jpeg', 'image/gif', 'image/webp', 'image/avif',
+    'font/woff', 'font/woff2', 'video/', 'audio/', 'application/zip', 'application/gzip',
+)
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check whether a response of this content type is worth compressing."""
+    return not content_type.startswith(EXCLUDED_CONTENT_TYPES + COMPRESSED_CONTENT_TYPES)
+
+
+def choose_encoding(accept_encoding: str, available: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Pick 'br' or 'gzip' from an Accept-Encoding header (q-values respected).
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header
+        available: Encodings to choose from, e.g. the precompressed
+                   variants of a file (default: whatever can be produced)
+
+    Returns:
+        'br', 'gzip' or None
+    """
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+
+    if available is None:
+        available = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    candidates: List[Tuple[float, int, str]] = []
+    if 'br' in available:
+        q = offered.get('br', offered.get('*', 0.0))
+        if q > 0:
+            candidates.append((q, 1, 'br'))
+    if 'gzip' in available:
+        q = offered.get('gzip', offered.get('*', 0.0))
+        if q > 0:
+            candidates.append((q, 0, 'gzip'))
+    return max(candidates)[2] if candidates else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: gzip container
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression.
+
+    Bodies below minimum_size, already-encoded responses, event streams and
+    already-compressed formats (PNG, WOFF2, ...) pass through untouched. Single-chunk bodies are compressed in one go
+    with an exact Content-Length; streamed bodies are compressed chunk by
+    chunk (flushed, so each chunk is decodable as it arrives).
+
+    Usage:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor: Optional[_Compressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self._passthrough = (
+                'content-encoding' in headers
+                or not is_compressible(content_type)
+                or message['status'] in (204, 304)
+            )
+            if self._passthrough:
+                await self._send(message)
+            else:
+                # Hold the headers until the first body chunk decides the framing
+                self._start = message
+            return
+
+        if message['type'] != 'http.response.body' or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self._start is not None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=start['headers'])
+
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self._compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            # The encoded bytes differ from the identity's, so a strong validator no longer holds
+            etag = headers.get('etag')
+            if etag and not etag.startswith('W/'):
+                headers['ETag'] = f'W/{etag}'
+
+            if not more_body:
+                compressed = self._compressor.compress(body) + self._compressor.finish()
+                headers['Content-Length'] = str(len(compressed))
+                await self._send(start)
+                await self._send({'type': 'http.response.body', 'body': compressed})
+                return
+
+            del headers['Content-Length']
+            await self._send(start)
+
+        chunk = self._compressor.compress(body) if body else b''
+        if not more_body:
+            chunk += self._compressor.finish()
+        if chunk or not more_body:
+            await self._send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
@@ -0,0 +1,301 @@
+"""
+Server-side sessions for Cloud Control Center.
+Session data lives in Redis (shared by every instance); the browser only
+holds an opaque session id, so per-request cookie cost stays flat however
+large the session grows and sessions can be revoked centrally.
+"""
+
+import os
+import re
+import json
+import time
+import secrets
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import count_cache_lookup
+
+
+# 'cookie' (signed cookie, single instance), 'redis' or 'memory' (dev/benchmarks)
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'cookie').lower()
+
+# Idle seconds before a session expires (renewed while it is used)
+SESSION_TTL = int(os.getenv('SESSION_TTL', str(14 * 24 * 3600)))
+
+# Minimum seconds between TTL renewals of the same session
+SESSION_TOUCH_INTERVAL = float(os.getenv('SESSION_TOUCH_INTERVAL', '60'))
+
+# Hot sessions kept in process, and for how long before Redis is re-read
+SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '1024'))
+SESSION_CACHE_TTL = float(os.getenv('SESSION_CACHE_TTL', '5'))
+
+# secrets.token_urlsafe(32)
+_SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+class Session(dict):
+    """Session dict that records whether it was changed during the request."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modified = False
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        self.modified = True
+        super().clear()
+
+    def pop(self, key, *default):
+        if key in self:
+            self.modified = True
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.modified = True
+        super().update(*args, **kwargs)
+
+
+class MemorySessionStore:
+    """In-process session store (one instance only; for development and benchmarks)."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, float]] = {}
+
+    async def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self._data.get(session_id)
+        if entry is None or entry[1] <= time.time():
+            self._data.pop(session_id, None)
+            return None
+        return json.loads(entry[0]), entry[1] - time.time()
+
+    async def save(self, session_id: str, data: Dict[str, Any], ttl: int) -> None:
+        self._data[session_id] = (json.dumps(data, default=str), time.time() + ttl)
+
+    async def touch(self, session_id: str, ttl: int) -> bool:
+        entry = self._data.get(session_id)
+        if entry is None:
+            return False
+        self._data[session_id] = (entry[0], time.time() + ttl)
+        return True
+
+    async def delete(self, session_id: str) -> None:
+        self._data.pop(session_id, None)
+
+
+class RedisSessionStore:
+    """
+    Session store on the shared Redis reusable (asyncio client).
+
+    Each session is one JSON string under '<prefix>:<id>' with a TTL, so
+    Redis expires idle sessions and any instance can read or revoke them.
+    """
+
+    def __init__(self, prefix: Optional[str] = None, client=None):
+        from reusables.python.redis import get_async_redis_client, make_key
+
+        self.prefix = prefix or make_key('cloud-control-center', 'session')
+        self._client = client or get_async_redis_client()
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}"
+
+    async def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Session data and its remaining TTL (one round trip), or None."""
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(session_id))
+            pipe.ttl(self._key(session_id))
+            value, ttl = await pipe.execute()
+        if value is None:
+            return None
+        return json.loads(value), float(ttl)
+
+    async def save(self, session_id: str, data: Dict[str, Any], ttl: int) -> None:
+        await self._client.set(self._key(session_id), json.dumps(data, default=str), ex=ttl)
+
+    async def touch(self, session_id: str, ttl: int) -> bool:
+        return bool(await self._client.expire(self._key(session_id), ttl))
+
+    async def delete(self, session_id: str) -> None:
+        await self._client.delete(self._key(session_id))
+
+
+def make_session_store(backend: str = SESSION_BACKEND):
+    """
+    Create the session store for a backend name.
+
+    Args:
+        backend: 'redis' or 'memory'
+    """
+    if backend == 'redis':
+        return RedisSessionStore()
+    if backend == 'memory':
+        return MemorySessionStore()
+    raise ValueError(f"Unknown session backend: {backend}")
+
+
+class _SessionCache:
+    """LRU of session id -> (data, loaded_at, touched_at)."""
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[Dict[str, Any], float, float]]' = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.ttl:
+            del self._entries[session_id]
+            return None
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def put(self, session_id: str, data: Dict[str, Any], touched_at: float) -> None:
+        if self.size <= 0:
+            return
+        self._entries[session_id] = (data, time.monotonic(), touched_at)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def mark_touched(self, session_id: str, touched_at: float) -> None:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._entries[session_id] = (entry[0], entry[1], touched_at)
+
+    def discard(self, session_id: str) -> None:
+        self._entries.pop(session_id, None)
+
+
+class ServerSessionMiddleware:
+    """
+    Drop-in replacement for Starlette's SessionMiddleware with server-side storage.
+
+    request.session behaves as before. The cookie carries only a random
+    43-character id; data is read from a short-lived in-process cache or
+    the store and written back only when the session was modified. Each
+    write issues a fresh id (old one deleted), clearing the session deletes
+    it, and the idle TTL slides at most once per touch_interval.
+
+    Note: only top-level changes are detected, so reassign nested values
+    (request.session['user'] = {...}) rather than mutating them in place.
+
+    Usage:
+        app.add_middleware(ServerSessionMiddleware, store=RedisSessionStore())
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store,
+        session_cookie: str = 'session',
+        max_age: int = SESSION_TTL,
+        path: str = '/',
+        same_site: str = 'lax',
+        https_only: bool = False,
+        touch_interval: float = SESSION_TOUCH_INTERVAL,
+        cache_size: int = SESSION_CACHE_SIZE,
+        cache_ttl: float = SESSION_CACHE_TTL
+    ):
+        self.app = app
+        self.store = store
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.touch_interval = touch_interval
+        self.cache = _SessionCache(cache_size, cache_ttl)
+        self.cookie_flags = f"path={path}; httponly; samesite={same_site}"
+        if https_only:
+            self.cookie_flags += "; secure"
+
+    async def _load(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        cached = self.cache.get(session_id)
+        count_cache_lookup('session', cached is not None)
+        if cached is not None:
+            return cached[0], cached[2]
+
+        loaded = await self.store.load(session_id)
+        if loaded is None:
+            return None, 0.0
+        data, remaining = loaded
+        # The TTL was last renewed (max_age - remaining) seconds ago, by
+        # whichever instance served the session
+        touched_at = time.monotonic() - max(0.0, self.max_age - remaining)
+        self.cache.put(session_id, data, touched_at)
+        return data, touched_at
+
+    def _cookie(self, value: str, max_age: int) -> str:
+        return f"{self.session_cookie}={value}; Max-Age={max_age}; {self.cookie_flags}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+
+        session_id = HTTPConnection(scope).cookies.get(self.session_cookie)
+        data, touched_at = None, 0.0
+        if session_id and _SESSION_ID.match(session_id):
+            data, touched_at = await self._load(session_id)
+        if data is None:
+            session_id = None
+
+        session = Session(data or {})
+        scope['session'] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                cookie = await self._commit(session, session_id, touched_at)
+                if cookie:
+                    MutableHeaders(scope=message).append('Set-Cookie', cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _commit(self, session: Session, session_id: Optional[str], touched_at: float) -> Optional[str]:
+        """Persist the session; returns a Set-Cookie value if the cookie changes."""
+        if session.modified:
+            if session_id:
+                self.cache.discard(session_id)
+            if not session:
+                if session_id:
+                    await self.store.delete(session_id)
+                    return self._cookie('null', 0)
+                return None
+
+            # New id on every write, so ids issued before login never gain privileges
+            new_id = secrets.token_urlsafe(32)
+            data = dict(session)
+            await self.store.save(new_id, data, self.max_age)
+            if session_id:
+                await self.store.delete(session_id)
+            self.cache.put(new_id, data, time.monotonic())
+            return self._cookie(new_id, self.max_age)
+
+        if session_id and time.monotonic() - touched_at >= self.touch_interval:
+            if await self.store.touch(session_id, self.max_age):
+                self.cache.mark_touched(session_id, time.monotonic())
+                return self._cookie(session_id, self.max_age)
+            # Revoked or expired elsewhere
+            self.cache.discard(session_id)
+            return self._cookie('null', 0)
+        return None
@@ -0,0 +1,252 @@
+"""
+Static file serving for the Cloud Control Center dashboard build.
+Indexes the SvelteKit build once, keeps small files and their gzip /
+brotli variants in memory, and answers with long-lived cache headers
+for hashed assets and cheap 304s for everything else.
+"""
+
+import os
+import gzip
+import asyncio
+import hashlib
+import mimetypes
+import threading
+from email.utils import formatdate
+from typing import Optional, Dict, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, FileResponse, PlainTextResponse
+from starlette.types import Receive, Scope, Send
+
+from responses import choose_encoding, is_compressible, brotli
+from conditional import is_not_modified
+
+
+# Files up to this size (bytes) are held in memory; larger ones are streamed from disk
+STATIC_INLINE_MAX = int(os.getenv('STATIC_INLINE_MAX', str(512 * 1024)))
+
+# Files smaller than this (bytes) aren't worth compressing
+STATIC_COMPRESS_MIN = int(os.getenv('STATIC_COMPRESS_MIN', '1024'))
+
+# Content-hashed build output never changes under the same URL
+IMMUTABLE_PREFIX = '_app/immutable/'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Everything else (index.html, favicon, version.json) is revalidated on each use
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Path prefixes that belong to the backend: unknown paths under them are 404s,
+# never the client-side routing fallback
+FALLBACK_EXCLUDE = ('api', 'auth')
+
+# Precompressed siblings written by the build (adapter-static precompress)
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+mimetypes.add_type('application/javascript', '.js')
+mimetypes.add_type('application/javascript', '.mjs')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('image/svg+xml', '.svg')
+
+
+class _Variant:
+    """One encoding of a file: bytes in memory, or a path to stream."""
+    __slots__ = ('body', 'path', 'size', 'etag')
+
+    def __init__(self, body: Optional[bytes], path: Optional[str], size: int, etag: str):
+        self.body = body
+        self.path = path
+        self.size = size
+        self.etag = etag
+
+
+class _Asset:
+    __slots__ = ('content_type', 'cache_control', 'mtime', 'last_modified', 'variants')
+
+    def __init__(self, content_type: str, cache_control: str, mtime: float):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.mtime = mtime
+        self.last_modified = formatdate(mtime, usegmt=True)
+        # Keyed by content-encoding; 'identity' is always present
+        self.variants: Dict[str, _Variant] = {}
+
+
+def _content_type(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class StaticAssets:
+    """
+    ASGI app serving a static site build (replaces StaticFiles).
+
+    The directory is indexed once: files up to STATIC_INLINE_MAX are read
+    into memory together with gzip/brotli variants (taken from the build's
+    .gz/.br files, or compressed here), each with a strong ETag. Requests
+    are then answered from the index without touching the disk, 304s
+    included. Hashed files under _app/immutable/ are sent with a year-long
+    immutable Cache-Control; other files must be revalidated.
+
+    Unknown extension-less paths get `fallback` (client-side routing),
+    but only for requests that accept text/html (page loads) and outside
+    the `fallback_exclude` prefixes, so a mistyped /api/... route is a 404
+    rather than index.html with a 200.
+    Restart the app after rebuilding the dashboard.
+
+    Usage:
+        static = StaticAssets('dashboard/build')
+        app.mount('/', static, name='dashboard')
+        # Index in the background; keep a reference to the task
+        app.state.static_load = asyncio.create_task(static.load())
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fallback: Optional[str] = 'index.html',
+        fallback_exclude: Tuple[str, ...] = FALLBACK_EXCLUDE,
+        inline_max: int = STATIC_INLINE_MAX,
+        compress_min: int = STATIC_COMPRESS_MIN
+    ):
+        self.directory = os.path.abspath(directory)
+        self.fallback = fallback
+        self.fallback_exclude = fallback_exclude
+        self.inline_max = inline_max
+        self.compress_min = compress_min
+        self._assets: Optional[Dict[str, _Asset]] = None
+        self._lock = threading.Lock()
+
+    async def load(self) -> None:
+        """Index the directory in a worker thread (no-op once loaded)."""
+        if self._assets is None:
+            await asyncio.to_thread(self.scan)
+
+    def scan(self) -> Dict[str, _Asset]:
+        """Index the directory (runs once; concurrent callers wait for it)."""
+        with self._lock:
+            if self._assets is None:
+                self._assets = self._index()
+                inline = sum(v.size for a in self._assets.values() for v in a.variants.values() if v.body is not None)
+                print(f"✅ Indexed {len(self._assets)} static files ({inline / 1024:.0f} KiB in memory)")
+            return self._assets
+
+    def _index(self) -> Dict[str, _Asset]:
+        assets: Dict[str, _Asset] = {}
+        for root, _, files in os.walk(self.directory):
+            names = set(files)
+            for name in files:
+                # Precompressed siblings are attached to their original below
+                if any(name.endswith(s) and name[:-len(s)] in names for s in ENCODING_SUFFIXES.values()):
+                    continue
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                try:
+                    assets[key] = self._load_asset(key, path)
+                except OSError as e:
+                    print(f"⚠️ Skipping static file {key}: {e}")
+        return assets
+
+    def _load_asset(self, key: str, path: str) -> _Asset:
+        stat = os.stat(path)
+        cache_control = IMMUTABLE_CACHE_CONTROL if key.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE_CONTROL
+        asset = _Asset(_content_type(path), cache_control, stat.st_mtime)
+
+        if stat.st_size > self.inline_max:
+            # Too large to hold: stream from disk, using the build's variants if any
+            base = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+            asset.variants['identity'] = _Variant(None, path, stat.st_size, f'"{base}"')
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                if os.path.isfile(path + suffix):
+                    size = os.path.getsize(path + suffix)
+                    asset.variants[encoding] = _Variant(None, path + suffix, size, f'"{base}-{encoding}"')
+            return asset
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        base = hashlib.sha256(body).hexdigest()[:32]
+        asset.variants['identity'] = _Variant(body, None, len(body), f'"{base}"')
+        if len(body) < self.compress_min or not is_compressible(asset.content_type):
+            return asset
+
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if os.path.isfile(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    encoded = f.read()
+            elif encoding == 'br' and brotli is None:
+                continue
+            else:
+                encoded = _compress(body, encoding)
+            # Keep a variant only if it actually saves bytes
+            if len(encoded) < len(body):
+                asset.variants[encoding] = _Variant(encoded, None, len(encoded), f'"{base}-{encoding}"')
+        return asset
+
+    def _lookup(self, assets: Dict[str, _Asset], path: str, accepts_html: bool) -> Optional[_Asset]:
+        key = path.strip('/')
+        for candidate in (key, f'{key}/index.html' if key else 'index.html', f'{key}.html'):
+            if candidate in assets:
+                return assets[candidate]
+        # Client-side routes look like /projects/x; missing files (/x.js,
+        # /_app/...), backend paths and non-page requests stay 404s
+        if not self.fallback or not accepts_html or '.' in key.rsplit('/', 1)[-1]:
+            return None
+        top = key.split('/', 1)[0]
+        if top == '_app' or top in self.fallback_exclude:
+            return None
+        return assets.get(self.fallback)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope['type'] == 'http'
+        request = Request(scope)
+        if request.method not in ('GET', 'HEAD'):
+            response = PlainTextResponse('Method Not Allowed', status_code=405, headers={'Allow': 'GET, HEAD'})
+            return await response(scope, receive, send)
+
+        assets = self._assets
+        if assets is None:
+            await self.load()
+            assets = self._assets
+
+        path = scope['path']
+        root_path = scope.get('root_path', '')
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+
+        asset = self._lookup(assets, path, 'text/html' in request.headers.get('accept', ''))
+        if asset is None:
+            return await PlainTextResponse('Not Found', status_code=404)(scope, receive, send)
+
+        encodings = [e for e in asset.variants if e != 'identity']
+        encoding = choose_encoding(request.headers.get('accept-encoding', ''), encodings) if encodings else None
+        variant = asset.variants[encoding or 'identity']
+
+        headers = {
+            'ETag': variant.etag,
+            'Last-Modified': asset.last_modified,
+            'Cache-Control': asset.cache_control,
+        }
+        if encodings:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if is_not_modified(request, variant.etag, asset.mtime):
+            return await Response(status_code=304, headers=headers)(scope, receive, send)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        if variant.body is None:
+            response = FileResponse(variant.path, headers=headers, media_type=asset.content_type)
+        else:
+            headers['Content-Length'] = str(variant.size)
+            body = b'' if request.method == 'HEAD' else variant.body
+            response = Response(body, headers=headers, media_type=asset.content_type)
+        await response(scope, receive, send)
@@ -0,0 +1,159 @@
+"""
+Benchmark the Cloud Control Center API against the fake gcloud.
+
+Calls the endpoints in-process with FastAPI's TestClient and a signed
+session cookie for admin@example.com (an admin in the generated IAM
+policy), and fails on regressions against stored baselines. Also checks
+that an inventory refresh during injected gcloud failures keeps the
+snapshot and its sync time, and that the failures change the resources
+ETag.
+
+Usage (from cloud-control-center):
+    python benchmarks/bench_api.py --sizes 10,1000
+    python benchmarks/bench_api.py --update-baselines
+"""
+
+import os
+import sys
+import json
+import base64
+
+# Same path setup as api/main.py
+api_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'api'))
+sys.path.insert(0, os.path.abspath(os.path.join(api_path, '../..')))
+sys.path.insert(0, api_path)
+
+from itsdangerous import TimestampSigner
+from fastapi.testclient import TestClient
+from reusables.python.gcp.fake import use_fake_gcloud, reset_gcp_state, inject_gcloud_failures
+from reusables.python.gcp import MemorySnapshotBackend, InventoryStore
+from reusables.python.gcp.benchmarks.harness import parse_args, run_cases, report
+
+
+PROJECT_ID = 'fake-project'
+DEFAULT_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+
+def session_cookie(user: dict, secret: str) -> str:
+    """Sign a session the way starlette's SessionMiddleware does."""
+    data = base64.b64encode(json.dumps({'user': user}).encode('utf-8'))
+    return TimestampSigner(secret).sign(data).decode('utf-8')
+
+
+def build_cases(client: TestClient):
+    """Benchmark cases as (name, run, setup)."""
+    def get(path: str):
+        def run():
+            response = client.get(path)
+            assert response.status_code == 200, f'{path}: {response.status_code} {response.text[:200]}'
+        return run
+
+    def cold():
+        reset_gcp_state()
+
+    def refresh():
+        response = client.post('/api/resources/refresh')
+        assert response.status_code == 200, f'refresh: {response.status_code} {response.text[:200]}'
+
+    return [
+        ('GET /api/user', get('/api/user'), cold),
+        ('POST /api/resources/refresh', refresh, cold),
+        ('GET /api/resources', get('/api/resources'), refresh),
+        ('GET /api/resources?projection=full', get('/api/resources?projection=full'), cold),
+        ('GET /api/resources/search', get('/api/resources/search?status=RUNNING&label=env=prod&sort=-location'), None),
+        ('GET /api/users', get('/api/users'), cold),
+    ]
+
+
+def check_failed_refresh() -> bool:
+    """
+    Check that a refresh where gcloud fails doesn't look like a fresh, empty inventory.
+
+    Returns:
+        True if the snapshot and synced_at survived and the failures were recorded
+    """
+    from inventory_state import InventoryState
+
+    with use_fake_gcloud(instances=5, services=3, buckets=2, project_id=PROJECT_ID):
+        state = InventoryState(PROJECT_ID)
+        state.store = InventoryStore(PROJECT_ID, backend=MemorySnapshotBackend())
+        state.sync(force=True)
+        synced_at = state.synced_at
+        before = {key: len(items) for key, items in state.resources().items()}
+        with inject_gcloud_failures('permission'):
+            deltas = state.sync(force=True)
+        after = {key: len(items) for key, items in state.resources().items()}
+
+    expected = {'compute_instances', 'cloud_run_services', 'storage_buckets'}
+    ok = (
+        not deltas and after == before and state.synced_at == synced_at
+        and expected <= set(state.last_errors) and expected <= set(state.failing_since)
+    )
+    if not ok:
+        print(f"❌ Failed refresh: deltas {list(deltas)}, snapshot {before} -> {after}, "
+              f"synced_at {synced_at} -> {state.synced_at}, errors {sorted(state.last_errors)}")
+        return False
+    print(f"✅ Failed refresh kept the snapshot and sync time; failing: {', '.join(sorted(state.failing_since))}")
+    return True
+
+
+def check_stale_etag(client: TestClient) -> bool:
+    """
+    Check that /api/resources stops answering 304 once a provider starts failing.
+
+    Returns:
+        True if the revalidation after the failure got a 200 listing the failing types
+    """
+    from inventory_state import get_inventory_state
+
+    with use_fake_gcloud(instances=5, services=3, buckets=2, project_id=PROJECT_ID):
+        state = get_inventory_state(PROJECT_ID)
+        state.sync(force=True)
+        etag = client.get('/api/resources').headers.get('etag')
+        unchanged = client.get('/api/resources', headers={'If-None-Match': etag})
+        with inject_gcloud_failures('permission'):
+            state.sync(force=True)
+            failing = client.get('/api/resources', headers={'If-None-Match': etag})
+        state.sync(force=True)
+
+    ok = unchanged.status_code == 304 and failing.status_code == 200 and failing.json().get('failing')
+    if not ok:
+        print(f"❌ Stale ETag: unchanged poll {unchanged.status_code}, "
+              f"poll after provider failures {failing.status_code} (expected 304 then 200)")
+        return False
+    print(f"✅ Provider failures change the /api/resources ETag; failing: {', '.join(failing.json()['failing'])}")
+    return True
+
+
+def main(argv=None) -> int:
+    args = parse_args('Benchmark the Cloud Control Center API against the fake gcloud', argv=argv)
+
+    os.environ.setdefault('GCLOUD_RATE_LIMIT', '1000')
+    os.environ['GCP_PROJECT_ID'] = PROJECT_ID
+    # The benchmark signs its own session cookie
+    os.environ['SESSION_BACKEND'] = 'cookie'
+    from main import app
+    from auth import SESSION_SECRET
+
+    client = TestClient(app)
+    client.cookies.set('session', session_cookie(
+        {'email': 'admin@example.com', 'name': 'Benchmark Admin', 'picture': ''}, SESSION_SECRET
+    ))
+
+    refresh_ok = check_failed_refresh() & check_stale_etag(client)
+
+    results = {}
+    for size in args.sizes:
+        print(f"\n📦 Generating fixtures: {size} of each resource, {size} IAM members")
+        with use_fake_gcloud(
+            instances=size, services=size, buckets=size, members=size, project_id=PROJECT_ID,
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, failure_rate=args.failure_rate
+        ):
+            results.update(run_cases(build_cases(client), prefix=f'{size}', repeats=args.repeats))
+
+    status = report(results, args.baselines or DEFAULT_BASELINES, args.tolerance, args.update_baselines, args.check)
+    return status or (0 if refresh_ok else 1)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
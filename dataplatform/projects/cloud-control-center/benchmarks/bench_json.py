@@ -0,0 +1,80 @@
+"""
+Benchmark JSON serialization and compression of inventory payloads.
+
+Compares FastAPI's default path (jsonable_encoder + JSONResponse) with
+FastJSONResponse, and times gzip/brotli on the result. Fails on
+regressions against stored baselines.
+
+Usage (from cloud-control-center):
+    python benchmarks/bench_json.py --sizes 1000,10000
+    python benchmarks/bench_json.py --update-baselines
+"""
+
+import os
+import sys
+import gzip
+
+api_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'api'))
+sys.path.insert(0, os.path.abspath(os.path.join(api_path, '../..')))
+sys.path.insert(0, api_path)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from reusables.python.gcp.fake import make_instances, make_services, make_buckets
+from reusables.python.gcp.benchmarks.harness import parse_args, run_cases, report
+from responses import FastJSONResponse, brotli, orjson
+
+
+DEFAULT_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines_json.json')
+
+
+def make_payload(size: int) -> dict:
+    """An /api/resources?projection=full shaped payload."""
+    resources = {
+        'compute_instances': make_instances(size),
+        'cloud_run_services': make_services(size),
+        'storage_buckets': make_buckets(size),
+    }
+    return {
+        'success': True,
+        'project_id': 'fake-project',
+        'resources': resources,
+        'counts': {key: len(items) for key, items in resources.items()},
+    }
+
+
+def build_cases(payload: dict):
+    """Benchmark cases as (name, run, setup)."""
+    body = FastJSONResponse(payload).body
+
+    cases = [
+        ('default_encoder_response', lambda: JSONResponse(jsonable_encoder(payload)), None),
+        ('default_response', lambda: JSONResponse(payload), None),
+        ('fast_response', lambda: FastJSONResponse(payload), None),
+        ('gzip_6', lambda: gzip.compress(body, compresslevel=6), None),
+    ]
+    if brotli is not None:
+        cases.append(('brotli_4', lambda: brotli.compress(body, quality=4), None))
+    return cases
+
+
+def main(argv=None) -> int:
+    args = parse_args('Benchmark JSON serialization and compression', default_sizes='100,1000,10000', argv=argv)
+    if orjson is None:
+        print("⚠️ orjson is not installed; FastJSONResponse falls back to json")
+
+    results = {}
+    for size in args.sizes:
+        payload = make_payload(size)
+        body = FastJSONResponse(payload).body
+        sizes = f"{len(body) / 1e6:.2f} MB JSON, gzip {len(gzip.compress(body, 6)) / 1e6:.2f} MB"
+        if brotli is not None:
+            sizes += f", brotli {len(brotli.compress(body, quality=4)) / 1e6:.2f} MB"
+        print(f"\n📦 {size} of each resource: {sizes}")
+        results.update(run_cases(build_cases(payload), prefix=f'{size}', repeats=args.repeats))
+
+    return report(results, args.baselines or DEFAULT_BASELINES, args.tolerance, args.update_baselines, args.check)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
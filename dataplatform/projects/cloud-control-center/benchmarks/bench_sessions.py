@@ -0,0 +1,78 @@
+"""
+Benchmark per-request session overhead as session contents grow.
+
+Times one authenticated request through Starlette's signed-cookie
+SessionMiddleware and through ServerSessionMiddleware (in-memory store,
+local cache hit), with sessions of the given sizes in bytes. Fails on
+regressions against stored baselines.
+
+Usage (from cloud-control-center):
+    python benchmarks/bench_sessions.py --sizes 100,2000,20000
+    python benchmarks/bench_sessions.py --update-baselines
+"""
+
+import os
+import sys
+
+api_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'api'))
+sys.path.insert(0, os.path.abspath(os.path.join(api_path, '../..')))
+sys.path.insert(0, api_path)
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.middleware.sessions import SessionMiddleware
+from reusables.python.gcp.benchmarks.harness import parse_args, run_cases, report
+from sessions import ServerSessionMiddleware, MemorySessionStore
+
+
+DEFAULT_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines_sessions.json')
+
+
+def make_app(server_side: bool) -> FastAPI:
+    app = FastAPI()
+    if server_side:
+        app.add_middleware(ServerSessionMiddleware, store=MemorySessionStore())
+    else:
+        app.add_middleware(SessionMiddleware, secret_key='benchmark-secret')
+
+    @app.get('/login')
+    async def login(request: Request, size: int):
+        request.session['user'] = {'email': 'admin@example.com', 'claims': 'x' * size}
+        return {}
+
+    @app.get('/me')
+    async def me(request: Request):
+        return {'email': request.session['user']['email']}
+
+    return app
+
+
+def build_cases(size: int):
+    """Benchmark cases as (name, run, setup)."""
+    cases = []
+    for name, server_side in (('cookie_session', False), ('server_session', True)):
+        client = TestClient(make_app(server_side))
+        client.get('/login', params={'size': size})
+
+        def run(client=client):
+            response = client.get('/me')
+            assert response.status_code == 200, f'/me: {response.status_code} {response.text[:200]}'
+
+        cases.append((name, run, None))
+        print(f"🍪 {name}: cookie is {len(client.cookies.get('session'))} bytes")
+    return cases
+
+
+def main(argv=None) -> int:
+    args = parse_args('Benchmark session middleware overhead', default_sizes='100,2000,20000', argv=argv)
+
+    results = {}
+    for size in args.sizes:
+        print(f"\n📦 Session of ~{size} bytes")
+        results.update(run_cases(build_cases(size), prefix=f'{size}', repeats=args.repeats))
+
+    return report(results, args.baselines or DEFAULT_BASELINES, args.tolerance, args.update_baselines, args.check)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark cold start of the Cloud Control Center API.
+
+Starts fresh interpreters (against the fake gcloud) that import main.py,
+run the app's startup and serve one /api/health request, the way a
+Cloud Run instance scaling from zero does. Fails when the median time to
+the first response exceeds the budget, or when modules that should only
+load on first use (authlib, Redis, Gemini) were imported.
+
+Usage (from cloud-control-center):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --budget-ms 800
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+api_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'api'))
+sys.path.insert(0, os.path.abspath(os.path.join(api_path, '../..')))
+
+from reusables.python.gcp.fake import use_fake_gcloud
+
+
+# Loaded on first use only (login, Redis-backed stores, Gemini)
+LAZY_MODULES = ('authlib', 'redis', 'google.genai')
+
+# Runs in the child: timestamps are relative to interpreter start-up
+CHILD = r'''
+import sys, json, time, asyncio
+started = time.perf_counter()
+sys.path.insert(0, {api_path!r})
+import main
+imported = time.perf_counter()
+
+# The benchmark's own client, not part of the app's start-up
+import httpx
+harness = time.perf_counter() - imported
+
+async def first_request():
+    begin = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://startup') as client:
+            response = await client.get('/api/health')
+        assert response.status_code == 200, response.status_code
+        return ready - begin, time.perf_counter() - ready, time.time()
+
+startup, first_request, responded_at = asyncio.run(first_request())
+print(json.dumps({{
+    'responded_at': responded_at,
+    'harness': harness,
+    'import': imported - started,
+    'startup': startup,
+    'first_request': first_request,
+    'modules': sorted({{m.split('.')[0] if m.split('.')[0] != 'google' else '.'.join(m.split('.')[:2])
+                       for m in sys.modules}}),
+}}))
+'''
+
+
+def run_once(env: dict) -> dict:
+    """Time one cold start in a fresh interpreter."""
+    started = time.time()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD.format(api_path=api_path)],
+        capture_output=True, text=True, env=env, cwd=api_path, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Start-up failed:\n{result.stderr[-2000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    # Up to the first response (shutting the app down again doesn't count)
+    timings['total'] = timings.pop('responded_at') - started - timings.pop('harness')
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark Cloud Control Center cold start')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts to time (default: 5)')
+    parser.add_argument('--budget-ms', type=float, default=1000,
+                        help='Maximum median ms from process start to the first response (default: 1000)')
+    parser.add_argument('--session-backend', default='cookie', help='SESSION_BACKEND for the app (default: cookie)')
+    args = parser.parse_args()
+
+    runs = []
+    with use_fake_gcloud():
+        env = dict(os.environ, SESSION_BACKEND=args.session_backend, PYTHONDONTWRITEBYTECODE='1')
+        # One untimed run so every timed one sees the same warm OS file cache
+        run_once(env)
+        for _ in range(max(1, args.runs)):
+            runs.append(run_once(env))
+
+    print(f"\n{'phase':<15} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in ('import', 'startup', 'first_request', 'total'):
+        values = [r[phase] * 1000 for r in runs]
+        print(f"{phase:<15} {statistics.median(values):>10.1f} {min(values):>8.1f} {max(values):>8.1f}")
+
+    failed = False
+    total = statistics.median(r['total'] for r in runs) * 1000
+    if total > args.budget_ms:
+        print(f"\n❌ Median cold start {total:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+
+    loaded = sorted(set(runs[0]['modules']) & set(LAZY_MODULES))
+    if args.session_backend == 'cookie' and loaded:
+        print(f"\n❌ Imported at start-up, should load on first use: {', '.join(loaded)}")
+        failed = True
+
+    if not failed:
+        print(f"\n✅ Cold start {total:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""
+Load test the Cloud Control Center API against the fake gcloud.
+
+Starts the app under uvicorn (N workers) with the fake gcloud, injects
+authenticated sessions without Google OAuth (a signed cookie, or a
+session written straight into Redis), then drives a weighted mix of
+dashboard calls and role mutations at increasing concurrency. Reports
+p50/p95/p99 latency, throughput and error rate per level and endpoint.
+
+Usage (from cloud-control-center):
+    python benchmarks/load_test.py --concurrency 1,8,32 --duration 10
+    python benchmarks/load_test.py --workers 4 --session-backend redis --redis-host localhost
+    python benchmarks/load_test.py --authz-cache-ttl 0 --gcloud-cache off --output no-cache.json
+    python benchmarks/load_test.py --url http://localhost:8080 --secret "$SESSION_SECRET"
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import secrets
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any, List
+
+api_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'api'))
+sys.path.insert(0, os.path.abspath(os.path.join(api_path, '../..')))
+sys.path.insert(0, api_path)
+
+import httpx
+from reusables.python.gcp.fake import use_fake_gcloud
+from bench_api import session_cookie
+
+
+PROJECT_ID = 'fake-project'
+ADMIN_EMAIL = 'admin@example.com'
+
+# Endpoint -> weight; mutations grant/revoke a viewer role on synthetic users
+DEFAULT_MIX = 'user=40,resources=35,users=15,search=5,mutate=5'
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ============================================================================
+# VIRTUAL USERS
+# ============================================================================
+
+class VirtualUser:
+    """One dashboard user: its own session cookie and remembered ETags."""
+
+    def __init__(self, client: httpx.AsyncClient, cookie: str, admin_cookie: str):
+        self.client = client
+        self.cookie = cookie
+        self.admin_cookie = admin_cookie
+        self.etags: Dict[str, str] = {}
+        self.granted: set = set()
+
+    async def get(self, path: str, admin: bool = False) -> int:
+        headers = {'Cookie': f"session={self.admin_cookie if admin else self.cookie}"}
+        # Browsers revalidate no-cache responses with If-None-Match
+        if path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        response = await self.client.get(path, headers=headers)
+        if 'etag' in response.headers:
+            self.etags[path] = response.headers['etag']
+        return response.status_code
+
+    async def mutate(self) -> int:
+        email = f"loadtest-{random.randrange(20):03d}@example.com"
+        change = {'email': email, 'role': 'viewer'}
+        body = {'revokes': [change]} if email in self.granted else {'grants': [change]}
+        response = await self.client.post(
+            '/api/users/roles/batch', json=body, headers={'Cookie': f"session={self.admin_cookie}"}
+        )
+        # 202: queued as a job (timed until accepted; per-project IAM jobs run in order)
+        if response.status_code in (200, 202):
+            self.granted ^= {email}
+        return response.status_code
+
+
+ENDPOINTS = {
+    'user': lambda vu: vu.get('/api/user'),
+    'resources': lambda vu: vu.get('/api/resources'),
+    'users': lambda vu: vu.get('/api/users', admin=True),
+    'search': lambda vu: vu.get('/api/resources/search?status=RUNNING&limit=50'),
+    'mutate': lambda vu: vu.mutate(),
+}
+
+
+async def run_level(
+    base_url: str,
+    cookies: List[str],
+    admin_cookie: str,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    timeout: float
+) -> Dict[str, Any]:
+    """Run `concurrency` virtual users in closed loops for `duration` seconds."""
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    statuses: Dict[str, int] = {}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def loop(index: int):
+            vu = VirtualUser(client, cookies[index % len(cookies)], admin_cookie)
+            while time.perf_counter() < deadline:
+                name = random.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status = await ENDPOINTS[name](vu)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - started
+                samples[name].append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if not isinstance(status, int) or status >= 400:
+                    errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    def summarize(values: List[float], failed: int) -> Dict[str, Any]:
+        values = sorted(values)
+        return {
+            'requests': len(values),
+            'errors': failed,
+            'error_rate': round(failed / len(values), 4) if values else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+        }
+
+    every = [v for values in samples.values() for v in values]
+    total = summarize(every, sum(errors.values()))
+    total['throughput_rps'] = round(len(every) / elapsed, 1) if elapsed else 0.0
+    return {
+        'concurrency': concurrency,
+        'duration': round(elapsed, 2),
+        'total': total,
+        'endpoints': {name: summarize(samples[name], errors[name]) for name in names if samples[name]},
+        'statuses': statuses,
+    }
+
+
+# ============================================================================
+# SERVER & SESSIONS
+# ============================================================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start uvicorn on the API and wait until /api/health answers."""
+    command = [
+        sys.executable, '-m', 'uvicorn', 'main:app',
+        '--app-dir', api_path, '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--log-level', 'warning', '--no-access-log',
+    ]
+    process = subprocess.Popen(command, env={**os.environ, **env}, stdout=subprocess.DEVNULL)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/api/health', timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def redis_sessions(users: List[dict], host: str, port: int) -> List[str]:
+    """Write sessions straight into Redis the way ServerSessionMiddleware stores them."""
+    import redis.asyncio
+    from sessions import RedisSessionStore, SESSION_TTL
+
+    client = redis.asyncio.Redis(host=host, port=port, decode_responses=True)
+    try:
+        store = RedisSessionStore(client=client)
+        ids = []
+        for user in users:
+            session_id = secrets.token_urlsafe(32)
+            await store.save(session_id, {'user': user}, SESSION_TTL)
+            ids.append(session_id)
+        return ids
+    finally:
+        await client.aclose()
+
+
+def make_cookies(args, users: List[dict], secret: str) -> List[str]:
+    if args.session_backend == 'redis':
+        return asyncio.run(redis_sessions(users, args.redis_host, args.redis_port))
+    return [session_cookie(user, secret) for user in users]
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def print_level(result: Dict[str, Any]) -> None:
+    total = result['total']
+    print(
+        f"\n👥 concurrency {result['concurrency']}: {total['throughput_rps']} req/s, "
+        f"{total['requests']} requests, {total['error_rate'] * 100:.1f}% errors"
+    )
+    print(f"{'endpoint':<12} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in list(result['endpoints'].items()) + [('all', total)]:
+        print(
+            f"{name:<12} {stats['requests']:>9} {stats['errors']:>7} "
+            f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+        )
+    if any(not s.isdigit() or int(s) >= 400 for s in result['statuses']):
+        print(f"⚠️ statuses: {result['statuses']}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Load test the Cloud Control Center API')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per level')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f'Endpoint weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--sessions', type=int, default=20, help='Distinct logged-in users')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--output', help='Write results (with the configuration) to this JSON file')
+    server = parser.add_argument_group('server (ignored with --url)')
+    server.add_argument('--url', help='Target an already running server instead of starting one')
+    server.add_argument('--secret', help='SESSION_SECRET of the --url server (cookie sessions)')
+    server.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+    server.add_argument('--session-backend', choices=('cookie', 'redis'), default='cookie')
+    server.add_argument('--redis-host', default='localhost')
+    server.add_argument('--redis-port', type=int, default=6379)
+    server.add_argument('--authz-cache-ttl', type=float, default=60, help='Role cache TTL (0 = IAM lookup every request)')
+    server.add_argument('--gcloud-cache', choices=('on', 'off'), default='on', help='gcloud command cache')
+    server.add_argument('--refresh-interval', type=float, default=30, help='Background inventory refresh interval')
+    fake = parser.add_argument_group('fake gcloud')
+    fake.add_argument('--size', type=int, default=1000, help='Instances, services, buckets and IAM members')
+    fake.add_argument('--latency-ms', type=float, default=150, help='Latency per gcloud call')
+    fake.add_argument('--jitter-ms', type=float, default=50, help='Random extra latency per gcloud call')
+    fake.add_argument('--failure-rate', type=float, default=0.0, help='Probability a gcloud call fails')
+    args = parser.parse_args(argv)
+    args.levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    users = [{'email': ADMIN_EMAIL, 'name': 'Load Test Admin', 'picture': ''}]
+    users += [{'email': f'user{i:06d}@example.com', 'name': f'Load Test {i}', 'picture': ''} for i in range(args.sessions - 1)]
+
+    with use_fake_gcloud(
+        instances=args.size, services=args.size, buckets=args.size, members=args.size, project_id=PROJECT_ID,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, failure_rate=args.failure_rate
+    ), tempfile.TemporaryDirectory(prefix='ccc-metrics-') as metrics_dir:
+        process = None
+        if args.url:
+            base_url = args.url.rstrip('/')
+            secret = args.secret or os.getenv('SESSION_SECRET', '')
+        else:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            secret = secrets.token_hex(16)
+            env = {
+                'SESSION_SECRET': secret,
+                'SESSION_BACKEND': args.session_backend,
+                'REDIS_HOST': args.redis_host,
+                'REDIS_PORT': str(args.redis_port),
+                'AUTHZ_CACHE_TTL': str(args.authz_cache_ttl),
+                'GCLOUD_CACHE': args.gcloud_cache,
+                'INVENTORY_REFRESH_INTERVAL': str(args.refresh_interval),
+                'GCLOUD_RATE_LIMIT': os.getenv('GCLOUD_RATE_LIMIT', '1000'),
+                'PROMETHEUS_MULTIPROC_DIR': metrics_dir,
+            }
+            print(f"🚀 Starting {args.workers} worker(s) on {base_url} ({args.session_backend} sessions)")
+            process = start_server(port, args.workers, env)
+
+        try:
+            cookies = make_cookies(args, users, secret)
+            admin_cookie = cookies[0]
+
+            # Warm up: first syncs and caches, so level 1 isn't dominated by cold starts
+            print("🔄 Warming up...")
+            warm = asyncio.run(run_level(base_url, cookies, admin_cookie, args.mix, 1, min(args.duration, 3), args.timeout))
+            if warm['total']['requests'] == 0 or warm['total']['error_rate'] == 1.0:
+                print(f"❌ Warm-up failed: {warm['statuses']}")
+                return 1
+
+            results = []
+            for level in args.levels:
+                result = asyncio.run(run_level(base_url, cookies, admin_cookie, args.mix, level, args.duration, args.timeout))
+                print_level(result)
+                results.append(result)
+        finally:
+            if process:
+                stop_server(process)
+
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k not in ('levels', 'secret')}
+        with open(args.output, 'w') as f:
+            json.dump({'config': config, 'levels': results}, f, indent=2)
+            f.write('\n')
+        print(f"\n💾 Results written to {args.output}")
+
+    return 1 if any(r['total']['error_rate'] > 0.01 for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
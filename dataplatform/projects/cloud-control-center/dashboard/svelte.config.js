@@ -7,7 +7,7 @@ const config = {
 			pages: 'build',
 			assets: 'build',
 			fallback: 'index.html',
-			precompress: false,
+			precompress: true,
 			strict: true
 		})
 	}
@@ -2,19 +2,32 @@
 Python utilities for Noah Sjursen Cloud.
 """
 
-# Convenient imports
-from .redis import get_redis_client, cache_get, cache_set, make_key
-from .common import get_greeting, get_library_info
-from .gemini import generate_text, strip_code_blocks
+import importlib
 
-__all__ = [
-    'get_redis_client',
-    'cache_get',
-    'cache_set',
-    'make_key',
-    'get_greeting',
-    'get_library_info',
-    'generate_text',
-    'strip_code_blocks',
-]
+# Convenient imports, resolved on first access so that importing one
+# subpackage (e.g. reusables.python.gcp) doesn't load the Redis and
+# Gemini clients as well
+_LAZY_IMPORTS = {
+    'get_redis_client': '.redis',
+    'cache_get': '.redis',
+    'cache_set': '.redis',
+    'make_key': '.redis',
+    'get_greeting': '.common',
+    'get_library_info': '.common',
+    'generate_text': '.gemini',
+    'strip_code_blocks': '.gemini',
+}
 
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
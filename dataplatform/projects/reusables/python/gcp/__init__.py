@@ -7,13 +7,77 @@ from .client import (
     get_user_project_roles,
     get_user_role_level,
     execute_gcloud_command,
+    SUMMARY_PROJECTIONS,
+    resolve_projection,
     list_compute_instances,
     list_cloud_run_services,
+    list_cloud_run_regions,
+    list_cloud_run_services_all_regions,
+    clear_cloud_run_region_cache,
     list_storage_buckets,
-    list_all_resources,
+    list_sql_instances,
+    list_gke_clusters,
+    list_pubsub_topics,
+    list_cloud_functions,
+    list_asset_update_times,
+    iter_gcloud_command,
+    iter_compute_instances,
+    iter_cloud_run_services,
+    iter_storage_buckets,
     list_project_iam_members,
     assign_role_to_user,
     revoke_role_from_user,
+    CLOUD_CONTROL_ROLES,
+    get_project_iam_policy,
+    set_project_iam_policy,
+    apply_role_changes,
+)
+from .cache import (
+    CommandCache,
+    get_command_cache,
+    get_command_cache_stats,
+    clear_command_cache,
+)
+from .providers import (
+    ResourceProvider,
+    ProviderScheduler,
+    AssetChangeDetector,
+    register_provider,
+    unregister_provider,
+    get_provider,
+    get_providers,
+    collect_resources,
+    list_all_resources,
+    DEFAULT_RESOURCE_TYPES,
+)
+from .governor import (
+    TokenBucket,
+    CallGovernor,
+    get_governor,
+    get_governor_stats,
+    classify_error,
+    gcloud_deadline,
+)
+from .aggregate import (
+    list_projects,
+    iter_project_inventories,
+    aggregate_projects,
+)
+from .inventory import (
+    InventoryStore,
+    MemorySnapshotBackend,
+    RedisSnapshotBackend,
+    resource_key,
+    resource_fingerprint,
+    diff_resources,
+)
+from .index import (
+    ResourceIndex,
+    index_fields,
+)
+from .telemetry import (
+    add_observer,
+    remove_observer,
 )
 
 __all__ = [
@@ -21,12 +85,62 @@ __all__ = [
     'get_user_project_roles',
     'get_user_role_level',
     'execute_gcloud_command',
+    'SUMMARY_PROJECTIONS',
+    'resolve_projection',
     'list_compute_instances',
     'list_cloud_run_services',
+    'list_cloud_run_regions',
+    'list_cloud_run_services_all_regions',
+    'clear_cloud_run_region_cache',
     'list_storage_buckets',
+    'list_sql_instances',
+    'list_gke_clusters',
+    'list_pubsub_topics',
+    'list_cloud_functions',
+    'list_asset_update_times',
     'list_all_resources',
+    'DEFAULT_RESOURCE_TYPES',
+    'ResourceProvider',
+    'ProviderScheduler',
+    'AssetChangeDetector',
+    'register_provider',
+    'unregister_provider',
+    'get_provider',
+    'get_providers',
+    'collect_resources',
+    'iter_gcloud_command',
+    'iter_compute_instances',
+    'iter_cloud_run_services',
+    'iter_storage_buckets',
     'list_project_iam_members',
     'assign_role_to_user',
     'revoke_role_from_user',
+    'CLOUD_CONTROL_ROLES',
+    'get_project_iam_policy',
+    'set_project_iam_policy',
+    'apply_role_changes',
+    'CommandCache',
+    'get_command_cache',
+    'get_command_cache_stats',
+    'clear_command_cache',
+    'TokenBucket',
+    'CallGovernor',
+    'get_governor',
+    'get_governor_stats',
+    'classify_error',
+    'gcloud_deadline',
+    'list_projects',
+    'iter_project_inventories',
+    'aggregate_projects',
+    'InventoryStore',
+    'MemorySnapshotBackend',
+    'RedisSnapshotBackend',
+    'resource_key',
+    'resource_fingerprint',
+    'diff_resources',
+    'ResourceIndex',
+    'index_fields',
+    'add_observer',
+    'remove_observer',
 ]
 
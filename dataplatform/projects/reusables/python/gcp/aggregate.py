@@ -0,0 +1,257 @@
+"""
+Multi-project inventory aggregation for Noah Sjursen Cloud.
+Enumerates projects under an organization/folder (or takes a list) and
+collects inventory and IAM across them with bounded parallelism.
+
+A pass makes about projects x (providers + 1) gcloud calls (Cloud Run is
+one call per project covering every region), so 50 projects take seconds;
+see the README for what bounds it.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Callable, Iterator, Tuple
+
+from .client import execute_gcloud_command, list_project_iam_members, get_project_iam_policy
+from .governor import TokenBucket, time_left, with_deadline
+from .providers import get_providers
+
+
+IAM_COLLECTOR = 'iam_members'
+
+
+def list_projects(
+    organization_id: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    recursive: bool = True,
+    active_only: bool = True,
+    errors: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """
+    List project IDs under an organization or folder.
+
+    A failed projects or folders listing is logged and skipped (the
+    projects found elsewhere are still returned); pass `errors` to find
+    out which parents are missing.
+
+    Args:
+        organization_id: Numeric organization ID
+        folder_id: Numeric folder ID (takes precedence over organization_id)
+        recursive: Also include projects in nested folders
+        active_only: Skip projects pending deletion
+        errors: Dictionary filled with '<type>/<id> projects|folders' -> error
+                for every listing that failed
+
+    Returns:
+        Sorted list of project IDs (all visible projects if no parent given)
+
+    Example:
+        projects = list_projects(folder_id="123456789012")
+        print(f"Found {len(projects)} projects")
+    """
+    if folder_id:
+        parents = [('folder', folder_id)]
+    elif organization_id:
+        parents = [('organization', organization_id)]
+    else:
+        parents = [None]
+
+    project_ids = set()
+    while parents:
+        parent = parents.pop()
+
+        filters = []
+        if parent:
+            filters.append(f'parent.type={parent[0]} AND parent.id={parent[1]}')
+        if active_only:
+            filters.append('lifecycleState=ACTIVE')
+        command = 'projects list'
+        if filters:
+            command += f' --filter="{" AND ".join(filters)}"'
+
+        scope = f'{parent[0]}/{parent[1]}' if parent else 'all'
+        result = execute_gcloud_command(command, timeout=60)
+        if result['success']:
+            project_ids.update(p['projectId'] for p in result['data'] if p.get('projectId'))
+        else:
+            print(f"❌ Error listing projects in {scope}: {result['error']}")
+            if errors is not None:
+                errors[f'{scope} projects'] = result['error']
+
+        if parent and recursive:
+            command = f'resource-manager folders list --{parent[0]}={parent[1]}'
+            result = execute_gcloud_command(command, timeout=60)
+            if result['success']:
+                for folder in result['data']:
+                    # Folder names look like "folders/123456789012"
+                    parents.append(('folder', folder.get('name', '').split('/')[-1]))
+            else:
+                # The projects of every folder below this one are missing
+                print(f"❌ Error listing folders in {scope}: {result['error']}")
+                if errors is not None:
+                    errors[f'{scope} folders'] = result['error']
+
+    return sorted(project_ids)
+
+
+def _collect_iam_members(project_id: str) -> List[Dict[str, Any]]:
+    """IAM members of a project, raising (rather than returning []) if the policy can't be read."""
+    policy = get_project_iam_policy(project_id)
+    if policy is None:
+        raise RuntimeError(f'Could not read the IAM policy of {project_id}')
+    return list_project_iam_members(project_id, policy=policy)
+
+
+def iter_project_inventories(
+    projects: List[str],
+    include_iam: bool = True,
+    max_workers: int = 16,
+    calls_per_second: float = 5.0,
+    projection: Optional[Any] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Collect inventory per project, yielding each project as it completes.
+
+    Every (project, collector) pair is scheduled on one shared pool, so
+    parallelism is bounded globally while slow projects don't hold up
+    fast ones. Calls into a single project are rate limited with a
+    per-project token bucket. Collectors raise when gcloud fails, so a
+    failed listing is reported in 'errors' rather than read as empty.
+
+    Args:
+        projects: Project IDs to collect
+        include_iam: Also collect IAM members
+        max_workers: Maximum concurrent collector calls across all projects
+        calls_per_second: Per-project collector call rate (after an initial
+                          burst of one call per collector)
+        projection: None for full documents or 'summary'
+
+    Yields:
+        (project_id, inventory) tuples; inventory has a key per registered
+        resource provider (plus 'iam_members') and an 'errors' dict for
+        collectors that failed (their lists are empty)
+
+    Example:
+        for project_id, inventory in iter_project_inventories(['a', 'b']):
+            print(f"{project_id}: {len(inventory['compute_instances'])} instances")
+    """
+    collectors: Dict[str, Callable[[str], List[Dict[str, Any]]]] = {
+        provider.key: (lambda project_id, lister=provider.lister: lister(project_id, projection=projection))
+        for provider in get_providers()
+    }
+    if include_iam:
+        collectors[IAM_COLLECTOR] = _collect_iam_members
+
+    if not projects or not collectors:
+        return
+
+    # A project's collectors may all start at once; the rate applies after that
+    limiters = {p: TokenBucket(calls_per_second, burst=max(calls_per_second, len(collectors))) for p in projects}
+    pending = {p: set(collectors) for p in projects}
+    results: Dict[str, Dict[str, Any]] = {p: {'errors': {}} for p in projects}
+
+    def run(project_id: str, name: str) -> List[Dict[str, Any]]:
+        left = time_left()
+        if limiters[project_id].acquire(timeout=None if left is None else max(0.0, left)) is None:
+            raise TimeoutError('Deadline exceeded waiting for the project rate limit')
+        return collectors[name](project_id)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        # Submit project by project so the first projects finish first
+        futures = {
+            executor.submit(with_deadline(run), project_id, name): (project_id, name)
+            for project_id in projects
+            for name in collectors
+        }
+        for future in as_completed(futures):
+            project_id, name = futures[future]
+            try:
+                results[project_id][name] = future.result()
+            except Exception as e:
+                results[project_id][name] = []
+                results[project_id]['errors'][name] = str(e)
+
+            pending[project_id].discard(name)
+            if not pending[project_id]:
+                yield project_id, results.pop(project_id)
+    finally:
+        # Don't block on outstanding work if the caller stopped early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def aggregate_projects(
+    projects: Optional[List[str]] = None,
+    organization_id: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    include_iam: bool = True,
+    max_workers: int = 16,
+    calls_per_second: float = 5.0,
+    projection: Optional[Any] = None,
+    on_project: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Build a merged, project-tagged inventory snapshot across projects.
+
+    Args:
+        projects: Project IDs (default: enumerate organization_id/folder_id,
+                  or GCP_PROJECT_IDS env var, comma separated)
+        organization_id: Organization to enumerate projects under
+        folder_id: Folder to enumerate projects under
+        include_iam: Also collect IAM members
+        max_workers: Maximum concurrent collector calls across all projects
+        calls_per_second: Per-project collector call rate
+        projection: None for full documents or 'summary'
+        on_project: Optional callback(project_id, inventory) per completed project
+
+    Returns:
+        Dictionary with 'projects', 'resources' (items tagged with 'project_id'),
+        'iam_members' (if requested), per-project 'errors' and
+        'enumeration_errors' (project/folder listings that failed, so their
+        projects are missing)
+
+    Example:
+        snapshot = aggregate_projects(folder_id="123456789012")
+        for instance in snapshot['resources']['compute_instances']:
+            print(f"{instance['project_id']}: {instance['name']}")
+    """
+    enumeration_errors: Dict[str, str] = {}
+    if projects is None:
+        if organization_id or folder_id:
+            projects = list_projects(organization_id=organization_id, folder_id=folder_id, errors=enumeration_errors)
+        else:
+            env_projects = os.getenv('GCP_PROJECT_IDS', '')
+            projects = [p.strip() for p in env_projects.split(',') if p.strip()]
+
+    snapshot: Dict[str, Any] = {
+        'projects': list(projects),
+        'resources': {provider.key: [] for provider in get_providers()},
+        'errors': {},
+        'enumeration_errors': enumeration_errors,
+    }
+    if include_iam:
+        snapshot['iam_members'] = []
+
+    for project_id, inventory in iter_project_inventories(
+        projects,
+        include_iam=include_iam,
+        max_workers=max_workers,
+        calls_per_second=calls_per_second,
+        projection=projection
+    ):
+        errors = inventory.pop('errors')
+        if errors:
+            snapshot['errors'][project_id] = errors
+
+        for name, items in inventory.items():
+            # Tagged copies: listed items may be shared with the gcloud cache
+            items = [{**item, 'project_id': project_id} for item in items]
+            if name == IAM_COLLECTOR:
+                snapshot['iam_members'].extend(items)
+            else:
+                snapshot['resources'].setdefault(name, []).extend(items)
+
+        if on_project:
+            on_project(project_id, inventory)
+
+    return snapshot
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the gcp module, run against the fake gcloud.
+"""
@@ -0,0 +1,243 @@
+"""
+Benchmark the gcp module against the fake gcloud.
+
+Times list_all_resources, the IAM helpers and batched role changes at each
+fixture size (resources and IAM members), and fails on regressions against
+stored baselines. Also checks that the timings the module reports through
+telemetry match the measured wall-clock time, and that gcloud failures
+injected through the fake are reported as provider errors and leave the
+inventory snapshot untouched, and that incremental syncs only re-list the
+types whose assets changed, and that a 50-project aggregation under the
+default rate limits finishes in seconds.
+
+Usage (from dataplatform/projects):
+    python -m reusables.python.gcp.benchmarks.bench_gcp --sizes 10,1000
+    python -m reusables.python.gcp.benchmarks.bench_gcp --update-baselines
+    python -m reusables.python.gcp.benchmarks.bench_gcp --latency-ms 200 --failure-rate 0.05
+"""
+
+import os
+import sys
+import json
+import time
+
+from ..fake import use_fake_gcloud, reset_gcp_state, inject_gcloud_failures
+from ..client import get_user_role_level, list_project_iam_members, apply_role_changes, iter_compute_instances
+from ..telemetry import add_observer, remove_observer
+from ..providers import list_all_resources, collect_resources, get_providers
+from ..inventory import InventoryStore, MemorySnapshotBackend
+from ..aggregate import aggregate_projects
+from ..governor import get_governor_stats
+from .harness import parse_args, run_cases, report
+
+
+PROJECT_ID = 'fake-project'
+DEFAULT_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+
+def build_cases():
+    """Benchmark cases as (name, run, setup)."""
+    def cold():
+        reset_gcp_state()
+
+    def warm():
+        reset_gcp_state()
+        list_all_resources(PROJECT_ID, projection='summary', resource_types='all')
+
+    def role_round_trip():
+        # Grant then revoke, so every repeat starts from the same policy
+        apply_role_changes(grants=[('bench@example.com', 'operator')], project_id=PROJECT_ID)
+        apply_role_changes(revokes=[('bench@example.com', 'operator')], project_id=PROJECT_ID)
+
+    return [
+        # Every registered provider, as the dashboard's inventory does
+        ('list_all_resources_full', lambda: list_all_resources(PROJECT_ID, resource_types='all'), cold),
+        ('list_all_resources_summary', lambda: list_all_resources(PROJECT_ID, projection='summary', resource_types='all'), cold),
+        ('list_all_resources_cached', lambda: list_all_resources(PROJECT_ID, projection='summary', resource_types='all'), warm),
+        ('get_user_role_level', lambda: get_user_role_level('admin@example.com', PROJECT_ID), cold),
+        ('list_project_iam_members', lambda: list_project_iam_members(PROJECT_ID), cold),
+        ('apply_role_changes', role_round_trip, cold),
+    ]
+
+
+def check_stream_telemetry() -> bool:
+    """
+    Check that 'gcloud.stream' reports the stream's real duration.
+
+    Returns:
+        True if the emitted duration is within the measured wall-clock time
+    """
+    emitted = []
+
+    def observer(event, value, labels):
+        if event == 'gcloud.stream':
+            emitted.append(value)
+
+    add_observer(observer)
+    try:
+        started = time.perf_counter()
+        for _ in iter_compute_instances(PROJECT_ID):
+            pass
+        elapsed = time.perf_counter() - started
+    finally:
+        remove_observer(observer)
+
+    # Measured inside the call, so a little under the caller's wall-clock time
+    if len(emitted) != 1 or not elapsed * 0.5 <= emitted[0] <= elapsed:
+        print(f"❌ gcloud.stream reported {emitted} for a stream that took {elapsed:.4f}s")
+        return False
+    print(f"✅ gcloud.stream reported {emitted[0]:.4f}s for a stream that took {elapsed:.4f}s")
+    return True
+
+
+def check_provider_failures() -> bool:
+    """
+    Check that failed gcloud listings are reported, not returned as empty.
+
+    Returns:
+        True if every built-in provider with fixtures lands in 'errors'
+    """
+    expected = {'compute_instances', 'cloud_run_services', 'storage_buckets'}
+    with use_fake_gcloud(instances=5, services=3, buckets=2, project_id=PROJECT_ID):
+        healthy = collect_resources(PROJECT_ID, projection='summary')
+        with inject_gcloud_failures('permission'):
+            failed = collect_resources(PROJECT_ID, projection='summary')
+
+    counts = {key: len(healthy['resources'].get(key, [])) for key in sorted(expected)}
+    if healthy['errors'] or counts != {'cloud_run_services': 3, 'compute_instances': 5, 'storage_buckets': 2}:
+        print(f"❌ Healthy collection returned {counts} with errors {healthy['errors']}")
+        return False
+    missing = expected - set(failed['errors'])
+    listed = {key: len(items) for key, items in failed['resources'].items() if key in expected}
+    if missing or listed:
+        print(f"❌ Injected gcloud failures not reported for {sorted(missing)}; returned {listed}")
+        return False
+    print(f"✅ Injected gcloud failures reported for {len(failed['errors'])} providers")
+    return True
+
+
+def check_failed_sync_keeps_snapshot() -> bool:
+    """
+    Check that an inventory sync during gcloud failures removes nothing.
+
+    Returns:
+        True if the failed sync reported no changes and kept the snapshot
+    """
+    with use_fake_gcloud(instances=5, services=3, buckets=2, project_id=PROJECT_ID):
+        store = InventoryStore(PROJECT_ID, backend=MemorySnapshotBackend())
+        store.sync()
+        version = store.version
+        before = {key: len(items) for key, items in store.snapshot().items()}
+        with inject_gcloud_failures('permission'):
+            deltas = store.sync()
+        after = {key: len(items) for key, items in store.snapshot().items()}
+
+    if deltas or store.version != version or after != before:
+        removed = {key: len(delta['removed']) for key, delta in deltas.items()}
+        print(f"❌ Failed sync removed {removed}; snapshot went from {before} to {after}")
+        return False
+    print(f"✅ Failed sync kept the snapshot at version {version}")
+    return True
+
+
+def check_incremental_sync() -> bool:
+    """
+    Check that syncs after the first only list types with changed assets.
+
+    Returns:
+        True if an unchanged sync listed nothing and a deletion re-listed
+        (and removed from) only its type
+    """
+    with use_fake_gcloud(instances=5, services=3, buckets=2, project_id=PROJECT_ID) as state_dir:
+        # Fixtures last changed well before the first sync
+        written = time.time() - 300
+        for name in os.listdir(state_dir):
+            os.utime(os.path.join(state_dir, name), (written, written))
+
+        store = InventoryStore(PROJECT_ID, backend=MemorySnapshotBackend(), incremental=True)
+        store.sync()
+        first = store.last_listed
+        store.sync()
+        unchanged = store.last_listed
+
+        # Delete an instance; the file keeps its old mtime, so only the
+        # asset count shows the change
+        path = os.path.join(state_dir, 'compute_instances.json')
+        with open(path) as f:
+            instances = json.load(f)
+        with open(path, 'w') as f:
+            json.dump(instances[1:], f)
+        os.utime(path, (written, written))
+        deltas = store.sync()
+        deleted = store.last_listed
+
+    removed = len(deltas.get('compute_instances', {}).get('removed', []))
+    if first != [p.key for p in get_providers()] or unchanged != [] or deleted != ['compute_instances'] or removed != 1:
+        print(f"❌ Incremental sync listed {first}, then {unchanged}, then {deleted} ({removed} removed)")
+        return False
+    print(f"✅ Incremental sync: unchanged sync listed nothing, a deletion re-listed only {deleted[0]}")
+    return True
+
+
+def check_aggregate_projects(count: int = 50, limit: float = 30.0) -> bool:
+    """
+    Check that a cold aggregation over many projects takes seconds, not minutes.
+
+    Runs with the default gcloud rate limits (not the benchmark's raised
+    one), since those are what bound a real pass. On small machines the
+    fake's process starts (one per call) dominate; the report shows the
+    rate limit waits separately.
+
+    Returns:
+        True if every project was collected without errors within `limit` seconds
+    """
+    projects = [f'{PROJECT_ID}-{i}' for i in range(count)]
+    raised = os.environ.pop('GCLOUD_RATE_LIMIT', None)
+    try:
+        with use_fake_gcloud(instances=5, services=3, buckets=2, project_id=PROJECT_ID):
+            started = time.perf_counter()
+            snapshot = aggregate_projects(projects, projection='summary')
+            elapsed = time.perf_counter() - started
+            stats = get_governor_stats()['total']
+    finally:
+        if raised is not None:
+            os.environ['GCLOUD_RATE_LIMIT'] = raised
+        reset_gcp_state()
+
+    if snapshot['errors'] or elapsed > limit:
+        print(f"❌ Aggregating {count} projects took {elapsed:.1f}s (limit {limit:.0f}s), "
+              f"errors in {sorted(snapshot['errors'])}")
+        return False
+    print(f"✅ Aggregated {count} projects in {elapsed:.1f}s with the default rate limits "
+          f"({stats['calls']} calls, {stats['throttle_seconds']:.1f}s waiting on rate limits across threads)")
+    return True
+
+
+def main(argv=None) -> int:
+    args = parse_args('Benchmark the gcp module against the fake gcloud', argv=argv)
+
+    # Measure gcloud work, not the client-side rate limiter
+    os.environ.setdefault('GCLOUD_RATE_LIMIT', '1000')
+
+    results = {}
+    telemetry_ok = True
+    failures_ok = (
+        check_provider_failures() & check_failed_sync_keeps_snapshot() & check_incremental_sync()
+        & check_aggregate_projects()
+    )
+    for size in args.sizes:
+        print(f"\n📦 Generating fixtures: {size} of each resource, {size} IAM members")
+        with use_fake_gcloud(
+            instances=size, services=size, buckets=size, members=size, project_id=PROJECT_ID,
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, failure_rate=args.failure_rate
+        ):
+            if size == args.sizes[0]:
+                telemetry_ok = check_stream_telemetry()
+            results.update(run_cases(build_cases(), prefix=f'{size}', repeats=args.repeats))
+
+    status = report(results, args.baselines or DEFAULT_BASELINES, args.tolerance, args.update_baselines, args.check)
+    return status or (0 if telemetry_ok and failures_ok else 1)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
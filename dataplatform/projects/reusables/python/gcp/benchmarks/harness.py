@@ -0,0 +1,281 @@
+"""
+Minimal benchmark harness with stored baselines.
+Times cases as the median of several repeats and compares them to a
+baselines file, failing when a case got slower than the tolerance allows.
+
+Baselines are stored relative to a calibration workload timed on the same
+machine, so a baselines file recorded on one machine can be checked on
+another.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+
+# Most the calibration spread may add to the tolerance, so a noisy run can't
+# wave real regressions through
+MAX_SPREAD_WIDENING = 0.1
+
+# A case is (name, run, setup); setup runs before every repeat and is not timed
+Case = Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]
+
+
+def measure(run: Callable[[], Any], repeats: int = 3, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """
+    Time a function over several repeats.
+
+    Args:
+        run: Function to time
+        repeats: Number of timed runs
+        setup: Optional untimed function called before each run
+
+    Returns:
+        Dictionary with 'median', 'min' and 'max' seconds
+    """
+    timings = []
+    for _ in range(max(1, repeats)):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {
+        'median': round(statistics.median(timings), 6),
+        'min': round(min(timings), 6),
+        'max': round(max(timings), 6),
+    }
+
+
+# Reference document for the calibration workload
+_CALIBRATION_DOC = [{'name': f'item-{i}', 'labels': {'env': 'dev', 'team': str(i % 7)}, 'size': i} for i in range(2000)]
+
+
+def _calibration_workload() -> None:
+    """Fixed work resembling the benchmarks: one interpreter spawn plus JSON and dict work."""
+    subprocess.run([sys.executable, '-S', '-c', 'pass'], check=True)
+    for _ in range(5):
+        items = json.loads(json.dumps(_CALIBRATION_DOC))
+        sorted(items, key=lambda item: (item['labels']['team'], -item['size']))
+
+
+def calibrate(repeats: int = 11) -> Dict[str, float]:
+    """
+    Time the calibration workload on this machine.
+
+    Returns:
+        Dictionary with 'median' seconds and 'spread' (interquartile range
+        as a fraction of the median, capped at 1.0)
+    """
+    _calibration_workload()  # Warm-up (page cache, first spawn)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _calibration_workload()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    quartiles = statistics.quantiles(timings, n=4)
+    return {'median': round(median, 6), 'spread': round(min(1.0, (quartiles[2] - quartiles[0]) / median), 4)}
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    """
+    Load stored baselines.
+
+    Returns:
+        Dictionary with 'calibration' (seconds of the calibration workload
+        on the recording machine, None for files of absolute timings) and
+        'cases' (timings in calibration units, or seconds if uncalibrated).
+        Empty cases if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return {'calibration': None, 'cases': {}}
+    with open(path) as f:
+        stored = json.load(f)
+    if 'cases' not in stored:
+        # Older files hold absolute timings from an unknown machine
+        return {'calibration': None, 'cases': stored}
+    return stored
+
+
+def save_baselines(path: str, results: Dict[str, Dict[str, float]], calibration: float) -> None:
+    """
+    Merge results into the baselines file, in calibration units.
+
+    Args:
+        path: Baselines file
+        results: Timings in seconds
+        calibration: Calibration median (seconds) measured with the results
+    """
+    baselines = load_baselines(path)
+    if baselines['calibration'] is None:
+        # Absolute timings can't be converted; start over
+        baselines['cases'] = {}
+    cases = baselines['cases']
+    for name, timings in results.items():
+        cases[name] = {key: round(value / calibration, 4) for key, value in timings.items()}
+    with open(path, 'w') as f:
+        json.dump({'calibration': round(calibration, 6), 'cases': cases}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def scale_baselines(baselines: Dict[str, Any], calibration: float) -> Dict[str, Dict[str, float]]:
+    """Convert stored baselines to expected seconds on this machine."""
+    if baselines['calibration'] is None:
+        return baselines['cases']
+    return {
+        name: {key: value * calibration for key, value in timings.items()}
+        for name, timings in baselines['cases'].items()
+    }
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baselines: Dict[str, Dict[str, float]],
+    tolerance: float = 0.5,
+    min_delta: float = 0.005
+) -> List[str]:
+    """
+    Compare results against baselines (both in seconds).
+
+    A case regressed when its median exceeds the baseline median by more
+    than `tolerance` (fraction) and by more than `min_delta` seconds, so
+    sub-millisecond noise never fails a run.
+
+    Returns:
+        List of human-readable regression descriptions
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            continue
+        limit = baseline['median'] * (1 + tolerance)
+        if result['median'] > limit and result['median'] - baseline['median'] > min_delta:
+            regressions.append(
+                f"{name}: {result['median']:.4f}s vs baseline {baseline['median']:.4f}s "
+                f"(+{(result['median'] / baseline['median'] - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def parse_args(description: str, default_sizes: str = '10,1000,100000', argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the common benchmark command line."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--sizes', default=default_sizes,
+                        help=f'Comma-separated resource/member counts (default: {default_sizes})')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per case (default: 3)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Fake gcloud latency per call')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Fake gcloud random extra latency')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fake gcloud failure probability')
+    parser.add_argument('--baselines', default=None, help='Baselines file (default: baselines.json next to the script)')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed slowdown vs baseline as a fraction, widened by the '
+                             f'calibration spread up to {MAX_SPREAD_WIDENING:g} (default: 0.5)')
+    parser.add_argument('--update-baselines', action='store_true', help='Store these results as the new baselines')
+    parser.add_argument('--check', action='store_true', default=bool(os.getenv('CI')),
+                        help='Also fail when a case has no stored baseline (default: on when CI is set)')
+    args = parser.parse_args(argv)
+    args.sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    return args
+
+
+def report(
+    results: Dict[str, Dict[str, float]],
+    baselines_path: str,
+    tolerance: float = 0.5,
+    update_baselines: bool = False,
+    check: bool = False
+) -> int:
+    """
+    Print results, compare them with baselines and optionally store them.
+
+    Times the calibration workload first: baselines are scaled by it to
+    this machine, and the tolerance is widened by its spread (how noisy
+    this machine is right now), by at most MAX_SPREAD_WIDENING.
+
+    Args:
+        results: Timings from run_cases()
+        baselines_path: Baselines file
+        tolerance: Allowed slowdown vs baseline as a fraction
+        update_baselines: Store the results instead of comparing
+        check: Treat cases without a baseline as failures (CI)
+
+    Returns:
+        Process exit code: 1 if any case regressed (or, with check, has no
+        baseline), otherwise 0. Regressions against uncalibrated (absolute)
+        baselines only warn, as they may come from other hardware.
+    """
+    calibration = calibrate()
+    spread = calibration['spread']
+    stored = load_baselines(baselines_path)
+    baselines = scale_baselines(stored, calibration['median'])
+    print(f"\n📏 Calibration: {calibration['median']:.4f}s (spread {spread * 100:.0f}%)"
+          + (f", baselines recorded at {stored['calibration']:.4f}s" if stored['calibration'] else ''))
+
+    print(f"\n{'case':<48} {'median':>10} {'min':>10} {'max':>10} {'baseline':>10}")
+    for name, result in results.items():
+        baseline = baselines.get(name, {}).get('median')
+        baseline_text = f'{baseline:.4f}' if baseline is not None else '-'
+        print(f"{name:<48} {result['median']:>10.4f} {result['min']:>10.4f} {result['max']:>10.4f} {baseline_text:>10}")
+
+    if update_baselines:
+        save_baselines(baselines_path, results, calibration['median'])
+        print(f"\n✅ Baselines updated: {baselines_path}")
+        return 0
+
+    failed = False
+    missing = [name for name in results if name not in baselines]
+    if missing:
+        marker = '❌' if check else '⚠️'
+        print(f"\n{marker} No baseline for {len(missing)} case(s) in {baselines_path}; "
+              f"run with --update-baselines to store them:")
+        for name in missing:
+            print(f"   {name}")
+        failed = check
+
+    tolerance += min(spread, MAX_SPREAD_WIDENING)
+    regressions = find_regressions(results, baselines, tolerance)
+    if regressions and stored['calibration'] is None:
+        print(f"\n⚠️ {len(regressions)} case(s) slower than uncalibrated baselines by {tolerance * 100:.0f}%+ "
+              f"(re-record {baselines_path} with --update-baselines):")
+        for line in regressions:
+            print(f"   {line}")
+    elif regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {tolerance * 100:.0f}%:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+
+    if failed:
+        return 1
+
+    if not regressions:
+        print(f"\n✅ No regressions beyond {tolerance * 100:.0f}%")
+    return 0
+
+
+def run_cases(cases: List[Case], prefix: str, repeats: int) -> Dict[str, Dict[str, float]]:
+    """
+    Time every case.
+
+    Args:
+        cases: List of (name, run, setup)
+        prefix: Prepended to each case name (e.g., the fixture size)
+        repeats: Timed runs per case
+
+    Returns:
+        Dictionary of '{prefix}/{name}' to timings
+    """
+    results = {}
+    for name, run, setup in cases:
+        key = f'{prefix}/{name}'
+        print(f"⏱️  {key}...", flush=True)
+        results[key] = measure(run, repeats=repeats, setup=setup)
+    sys.stdout.flush()
+    return results
@@ -0,0 +1,351 @@
+"""
+gcloud command result cache for Noah Sjursen Cloud.
+TTL caching per command family, single-flight coalescing of identical
+in-flight commands, and invalidation by mutating commands.
+
+Cached results are shared: every hit returns the same parsed 'data', so
+callers must copy whatever they modify (the command's leader gets a
+private result).
+"""
+
+import os
+import json
+import shlex
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from .telemetry import emit
+
+
+# Command family -> TTL in seconds (longest matching prefix wins)
+COMMAND_CACHE_TTLS: Dict[str, float] = {
+    'projects get-iam-policy': 30,
+    'projects list': 300,
+    'resource-manager folders': 300,
+    'compute instances': 30,
+    'run services': 30,
+    'run regions': 3600,
+    'storage buckets': 60,
+}
+DEFAULT_COMMAND_CACHE_TTL = float(os.getenv('GCLOUD_CACHE_DEFAULT_TTL', '30'))
+
+# Verbs that only read, and read verb prefixes (get-serial-port-output,
+# describe-instance, list-grantable-roles, search-all-resources...)
+READ_VERBS = {'list', 'describe', 'get', 'get-iam-policy', 'get-value', 'search', 'read'}
+READ_VERB_PREFIXES = ('list-', 'describe-', 'get-', 'search-')
+
+# Verbs that change something, checked the same way. A command is classified
+# by whichever kind of verb comes first (so a resource named 'list' in
+# 'run services delete list' doesn't make a delete a read); a command with
+# no known verb is treated as a mutation
+MUTATING_VERBS = {
+    'create', 'delete', 'update', 'patch', 'deploy', 'replace', 'apply', 'import',
+    'start', 'stop', 'reset', 'restart', 'resize', 'suspend', 'resume', 'cancel',
+    'enable', 'disable', 'undelete', 'restore', 'move', 'clone', 'failover',
+    'promote-replica', 'rollback', 'publish', 'pull', 'ack', 'seek', 'call',
+    'execute', 'cp', 'mv', 'rm', 'rsync', 'get-credentials',
+}
+MUTATING_VERB_PREFIXES = (
+    'add-', 'remove-', 'set-', 'update-', 'create-', 'delete-', 'attach-', 'detach-',
+    'modify-', 'enable-', 'disable-', 'reset-',
+)
+
+
+def _verb_kind(token: str) -> Optional[str]:
+    """'read', 'mutation' or None (not a known verb)."""
+    # Checked first: some mutations share a read prefix (get-credentials)
+    if token in MUTATING_VERBS or token.startswith(MUTATING_VERB_PREFIXES):
+        return 'mutation'
+    if token in READ_VERBS or token.startswith(READ_VERB_PREFIXES):
+        return 'read'
+    return None
+
+
+def parse_command(command: str) -> Tuple[str, str, bool]:
+    """
+    Normalize a gcloud command and classify it.
+
+    Flags are sorted so that argument order doesn't create separate cache
+    entries, and whitespace/quoting differences are ignored.
+
+    Args:
+        command: gcloud command (without 'gcloud' prefix)
+
+    Returns:
+        (normalized command, family, is_read) where family is the command
+        group before the verb (e.g., 'compute instances')
+
+    Example:
+        parse_command('compute instances list --project=a --format=json')
+        # ('compute instances list --format=json --project=a', 'compute instances', True)
+    """
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        tokens = command.split()
+
+    positional = [t for t in tokens if not t.startswith('-')]
+    flags = sorted(t for t in tokens if t.startswith('-'))
+    normalized = ' '.join(positional + flags)
+
+    # The verb is the first positional token that is a known verb
+    verb = next(((i, kind) for i, t in enumerate(positional) for kind in [_verb_kind(t)] if kind), None)
+    if verb is not None:
+        family = ' '.join(positional[:verb[0]])
+        is_read = verb[1] == 'read'
+    else:
+        family = ' '.join(positional[:2] if len(positional) > 2 else positional[:1])
+        is_read = False
+
+    return normalized, family, is_read
+
+
+def _ttl_for(normalized: str, family: str) -> float:
+    """Find the TTL for a command from the longest matching prefix."""
+    best, ttl = -1, DEFAULT_COMMAND_CACHE_TTL
+    for prefix, prefix_ttl in COMMAND_CACHE_TTLS.items():
+        if (normalized.startswith(prefix) or family.startswith(prefix)) and len(prefix) > best:
+            best, ttl = len(prefix), prefix_ttl
+    return ttl
+
+
+class _InFlight:
+    """A command currently executing, shared by every caller waiting on it."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        # Copy of a successful result, shared with waiters and the cache
+        self.shared: Optional[Dict[str, Any]] = None
+
+
+class CommandCache:
+    """
+    TTL cache with single-flight coalescing for gcloud command results.
+
+    Usage:
+        from reusables.python.gcp.cache import get_command_cache
+
+        cache = get_command_cache()
+        result = cache.execute('compute instances list', run)
+        print(cache.stats())
+    """
+
+    _instance: Optional['CommandCache'] = None
+
+    @classmethod
+    def get_cache(cls) -> 'CommandCache':
+        """
+        Get or create the shared command cache.
+
+        Environment variables:
+            GCLOUD_CACHE: 'off' to disable caching and coalescing (default: on)
+
+        Returns:
+            Shared CommandCache instance
+        """
+        if cls._instance is None:
+            cls._instance = cls(enabled=os.getenv('GCLOUD_CACHE', 'on').lower() not in ('off', 'false', '0'))
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        """Reset the singleton instance (useful for testing)."""
+        cls._instance = None
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        # normalized command -> (expires_at, family, shared result)
+        self._entries: Dict[str, Tuple[float, str, Dict[str, Any]]] = {}
+        self._in_flight: Dict[str, _InFlight] = {}
+        # Bumped on invalidation (per root family, e.g. 'compute', and
+        # globally on a full clear), so reads that started before a mutation
+        # don't store their (possibly stale) result afterwards
+        self._generation = 0
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0, 'bypassed': 0}
+
+    def execute(self, command: str, run: Callable[[], Dict[str, Any]], use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Run a command through the cache.
+
+        Read commands are served from the cache while fresh; identical read
+        commands already running are joined instead of started again (for
+        at most the caller's gcloud_deadline()).
+        Mutating commands always run and invalidate cached reads of the
+        same command family.
+
+        Hits and joined commands share one parsed result: the returned dict
+        is the caller's own, but its 'data' must be treated as read-only.
+
+        Args:
+            command: gcloud command (without 'gcloud' prefix)
+            run: Function that actually executes the command
+            use_cache: False to bypass the cache for this read (result is
+                       still stored for later callers)
+
+        Returns:
+            Result dictionary from `run`, or a shallow copy of a cached or
+            joined one (sharing its 'data')
+        """
+        normalized, family, is_read = parse_command(command)
+
+        if not self.enabled:
+            return run()
+
+        if not is_read:
+            try:
+                return run()
+            finally:
+                self.invalidate(family)
+
+        with self._lock:
+            if use_cache:
+                entry = self._entries.get(normalized)
+                if entry and entry[0] > time.monotonic():
+                    self._stats['hits'] += 1
+                    cached = entry[2]
+                    flight = None
+                    leader = False
+                else:
+                    cached = None
+                    flight = self._in_flight.get(normalized)
+                    if flight is not None:
+                        self._stats['coalesced'] += 1
+                        leader = False
+                    else:
+                        leader = True
+            else:
+                self._stats['bypassed'] += 1
+                cached = None
+                flight = None
+                leader = True
+
+            if leader:
+                self._stats['misses'] += 1
+                root = family.split(' ')[0]
+                generation = (self._generation, self._generations.get(root, 0))
+                flight = _InFlight()
+                if use_cache:
+                    self._in_flight[normalized] = flight
+
+        if cached is not None:
+            emit('gcloud.cache', result='hit')
+            return dict(cached)
+        emit('gcloud.cache', result='coalesced' if not leader else ('miss' if use_cache else 'bypassed'))
+
+        if not leader:
+            # Imported here: governor imports this module
+            from .governor import time_left, _deadline_result
+
+            left = time_left()
+            if not flight.event.wait(None if left is None else max(0.0, left)):
+                return _deadline_result('Deadline exceeded waiting for an identical in-flight command', 0)
+            return dict(flight.shared if flight.shared is not None else flight.result)
+
+        try:
+            result = run()
+            flight.result = result
+            if result.get('success'):
+                # Parsed once per miss; the leader keeps `result` to itself
+                flight.shared = _copy(result)
+                with self._lock:
+                    if (self._generation, self._generations.get(root, 0)) == generation:
+                        expires_at = time.monotonic() + _ttl_for(normalized, family)
+                        self._entries[normalized] = (expires_at, family, flight.shared)
+            return result
+        except Exception as e:
+            flight.result = {'success': False, 'error': str(e), 'data': None}
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(normalized) is flight:
+                    del self._in_flight[normalized]
+            flight.event.set()
+
+    def invalidate(self, family: Optional[str] = None) -> int:
+        """
+        Drop cached reads related to a command family.
+
+        Args:
+            family: Command family (e.g., 'projects'); None clears everything
+
+        Returns:
+            Number of entries dropped
+
+        Example:
+            # After changing IAM outside this module
+            get_command_cache().invalidate('projects')
+        """
+        with self._lock:
+            if family is None:
+                keys = list(self._entries)
+                self._generation += 1
+            else:
+                root = family.split(' ')[0]
+                keys = [k for k, entry in self._entries.items() if entry[1].split(' ')[0] == root]
+                self._generations[root] = self._generations.get(root, 0) + 1
+            for key in keys:
+                del self._entries[key]
+            self._stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, coalesced, invalidations, bypassed,
+            entries and hit_ratio
+
+        Example:
+            print(get_command_cache().stats()['hit_ratio'])
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = (stats['hits'] + stats['coalesced']) / lookups if lookups else 0.0
+        return stats
+
+
+def _copy(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep-copy a JSON result (faster than copy.deepcopy for parsed JSON)."""
+    return json.loads(json.dumps(result))
+
+
+# Convenience functions
+def get_command_cache() -> CommandCache:
+    """
+    Get the shared gcloud command cache.
+
+    Returns:
+        Shared CommandCache instance
+    """
+    return CommandCache.get_cache()
+
+
+def get_command_cache_stats() -> Dict[str, Any]:
+    """
+    Get gcloud command cache hit/miss statistics.
+
+    Returns:
+        Dictionary of counters and hit_ratio
+
+    Example:
+        stats = get_command_cache_stats()
+        print(f"{stats['hits']} hits, {stats['coalesced']} coalesced")
+    """
+    return get_command_cache().stats()
+
+
+def clear_command_cache() -> int:
+    """
+    Drop every cached gcloud result.
+
+    Returns:
+        Number of entries dropped
+    """
+    return get_command_cache().invalidate()
@@ -4,9 +4,20 @@ IAM permissions checking, project access validation, and gcloud command executio
 """
 
 import os
+import codecs
 import subprocess
 import json
-from typing import Optional, Dict, Any, List
+import re
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Dict, Any, List, Tuple, Iterator
+
+from .cache import get_command_cache
+from .governor import get_governor, command_family, time_left, with_deadline
+from .telemetry import emit
 
 
 def check_user_has_project_access(email: str, project_id: Optional[str] = None) -> bool:
@@ -31,21 +42,10 @@ def check_user_has_project_access(email: str, project_id: Optional[str] = None)
         raise ValueError("project_id must be provided or GCP_PROJECT_ID env var must be set")
     
     try:
-        # Use gcloud CLI to get IAM policy (Windows needs shell=True)
-        cmd = f'gcloud projects get-iam-policy {project_id} --format=json'
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            shell=True
-        )
-        
-        if result.returncode != 0:
-            print(f"❌ Error getting IAM policy: {result.stderr}")
+        policy = get_project_iam_policy(project_id)
+        if policy is None:
             return False
         
-        policy = json.loads(result.stdout)
         user_member = f"user:{email}"
         
         # Check if user is in any role binding
@@ -60,13 +60,14 @@ def check_user_has_project_access(email: str, project_id: Optional[str] = None)
         return False
 
 
-def get_user_project_roles(email: str, project_id: Optional[str] = None) -> list[str]:
+def get_user_project_roles(email: str, project_id: Optional[str] = None, policy: Optional[Dict[str, Any]] = None) -> list[str]:
     """
     Get all IAM roles a user has on a GCP project.
     
     Args:
         email: User email to check
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        policy: IAM policy already fetched with get_project_iam_policy() (skips the lookup)
     
     Returns:
         List of role names (e.g., ['roles/viewer', 'roles/editor'])
@@ -82,21 +83,11 @@ def get_user_project_roles(email: str, project_id: Optional[str] = None) -> list
         raise ValueError("project_id must be provided or GCP_PROJECT_ID env var must be set")
     
     try:
-        # Use gcloud CLI to get IAM policy (Windows needs shell=True)
-        cmd = f'gcloud projects get-iam-policy {project_id} --format=json'
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            shell=True
-        )
-        
-        if result.returncode != 0:
-            print(f"❌ Error getting IAM policy: {result.stderr}")
+        if policy is None:
+            policy = get_project_iam_policy(project_id)
+        if policy is None:
             return []
         
-        policy = json.loads(result.stdout)
         user_member = f"user:{email}"
         roles = []
         
@@ -116,28 +107,57 @@ def get_user_project_roles(email: str, project_id: Optional[str] = None) -> list
 # GCLOUD COMMAND EXECUTION
 # ============================================================================
 
-def execute_gcloud_command(command: str, timeout: int = 30) -> Dict[str, Any]:
+def _build_gcloud_command(command: str) -> str:
+    """Prefix a command with the gcloud executable and ensure it outputs JSON."""
+    if '--format=' not in command:
+        command += ' --format=json'
+    # GCLOUD_BIN lets tests and benchmarks substitute a fake gcloud
+    return f"{os.getenv('GCLOUD_BIN', 'gcloud')} {command}"
+
+
+def execute_gcloud_command(command: str, timeout: int = 30, use_cache: bool = True) -> Dict[str, Any]:
     """
     Execute a gcloud command and return JSON output.
     
+    Read commands (list, describe, get-iam-policy) go through the shared
+    command cache: fresh results are reused for a per-family TTL and
+    identical concurrent commands share one subprocess. Mutating commands
+    invalidate cached reads of the same command group.
+    
+    Commands that do run are rate limited per API family and retried with
+    jittered exponential backoff on quota/transient errors (see governor.py).
+    
     Args:
         command: gcloud command to execute (without 'gcloud' prefix)
         timeout: Command timeout in seconds
+        use_cache: False to always run a read command (e.g. to get a fresh etag)
     
     Returns:
         Dict with 'success', 'data', and optional 'error' keys
+        (failed results also carry 'error_class' and 'attempts')
     
     Example:
         result = execute_gcloud_command("compute instances list --format=json")
         if result['success']:
             print(result['data'])
     """
+    return get_command_cache().execute(
+        command,
+        lambda: get_governor().call(command, lambda: _run_gcloud_command(command, timeout)),
+        use_cache=use_cache
+    )
+
+
+def _run_gcloud_command(command: str, timeout: int) -> Dict[str, Any]:
+    """Run a gcloud command in a subprocess and parse its JSON output."""
+    started = time.perf_counter()
+    outcome = 'error'
+    # Kill the process at the caller's deadline rather than let it hold a worker
+    left = time_left()
+    if left is not None:
+        timeout = round(max(0.1, min(timeout, left)), 1)
     try:
-        # Ensure command includes --format=json
-        if '--format=json' not in command:
-            command += ' --format=json'
-        
-        full_command = f'gcloud {command}'
+        full_command = _build_gcloud_command(command)
         
         result = subprocess.run(
             full_command,
@@ -160,6 +180,7 @@ def execute_gcloud_command(command: str, timeout: int = 30) -> Dict[str, Any]:
         except json.JSONDecodeError:
             data = result.stdout.strip()
         
+        outcome = 'success'
         return {
             'success': True,
             'data': data,
@@ -167,10 +188,13 @@ def execute_gcloud_command(command: str, timeout: int = 30) -> Dict[str, Any]:
         }
         
     except subprocess.TimeoutExpired:
+        outcome = 'timeout'
         return {
             'success': False,
             'error': f'Command timed out after {timeout} seconds',
-            'data': None
+            'data': None,
+            # Our own limit, not a gcloud error (see CallGovernor.call)
+            'timed_out': True
         }
     except Exception as e:
         return {
@@ -178,14 +202,139 @@ def execute_gcloud_command(command: str, timeout: int = 30) -> Dict[str, Any]:
             'error': str(e),
             'data': None
         }
+    finally:
+        emit('gcloud.command', time.perf_counter() - started, family=command_family(command), outcome=outcome)
+
+
+# ============================================================================
+# FIELD PROJECTIONS
+# ============================================================================
+
+# Fields the dashboard shows per resource type, as gcloud projection keys
+SUMMARY_PROJECTIONS: Dict[str, List[str]] = {
+    'compute_instances': [
+        'name',
+        'status',
+        'zone.basename()',
+        'machineType.basename()',
+        'networkInterfaces[0].networkIP',
+        'networkInterfaces[0].accessConfigs[0].natIP',
+        'creationTimestamp',
+        'labels',
+    ],
+    'cloud_run_services': [
+        'metadata.name',
+        'metadata.creationTimestamp',
+        'metadata.labels',
+        'metadata.resourceVersion',
+        'status.url',
+        'status.latestReadyRevisionName',
+        'status.conditions[0].status',
+    ],
+    'storage_buckets': [
+        'name',
+        'location',
+        'location_type',
+        'default_storage_class',
+        'creation_time',
+        'update_time',
+        'labels',
+    ],
+    'sql_instances': [
+        'name',
+        'databaseVersion',
+        'state',
+        'region',
+        'settings.tier',
+        'ipAddresses[0].ipAddress',
+        'etag',
+    ],
+    'gke_clusters': [
+        'name',
+        'location',
+        'status',
+        'currentMasterVersion',
+        'currentNodeCount',
+        'endpoint',
+    ],
+    'pubsub_topics': [
+        'name',
+        'labels',
+    ],
+    'cloud_functions': [
+        'name',
+        'state',
+        'status',
+        'environment',
+        'runtime',
+        'buildConfig.runtime',
+        'updateTime',
+    ],
+}
+
+
+# Caller-supplied projection keys: plain field paths only (no transforms,
+# quotes or shell characters; commands run through a shell)
+_PROJECTION_KEY = re.compile(r'^[A-Za-z0-9_.\[\]]+$')
+
+
+def resolve_projection(resource_type: str, projection: Optional[Any] = None) -> Optional[List[str]]:
+    """
+    Resolve a projection argument to a list of gcloud projection keys.
+    
+    Args:
+        resource_type: Resource type key (e.g., 'compute_instances')
+        projection: None (full documents), 'summary', a comma-separated
+                    string or a list of field paths (e.g., ['name', 'labels'])
+    
+    Returns:
+        List of projection keys, or None for full documents
+    
+    Raises:
+        ValueError: If a caller-supplied key isn't a plain field path
+                    (like 'networkInterfaces[0].networkIP')
+    
+    Example:
+        resolve_projection('storage_buckets', 'summary')
+        # ['name', 'location', ...]
+    """
+    if not projection:
+        return None
+    if projection == 'summary':
+        return SUMMARY_PROJECTIONS.get(resource_type)
+    if isinstance(projection, str):
+        keys = [key.strip() for key in projection.split(',') if key.strip()]
+    else:
+        keys = [str(key) for key in projection]
+    invalid = [key for key in keys if not _PROJECTION_KEY.match(key)]
+    if invalid:
+        raise ValueError(f"Invalid projection keys: {', '.join(map(repr, invalid))}")
+    return keys
+
 
+def _format_flag(resource_type: str, projection: Optional[Any] = None) -> str:
+    """Build the --format flag that makes gcloud emit only the projected fields."""
+    keys = resolve_projection(resource_type, projection)
+    if not keys:
+        return ''
+    # Double quotes group the argument in both cmd.exe and POSIX shells
+    # (cmd.exe passes single quotes through); keys can't contain quotes or
+    # shell characters, see _PROJECTION_KEY
+    return f' --format="json({",".join(keys)})"'
 
-def list_compute_instances(project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+
+def list_compute_instances(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
     """
     List all Compute Engine instances in a project.
     
     Args:
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
     
     Returns:
         List of instance dictionaries
@@ -199,21 +348,28 @@ def list_compute_instances(project_id: Optional[str] = None) -> List[Dict[str, A
         project_id = os.getenv('GCP_PROJECT_ID')
     
     command = f'compute instances list --project={project_id}'
-    result = execute_gcloud_command(command)
-    
-    return result['data'] if result['success'] else []
+    return _list_resources(command, 'compute_instances', projection, raise_on_error)
 
 
-def list_cloud_run_services(project_id: Optional[str] = None, region: str = 'us-central1') -> List[Dict[str, Any]]:
+def list_cloud_run_services(
+    project_id: Optional[str] = None,
+    region: Optional[str] = 'us-central1',
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
     """
     List all Cloud Run services in a project.
     
     Args:
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
-        region: GCP region
+        region: GCP region, or 'all' for every region: one call without
+                --region, or a fan-out over GCP_RUN_REGIONS when that is
+                set (see list_cloud_run_services_all_regions)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
     
     Returns:
-        List of service dictionaries
+        List of service dictionaries, each tagged with its 'region'
     
     Example:
         services = list_cloud_run_services()
@@ -223,18 +379,256 @@ def list_cloud_run_services(project_id: Optional[str] = None, region: str = 'us-
     if not project_id:
         project_id = os.getenv('GCP_PROJECT_ID')
     
+    if not region or region == 'all':
+        if os.getenv('GCP_RUN_REGIONS'):
+            return list_cloud_run_services_all_regions(project_id, projection=projection, raise_on_error=raise_on_error)
+        return _list_cloud_run_services_every_region(project_id, projection, raise_on_error)
+    
     command = f'run services list --project={project_id} --region={region} --platform=managed'
+    result = execute_gcloud_command(command + _format_flag('cloud_run_services', projection))
+    
+    if not result['success']:
+        return _list_failed(command, result, raise_on_error)
+    
+    # Copied: cached results are shared between callers
+    return [{**service, 'region': region} for service in result['data']]
+
+
+# Label holding a Cloud Run service's region
+_RUN_LOCATION_LABEL = 'cloud.googleapis.com/location'
+
+
+def _list_cloud_run_services_every_region(
+    project_id: str,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List the services of every region in one call.
+    
+    Without --region, gcloud lists every region's services itself (unless
+    the gcloud configuration sets run/region); each service's region comes
+    from its location label.
+    """
+    command = f'run services list --project={project_id} --platform=managed'
+    keys = resolve_projection('cloud_run_services', projection)
+    if keys and 'metadata.labels' not in keys:
+        keys = keys + ['metadata.labels']
+    result = execute_gcloud_command(command + (f' --format="json({",".join(keys)})"' if keys else ''))
+    
+    if not result['success']:
+        return _list_failed(command, result, raise_on_error)
+    
+    return [
+        {**service, 'region': ((service.get('metadata') or {}).get('labels') or {}).get(_RUN_LOCATION_LABEL, '')}
+        for service in result['data']
+    ]
+
+
+# ============================================================================
+# CLOUD RUN MULTI-REGION FAN-OUT
+# ============================================================================
+
+# How long a region without services (or a discovered region list) is trusted
+# before it is polled again, in seconds
+RUN_REGION_CACHE_TTL = int(os.getenv('GCP_RUN_REGION_CACHE_TTL', '900'))
+
+# (project_id, region) -> time the region was last seen empty
+_empty_run_regions: Dict[Tuple[str, str], float] = {}
+# project_id -> (time discovered, regions)
+_run_regions_cache: Dict[str, Tuple[float, List[str]]] = {}
+_run_regions_lock = threading.Lock()
+
+# One pool for every region query, so listing many projects at once (see
+# aggregate.py) doesn't start a pool of region threads per project
+_region_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_region_executor() -> ThreadPoolExecutor:
+    global _region_executor
+    with _run_regions_lock:
+        if _region_executor is None:
+            _region_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('GCP_RUN_REGION_WORKERS', '16')),
+                thread_name_prefix='gcp-run-region'
+            )
+        return _region_executor
+
+
+def list_cloud_run_regions(project_id: Optional[str] = None, raise_on_error: bool = False) -> List[str]:
+    """
+    List the regions Cloud Run is available in for a project.
+    
+    The region list is cached per project for RUN_REGION_CACHE_TTL seconds.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
+    
+    Returns:
+        List of region IDs (e.g., ['europe-north1', 'us-central1'])
+    
+    Example:
+        regions = list_cloud_run_regions()
+        print(f"Cloud Run is available in {len(regions)} regions")
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    with _run_regions_lock:
+        cached = _run_regions_cache.get(project_id)
+        if cached and time.monotonic() - cached[0] < RUN_REGION_CACHE_TTL:
+            return list(cached[1])
+    
+    command = f'run regions list --project={project_id}'
     result = execute_gcloud_command(command)
     
-    return result['data'] if result['success'] else []
+    if not result['success']:
+        print(f"❌ Error listing Cloud Run regions: {result['error']}")
+        return _list_failed(command, result, raise_on_error)
+    
+    regions = [r.get('locationId') for r in result['data'] if r.get('locationId')]
+    
+    with _run_regions_lock:
+        _run_regions_cache[project_id] = (time.monotonic(), regions)
+    
+    return list(regions)
+
+
+def list_cloud_run_services_all_regions(
+    project_id: Optional[str] = None,
+    regions: Optional[List[str]] = None,
+    max_workers: int = 8,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List Cloud Run services across many regions concurrently.
+    
+    Regions come from the `regions` argument, the GCP_RUN_REGIONS env var
+    (comma separated), or are discovered with list_cloud_run_regions().
+    Regions that returned no services are skipped for RUN_REGION_CACHE_TTL
+    seconds so they aren't re-polled on every refresh. Queries run on a
+    pool shared by every call (GCP_RUN_REGION_WORKERS threads, default 16).
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        regions: Regions to query (default: env var or discovery)
+        max_workers: Maximum number of this call's regions queried at once
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if discovery or any region fails
+                        (default: leave failed regions out)
+    
+    Returns:
+        Merged list of service dictionaries, each tagged with its 'region'
+    
+    Example:
+        services = list_cloud_run_services_all_regions(regions=['us-central1', 'europe-north1'])
+        for service in services:
+            print(f"{service['region']}: {service['metadata']['name']}")
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    if regions is None:
+        env_regions = os.getenv('GCP_RUN_REGIONS', '')
+        regions = [r.strip() for r in env_regions.split(',') if r.strip()]
+    if not regions:
+        regions = list_cloud_run_regions(project_id, raise_on_error=raise_on_error)
+    
+    # Skip regions recently seen without services
+    now = time.monotonic()
+    with _run_regions_lock:
+        to_query = [
+            region for region in regions
+            if now - _empty_run_regions.get((project_id, region), float('-inf')) >= RUN_REGION_CACHE_TTL
+        ]
+    
+    if not to_query:
+        return []
+    
+    def query_region(region: str) -> Tuple[str, Dict[str, Any]]:
+        command = f'run services list --project={project_id} --region={region} --platform=managed'
+        command += _format_flag('cloud_run_services', projection)
+        return region, execute_gcloud_command(command)
+    
+    # Keep at most max_workers of this call's regions on the shared pool
+    executor = _get_region_executor()
+    query = with_deadline(query_region)
+    remaining = iter(to_query)
+    running = set()
+    results = {}
+    for region in remaining:
+        running.add(executor.submit(query, region))
+        if len(running) >= max(1, max_workers):
+            break
+    while running:
+        done, running = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            region, result = future.result()
+            results[region] = result
+            region = next(remaining, None)
+            if region is not None:
+                running.add(executor.submit(query, region))
+    
+    services = []
+    failed = {}
+    for region in to_query:
+        result = results[region]
+        if not result['success']:
+            # Failed regions are retried on the next call
+            failed[region] = result['error']
+            continue
+        
+        data = result['data']
+        
+        if not data:
+            with _run_regions_lock:
+                _empty_run_regions[(project_id, region)] = time.monotonic()
+            continue
+        
+        with _run_regions_lock:
+            _empty_run_regions.pop((project_id, region), None)
+        services.extend({**service, 'region': region} for service in data)
+    
+    if failed and raise_on_error:
+        raise RuntimeError('; '.join(f'{region}: {error}' for region, error in sorted(failed.items())))
+    return services
+
+
+def clear_cloud_run_region_cache(project_id: Optional[str] = None) -> None:
+    """
+    Forget cached region lists and empty regions.
+    
+    Args:
+        project_id: Only clear entries for this project (None = all projects)
+    
+    Example:
+        # After deploying a service to a new region
+        clear_cloud_run_region_cache("my-project")
+    """
+    with _run_regions_lock:
+        if project_id is None:
+            _empty_run_regions.clear()
+            _run_regions_cache.clear()
+            return
+        for key in [k for k in _empty_run_regions if k[0] == project_id]:
+            del _empty_run_regions[key]
+        _run_regions_cache.pop(project_id, None)
 
 
-def list_storage_buckets(project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+def list_storage_buckets(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
     """
     List all Cloud Storage buckets in a project.
     
     Args:
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
     
     Returns:
         List of bucket dictionaries
@@ -248,43 +642,418 @@ def list_storage_buckets(project_id: Optional[str] = None) -> List[Dict[str, Any
         project_id = os.getenv('GCP_PROJECT_ID')
     
     command = f'storage buckets list --project={project_id}'
-    result = execute_gcloud_command(command)
+    return _list_resources(command, 'storage_buckets', projection, raise_on_error)
+
+
+def _list_failed(command: str, result: Dict[str, Any], raise_on_error: bool) -> List[Dict[str, Any]]:
+    """Handle a failed list command: raise, or return [] as the listers always have."""
+    if raise_on_error:
+        raise RuntimeError(result.get('error') or f'gcloud {command} failed')
+    return []
+
+
+def _list_resources(
+    command: str,
+    resource_type: str,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """Run a list command with an optional projection ([] or RuntimeError on error)."""
+    result = execute_gcloud_command(command + _format_flag(resource_type, projection))
+    if not result['success']:
+        return _list_failed(command, result, raise_on_error)
+    return result['data']
+
+
+def list_sql_instances(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List all Cloud SQL instances in a project.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
     
-    return result['data'] if result['success'] else []
+    Returns:
+        List of SQL instance dictionaries
+    
+    Example:
+        for instance in list_sql_instances():
+            print(f"{instance['name']}: {instance['databaseVersion']}")
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    return _list_resources(f'sql instances list --project={project_id}', 'sql_instances', projection, raise_on_error)
 
 
-def list_all_resources(project_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+def list_gke_clusters(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
     """
-    List all major resources in a GCP project.
+    List all GKE clusters in a project (all locations).
     
     Args:
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
     
     Returns:
-        Dictionary with resource types as keys
+        List of cluster dictionaries
     
     Example:
-        resources = list_all_resources()
-        print(f"Compute instances: {len(resources['compute_instances'])}")
-        print(f"Cloud Run services: {len(resources['cloud_run_services'])}")
+        for cluster in list_gke_clusters():
+            print(f"{cluster['name']} ({cluster['location']}): {cluster['status']}")
     """
     if not project_id:
         project_id = os.getenv('GCP_PROJECT_ID')
     
-    return {
-        'compute_instances': list_compute_instances(project_id),
-        'cloud_run_services': list_cloud_run_services(project_id),
-        'storage_buckets': list_storage_buckets(project_id)
-    }
+    return _list_resources(f'container clusters list --project={project_id}', 'gke_clusters', projection, raise_on_error)
+
+
+def list_pubsub_topics(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List all Pub/Sub topics in a project.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
+    
+    Returns:
+        List of topic dictionaries
+    
+    Example:
+        topics = [topic['name'].split('/')[-1] for topic in list_pubsub_topics()]
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    return _list_resources(f'pubsub topics list --project={project_id}', 'pubsub_topics', projection, raise_on_error)
+
+
+def list_cloud_functions(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List all Cloud Functions in a project.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: Fields to return ('summary', list of keys, or None for all)
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
+    
+    Returns:
+        List of function dictionaries
+    
+    Example:
+        for function in list_cloud_functions():
+            print(function['name'])
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    return _list_resources(f'functions list --project={project_id}', 'cloud_functions', projection, raise_on_error)
 
 
-def get_user_role_level(email: str, project_id: Optional[str] = None) -> str:
+def list_asset_update_times(
+    project_id: Optional[str] = None,
+    asset_types: Optional[List[str]] = None,
+    raise_on_error: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    List the type and last update time of every asset in a project.
+    
+    One Cloud Asset Inventory search covers every resource type, so it is a
+    cheap way to find which types changed since they were last listed.
+    Needs the Cloud Asset API (cloudasset.googleapis.com) enabled and
+    cloudasset.assets.searchAllResources on the project.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        asset_types: Only these asset types (e.g., 'compute.googleapis.com/Instance')
+        raise_on_error: Raise RuntimeError if gcloud fails (default: return [])
+    
+    Returns:
+        List of {'assetType', 'updateTime'} dictionaries ('updateTime' is
+        RFC 3339 and missing for types that don't report it)
+    
+    Example:
+        for asset in list_asset_update_times(asset_types=['storage.googleapis.com/Bucket']):
+            print(asset['assetType'], asset.get('updateTime'))
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    command = f'asset search-all-resources --scope=projects/{project_id}'
+    if asset_types:
+        command += f' --asset-types={",".join(asset_types)}'
+    # Always fresh: the answer decides whether anything gets re-listed
+    result = execute_gcloud_command(command + ' --format="json(assetType,updateTime)"', timeout=60, use_cache=False)
+    if not result['success']:
+        return _list_failed(command, result, raise_on_error)
+    return result['data']
+
+
+# ============================================================================
+# STREAMING RESOURCE LISTS
+# ============================================================================
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_gcloud_command(command: str, timeout: int = 300, page_size: Optional[int] = None) -> Iterator[Any]:
+    """
+    Execute a gcloud list command and yield items as they are printed.
+    
+    Unlike execute_gcloud_command(), stdout is never buffered as a whole:
+    the JSON array is parsed incrementally from the process pipe, so the
+    first item is available as soon as gcloud prints it and memory stays
+    bounded by the largest single item. Stopping iteration early kills
+    the gcloud process.
+    
+    Args:
+        command: gcloud list command (without 'gcloud' prefix)
+        timeout: Overall timeout in seconds
+        page_size: Items fetched per API page (adds --page-size)
+    
+    Yields:
+        Parsed list items
+    
+    Example:
+        for instance in iter_gcloud_command("compute instances list", page_size=500):
+            print(instance['name'])
+    """
+    if page_size and '--page-size' not in command:
+        command += f' --page-size={page_size}'
+    
+    # Streams can't be replayed, so they are rate limited but not retried
+    if get_governor().acquire(command) is None:
+        print(f"❌ Error streaming gcloud {command}: deadline exceeded waiting for the rate limit")
+        return
+    left = time_left()
+    if left is not None:
+        timeout = max(0.1, min(timeout, left))
+    
+    t0 = time.perf_counter()
+    outcome = 'error'
+    # stderr goes to a file: a pipe only read at the end would fill up (and
+    # block gcloud) if it printed more warnings than the pipe buffer holds
+    stderr = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            _build_gcloud_command(command),
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            shell=True
+        )
+    except BaseException:
+        stderr.close()
+        raise
+    watchdog = threading.Timer(timeout, process.kill)
+    watchdog.daemon = True
+    watchdog.start()
+    
+    decoder = json.JSONDecoder()
+    # Bytes are decoded as they arrive; a multi-byte character split
+    # across reads is held back until the rest of it comes in
+    text = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+    eof = False
+    
+    try:
+        while not finished:
+            if not eof:
+                # read1() returns whatever the pipe has (up to the chunk
+                # size) instead of blocking until the chunk is full
+                data = process.stdout.read1(_STREAM_CHUNK_SIZE)
+                if data:
+                    buffer = buffer[pos:] + text.decode(data)
+                    pos = 0
+                else:
+                    buffer = buffer[pos:] + text.decode(b'', final=True)
+                    pos = 0
+                    eof = True
+            
+            while True:
+                # Skip whitespace, the opening bracket and item separators
+                while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+                    pos += 1
+                if pos >= len(buffer):
+                    break
+                
+                if not started:
+                    if buffer[pos] != '[':
+                        # Not a list: fall back to parsing the whole document
+                        if not eof:
+                            break
+                        yield from _as_items(buffer[pos:])
+                        finished = True
+                        break
+                    started = True
+                    pos += 1
+                    continue
+                
+                if buffer[pos] == ']':
+                    finished = True
+                    break
+                
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        print(f"❌ Malformed JSON from gcloud {command}")
+                        finished = True
+                    break
+                
+                # A bare number may continue in the next chunk
+                if end == len(buffer) and not eof and not isinstance(item, (dict, list, str)):
+                    break
+                
+                pos = end
+                yield item
+            
+            if eof:
+                break
+        
+        process.wait()
+        if process.returncode != 0:
+            stderr.seek(0)
+            error = stderr.read().decode('utf-8', errors='replace').strip() or f'exit code {process.returncode}'
+            print(f"❌ Error streaming gcloud {command}: {error}")
+        else:
+            outcome = 'success'
+    finally:
+        emit('gcloud.stream', time.perf_counter() - t0, family=command_family(command), outcome=outcome)
+        watchdog.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr.close()
+
+
+def _as_items(text: str) -> List[Any]:
+    """Parse a non-array JSON document into a list of items."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return []
+    return data if isinstance(data, list) else [data]
+
+
+def iter_compute_instances(
+    project_id: Optional[str] = None,
+    page_size: Optional[int] = 500,
+    projection: Optional[Any] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Compute Engine instances in a project.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        page_size: Instances fetched per API page
+        projection: Fields to return ('summary', list of keys, or None for all)
+    
+    Yields:
+        Instance dictionaries
+    
+    Example:
+        for instance in iter_compute_instances("my-project"):
+            if instance['status'] == 'TERMINATED':
+                print(f"First stopped instance: {instance['name']}")
+                break
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    command = f'compute instances list --project={project_id}'
+    command += _format_flag('compute_instances', projection)
+    yield from iter_gcloud_command(command, page_size=page_size)
+
+
+def iter_cloud_run_services(
+    project_id: Optional[str] = None,
+    region: str = 'us-central1',
+    page_size: Optional[int] = None,
+    projection: Optional[Any] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Cloud Run services in a project region.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        region: GCP region
+        page_size: Services fetched per API page
+        projection: Fields to return ('summary', list of keys, or None for all)
+    
+    Yields:
+        Service dictionaries, each tagged with its 'region'
+    
+    Example:
+        for service in iter_cloud_run_services(region='europe-north1'):
+            print(service['metadata']['name'])
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    command = f'run services list --project={project_id} --region={region} --platform=managed'
+    command += _format_flag('cloud_run_services', projection)
+    for service in iter_gcloud_command(command, page_size=page_size):
+        service['region'] = region
+        yield service
+
+
+def iter_storage_buckets(
+    project_id: Optional[str] = None,
+    page_size: Optional[int] = None,
+    projection: Optional[Any] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Cloud Storage buckets in a project.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        page_size: Buckets fetched per API page
+        projection: Fields to return ('summary', list of keys, or None for all)
+    
+    Yields:
+        Bucket dictionaries
+    
+    Example:
+        names = [bucket['name'] for bucket in iter_storage_buckets()]
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    command = f'storage buckets list --project={project_id}'
+    command += _format_flag('storage_buckets', projection)
+    yield from iter_gcloud_command(command, page_size=page_size)
+
+
+def get_user_role_level(email: str, project_id: Optional[str] = None, policy: Optional[Dict[str, Any]] = None) -> str:
     """
     Get the highest Cloud Control Center role level for a user.
     
     Args:
         email: User email to check
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        policy: IAM policy already fetched with get_project_iam_policy() (skips the lookup)
     
     Returns:
         'admin', 'operator', 'viewer', or 'none'
@@ -294,7 +1063,7 @@ def get_user_role_level(email: str, project_id: Optional[str] = None) -> str:
         if level == 'admin':
             allow_delete_operations()
     """
-    roles = get_user_project_roles(email, project_id)
+    roles = get_user_project_roles(email, project_id, policy=policy)
     
     # Check for Cloud Control Center roles (highest to lowest)
     if any('cloudControlCenterAdmin' in role for role in roles):
@@ -311,13 +1080,18 @@ def get_user_role_level(email: str, project_id: Optional[str] = None) -> str:
     return 'none'
 
 
-def list_project_iam_members(project_id: Optional[str] = None, filter_cloud_control_only: bool = False) -> List[Dict[str, Any]]:
+def list_project_iam_members(
+    project_id: Optional[str] = None,
+    filter_cloud_control_only: bool = False,
+    policy: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
     """
     List all IAM members with their roles in a project.
     
     Args:
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
         filter_cloud_control_only: If True, only return users with Cloud Control Center roles
+        policy: IAM policy already fetched with get_project_iam_policy() (skips the lookup)
     
     Returns:
         List of members with their roles
@@ -331,13 +1105,15 @@ def list_project_iam_members(project_id: Optional[str] = None, filter_cloud_cont
         project_id = os.getenv('GCP_PROJECT_ID')
     
     try:
-        command = f'projects get-iam-policy {project_id}'
-        result = execute_gcloud_command(command)
-        
-        if not result['success']:
-            return []
+        if policy is None:
+            command = f'projects get-iam-policy {project_id}'
+            result = execute_gcloud_command(command)
+            
+            if not result['success']:
+                return []
+            
+            policy = result['data']
         
-        policy = result['data']
         members_map = {}
         
         # Group roles by member
@@ -491,3 +1267,211 @@ def revoke_role_from_user(email: str, role_name: str, project_id: Optional[str]
         }
 
 
+# ============================================================================
+# BATCHED ROLE CHANGES
+# ============================================================================
+
+# Seconds an IAM policy read may take; role checks sit on request paths
+IAM_READ_TIMEOUT = int(os.getenv('GCP_IAM_READ_TIMEOUT', '10'))
+
+CLOUD_CONTROL_ROLES = {
+    'viewer': 'cloudControlCenterViewer',
+    'operator': 'cloudControlCenterOperator',
+    'admin': 'cloudControlCenterAdmin',
+}
+
+
+def get_project_iam_policy(project_id: Optional[str] = None, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Get the IAM policy of a project, including its etag.
+    
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        use_cache: False to bypass the command cache (needed before writes)
+    
+    Returns:
+        Policy dictionary ('bindings', 'etag', 'version'), or None on error.
+        A cached policy is shared: read it with use_cache=False to modify it.
+    
+    Example:
+        policy = get_project_iam_policy()
+        print(f"{len(policy['bindings'])} bindings, etag {policy['etag']}")
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    result = execute_gcloud_command(f'projects get-iam-policy {project_id}', timeout=IAM_READ_TIMEOUT, use_cache=use_cache)
+    if not result['success']:
+        print(f"❌ Error getting IAM policy: {result['error']}")
+        return None
+    
+    return result['data']
+
+
+def _is_policy_conflict(error: str) -> bool:
+    """Check whether a set-iam-policy error means the etag was stale."""
+    error = (error or '').lower()
+    return any(marker in error for marker in ('aborted', '409', 'concurrent policy changes', 'etag'))
+
+
+def set_project_iam_policy(policy: Dict[str, Any], project_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write a project IAM policy.
+    
+    The policy's etag makes the write conditional: it fails with a conflict
+    if the policy changed since it was read.
+    
+    Args:
+        policy: Policy dictionary as returned by get_project_iam_policy()
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+    
+    Returns:
+        Dict with 'success', 'data', 'error' and 'conflict' keys
+    
+    Example:
+        result = set_project_iam_policy(policy)
+        if result['conflict']:
+            print('Policy changed underneath us, re-read and retry')
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    # gcloud reads the policy from a file (closed first so Windows can open it)
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(policy, f)
+        policy_path = f.name
+    
+    try:
+        result = execute_gcloud_command(f'projects set-iam-policy {project_id} "{policy_path}" --quiet')
+    finally:
+        os.remove(policy_path)
+    
+    result['conflict'] = not result['success'] and _is_policy_conflict(result['error'])
+    return result
+
+
+def _apply_binding_change(policy: Dict[str, Any], member: str, role: str, grant: bool) -> bool:
+    """Add or remove a member on an unconditional role binding. Returns True if the policy changed."""
+    bindings = policy.setdefault('bindings', [])
+    
+    if grant:
+        for binding in bindings:
+            if binding.get('role') == role and 'condition' not in binding:
+                if member in binding.setdefault('members', []):
+                    return False
+                binding['members'].append(member)
+                return True
+        bindings.append({'role': role, 'members': [member]})
+        return True
+    
+    changed = False
+    for binding in bindings:
+        if binding.get('role') == role and 'condition' not in binding and member in binding.get('members', []):
+            binding['members'].remove(member)
+            changed = True
+    policy['bindings'] = [b for b in bindings if b.get('members')]
+    return changed
+
+
+def apply_role_changes(
+    grants: Optional[List[Tuple[str, str]]] = None,
+    revokes: Optional[List[Tuple[str, str]]] = None,
+    project_id: Optional[str] = None,
+    max_retries: int = 5
+) -> Dict[str, Any]:
+    """
+    Grant and revoke many Cloud Control Center roles in one policy update.
+    
+    Reads the IAM policy once, applies every change, and writes it back
+    with the policy's etag. If another writer changed the policy in the
+    meantime, the whole cycle is retried with jittered backoff, so no
+    change is lost and none is applied twice.
+    
+    Args:
+        grants: (email, role_name) pairs to grant (viewer, operator, or admin)
+        revokes: (email, role_name) pairs to revoke
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        max_retries: Maximum read-modify-write attempts on etag conflicts
+    
+    Returns:
+        Dictionary with 'success', 'message', 'granted', 'revoked' (changes
+        that modified the policy) and 'attempts'
+    
+    Example:
+        result = apply_role_changes(
+            grants=[('a@example.com', 'viewer'), ('b@example.com', 'admin')],
+            revokes=[('c@example.com', 'operator')]
+        )
+        print(result['message'])
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+    
+    changes = []
+    for grant, pairs in ((True, grants or []), (False, revokes or [])):
+        for email, role_name in pairs:
+            role_id = CLOUD_CONTROL_ROLES.get((role_name or '').lower())
+            if not role_id:
+                return {
+                    'success': False,
+                    'message': f'Invalid role name: {role_name}. Must be viewer, operator, or admin.',
+                    'granted': [],
+                    'revoked': [],
+                    'attempts': 0
+                }
+            changes.append((grant, email, role_name.lower(), f'projects/{project_id}/roles/{role_id}'))
+    
+    for attempt in range(1, max_retries + 1):
+        policy = get_project_iam_policy(project_id, use_cache=False)
+        if policy is None:
+            return {
+                'success': False,
+                'message': 'Failed to read IAM policy',
+                'granted': [],
+                'revoked': [],
+                'attempts': attempt
+            }
+        
+        granted, revoked = [], []
+        for grant, email, role_name, full_role in changes:
+            if _apply_binding_change(policy, f'user:{email}', full_role, grant):
+                (granted if grant else revoked).append({'email': email, 'role': role_name})
+        
+        if not granted and not revoked:
+            return {
+                'success': True,
+                'message': 'No changes needed',
+                'granted': [],
+                'revoked': [],
+                'attempts': attempt
+            }
+        
+        result = set_project_iam_policy(policy, project_id)
+        if result['success']:
+            return {
+                'success': True,
+                'message': f'Applied {len(granted)} grants and {len(revoked)} revokes',
+                'granted': granted,
+                'revoked': revoked,
+                'attempts': attempt
+            }
+        
+        if not result['conflict']:
+            return {
+                'success': False,
+                'message': result.get('error') or 'Failed to update IAM policy',
+                'granted': [],
+                'revoked': [],
+                'attempts': attempt
+            }
+        
+        # Someone else updated the policy: back off, re-read and re-apply
+        time.sleep(random.uniform(0, min(8.0, 0.5 * 2 ** attempt)))
+    
+    return {
+        'success': False,
+        'message': f'IAM policy kept changing concurrently; gave up after {max_retries} attempts',
+        'granted': [],
+        'revoked': [],
+        'attempts': max_retries
+    }
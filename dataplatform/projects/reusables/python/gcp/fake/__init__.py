@@ -0,0 +1,29 @@
+"""
+Fake gcloud stand-in for local testing and benchmarks.
+"""
+
+from .fixtures import (
+    FAKE_GCLOUD_PATH,
+    make_instances,
+    make_services,
+    make_buckets,
+    make_iam_policy,
+    generate_fixtures,
+    fake_gcloud_env,
+    reset_gcp_state,
+    use_fake_gcloud,
+    inject_gcloud_failures,
+)
+
+__all__ = [
+    'FAKE_GCLOUD_PATH',
+    'make_instances',
+    'make_services',
+    'make_buckets',
+    'make_iam_policy',
+    'generate_fixtures',
+    'fake_gcloud_env',
+    'reset_gcp_state',
+    'use_fake_gcloud',
+    'inject_gcloud_failures',
+]
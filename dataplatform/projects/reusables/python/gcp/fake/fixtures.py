@@ -0,0 +1,405 @@
+"""
+Fixture generator and helpers for the fake gcloud executable.
+Produces realistic gcloud JSON for N instances, services, buckets and IAM
+members, and points the gcp module at the fake.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterator
+
+
+FAKE_GCLOUD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gcloud.py')
+
+RUN_REGIONS = ['us-central1', 'europe-north1', 'europe-west1', 'asia-east1']
+# Regions that have services in generated fixtures (the rest stay empty)
+POPULATED_RUN_REGIONS = RUN_REGIONS[:3]
+ZONES = ['us-central1-a', 'us-central1-b', 'europe-north1-a', 'europe-west1-b']
+STATUSES = ['RUNNING', 'RUNNING', 'RUNNING', 'TERMINATED', 'STOPPING']
+MACHINE_TYPES = ['e2-micro', 'e2-small', 'e2-standard-2', 'n2-standard-4']
+
+
+def make_instances(count: int, project_id: str = 'fake-project') -> List[Dict[str, Any]]:
+    """
+    Generate Compute Engine instances shaped like `gcloud compute instances list`.
+
+    Args:
+        count: Number of instances
+        project_id: Project the instances belong to
+
+    Returns:
+        List of instance dictionaries
+    """
+    base = f'https://www.googleapis.com/compute/v1/projects/{project_id}'
+    instances = []
+    for i in range(count):
+        zone = ZONES[i % len(ZONES)]
+        name = f'vm-{i:06d}'
+        instances.append({
+            'kind': 'compute#instance',
+            'id': str(1000000000000000000 + i),
+            'name': name,
+            'zone': f'{base}/zones/{zone}',
+            'machineType': f'{base}/zones/{zone}/machineTypes/{MACHINE_TYPES[i % len(MACHINE_TYPES)]}',
+            'status': STATUSES[i % len(STATUSES)],
+            'creationTimestamp': f'2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}T10:00:00.000-07:00',
+            'selfLink': f'{base}/zones/{zone}/instances/{name}',
+            'fingerprint': f'fp{i:08x}=',
+            'labels': {'env': ['dev', 'staging', 'prod'][i % 3], 'team': f'team-{i % 7}'},
+            'tags': {'items': ['http-server', 'https-server'], 'fingerprint': 'tagfp='},
+            'networkInterfaces': [{
+                'name': 'nic0',
+                'network': f'{base}/global/networks/default',
+                'subnetwork': f'{base}/regions/{zone[:-2]}/subnetworks/default',
+                'networkIP': f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}',
+                'accessConfigs': [{
+                    'kind': 'compute#accessConfig',
+                    'name': 'External NAT',
+                    'natIP': f'34.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}',
+                    'type': 'ONE_TO_ONE_NAT',
+                    'networkTier': 'PREMIUM',
+                }],
+                'fingerprint': 'nicfp=',
+                'stackType': 'IPV4_ONLY',
+            }],
+            'disks': [{
+                'kind': 'compute#attachedDisk',
+                'boot': True,
+                'autoDelete': True,
+                'deviceName': name,
+                'diskSizeGb': '10',
+                'mode': 'READ_WRITE',
+                'source': f'{base}/zones/{zone}/disks/{name}',
+                'type': 'PERSISTENT',
+                'licenses': ['https://www.googleapis.com/compute/v1/projects/debian-cloud/global/licenses/debian-12-bookworm'],
+            }],
+            'metadata': {
+                'kind': 'compute#metadata',
+                'fingerprint': 'mdfp=',
+                'items': [
+                    {'key': 'startup-script', 'value': '#!/bin/bash\napt-get update\napt-get install -y nginx\n'},
+                    {'key': 'enable-oslogin', 'value': 'TRUE'},
+                ],
+            },
+            'serviceAccounts': [{
+                'email': f'{project_id}-compute@developer.gserviceaccount.com',
+                'scopes': ['https://www.googleapis.com/auth/cloud-platform'],
+            }],
+            'scheduling': {'automaticRestart': True, 'onHostMaintenance': 'MIGRATE', 'preemptible': False},
+            'shieldedInstanceConfig': {'enableSecureBoot': False, 'enableVtpm': True, 'enableIntegrityMonitoring': True},
+        })
+    return instances
+
+
+def make_services(count: int, project_id: str = 'fake-project') -> List[Dict[str, Any]]:
+    """
+    Generate Cloud Run services shaped like `gcloud run services list`.
+
+    Services are spread over POPULATED_RUN_REGIONS; each carries its region
+    in the cloud.googleapis.com/location label, which the fake filters on.
+
+    Args:
+        count: Number of services
+        project_id: Project the services belong to
+
+    Returns:
+        List of service dictionaries
+    """
+    services = []
+    for i in range(count):
+        region = POPULATED_RUN_REGIONS[i % len(POPULATED_RUN_REGIONS)]
+        name = f'svc-{i:06d}'
+        revision = f'{name}-{(i % 50) + 1:05d}-abc'
+        services.append({
+            'apiVersion': 'serving.knative.dev/v1',
+            'kind': 'Service',
+            'metadata': {
+                'name': name,
+                'namespace': '123456789012',
+                'uid': f'00000000-0000-0000-0000-{i:012d}',
+                'resourceVersion': f'AAY{i:010d}',
+                'generation': (i % 50) + 1,
+                'creationTimestamp': '2024-05-01T12:00:00.000000Z',
+                'labels': {'cloud.googleapis.com/location': region, 'env': ['dev', 'prod'][i % 2]},
+                'annotations': {
+                    'run.googleapis.com/client-name': 'gcloud',
+                    'run.googleapis.com/ingress': 'all',
+                    'serving.knative.dev/creator': f'deployer@{project_id}.iam.gserviceaccount.com',
+                    'serving.knative.dev/lastModifier': f'deployer@{project_id}.iam.gserviceaccount.com',
+                },
+            },
+            'spec': {
+                'template': {
+                    'metadata': {'annotations': {'autoscaling.knative.dev/maxScale': '10'}},
+                    'spec': {
+                        'containerConcurrency': 80,
+                        'timeoutSeconds': 300,
+                        'serviceAccountName': f'{project_id}-compute@developer.gserviceaccount.com',
+                        'containers': [{
+                            'image': f'europe-north1-docker.pkg.dev/{project_id}/apps/{name}:latest',
+                            'ports': [{'name': 'http1', 'containerPort': 8080}],
+                            'env': [{'name': 'ENVIRONMENT', 'value': 'production'}],
+                            'resources': {'limits': {'cpu': '1000m', 'memory': '512Mi'}},
+                        }],
+                    },
+                },
+                'traffic': [{'percent': 100, 'latestRevision': True}],
+            },
+            'status': {
+                'observedGeneration': (i % 50) + 1,
+                'conditions': [
+                    {'type': 'Ready', 'status': 'True', 'lastTransitionTime': '2024-05-01T12:01:00.000000Z'},
+                    {'type': 'ConfigurationsReady', 'status': 'True', 'lastTransitionTime': '2024-05-01T12:01:00.000000Z'},
+                    {'type': 'RoutesReady', 'status': 'True', 'lastTransitionTime': '2024-05-01T12:01:00.000000Z'},
+                ],
+                'latestReadyRevisionName': revision,
+                'latestCreatedRevisionName': revision,
+                'traffic': [{'revisionName': revision, 'percent': 100, 'latestRevision': True}],
+                'url': f'https://{name}-abcdefghij-{region[:2]}.a.run.app',
+                'address': {'url': f'https://{name}-abcdefghij-{region[:2]}.a.run.app'},
+            },
+        })
+    return services
+
+
+def make_buckets(count: int, project_id: str = 'fake-project') -> List[Dict[str, Any]]:
+    """
+    Generate Cloud Storage buckets shaped like `gcloud storage buckets list`.
+
+    Args:
+        count: Number of buckets
+        project_id: Project the buckets belong to
+
+    Returns:
+        List of bucket dictionaries
+    """
+    buckets = []
+    for i in range(count):
+        name = f'{project_id}-bucket-{i:06d}'
+        buckets.append({
+            'name': name,
+            'storage_url': f'gs://{name}/',
+            'location': ['US', 'EU', 'EUROPE-NORTH1'][i % 3],
+            'location_type': ['multi-region', 'multi-region', 'region'][i % 3],
+            'default_storage_class': ['STANDARD', 'NEARLINE', 'COLDLINE'][i % 3],
+            'creation_time': '2024-03-01T08:00:00+0000',
+            'update_time': f'2024-06-{(i % 28) + 1:02d}T08:00:00+0000',
+            'metageneration': (i % 5) + 1,
+            'public_access_prevention': 'enforced',
+            'uniform_bucket_level_access': True,
+            'soft_delete_policy': {'effectiveTime': '2024-03-01T08:00:00+00:00', 'retentionDurationSeconds': '604800'},
+            'labels': {'env': ['dev', 'prod'][i % 2]},
+        })
+    return buckets
+
+
+def make_iam_policy(member_count: int, project_id: str = 'fake-project') -> Dict[str, Any]:
+    """
+    Generate a project IAM policy shaped like `gcloud projects get-iam-policy`.
+
+    Members get Cloud Control Center roles (admin/operator/viewer) plus a
+    spread of predefined roles. admin@example.com is always an admin.
+
+    Args:
+        member_count: Number of user members
+        project_id: Project the policy belongs to
+
+    Returns:
+        Policy dictionary with 'bindings', 'etag' and 'version'
+    """
+    roles: Dict[str, List[str]] = {
+        f'projects/{project_id}/roles/cloudControlCenterAdmin': ['user:admin@example.com'],
+        f'projects/{project_id}/roles/cloudControlCenterOperator': [],
+        f'projects/{project_id}/roles/cloudControlCenterViewer': [],
+        'roles/viewer': [],
+        'roles/editor': [],
+        'roles/owner': ['user:admin@example.com'],
+        'roles/run.invoker': [f'serviceAccount:{project_id}@appspot.gserviceaccount.com'],
+    }
+    cloud_control = [
+        f'projects/{project_id}/roles/cloudControlCenterViewer',
+        f'projects/{project_id}/roles/cloudControlCenterOperator',
+        f'projects/{project_id}/roles/cloudControlCenterAdmin',
+    ]
+    for i in range(member_count):
+        member = f'user:user{i:06d}@example.com'
+        roles[cloud_control[0] if i % 10 < 7 else cloud_control[1] if i % 10 < 9 else cloud_control[2]].append(member)
+        roles[['roles/viewer', 'roles/editor'][i % 2]].append(member)
+
+    return {
+        'bindings': [{'role': role, 'members': members} for role, members in roles.items() if members],
+        'etag': 'BwYAAAAAAAE=',
+        'version': 1,
+    }
+
+
+def generate_fixtures(
+    state_dir: str,
+    instances: int = 10,
+    services: int = 10,
+    buckets: int = 10,
+    members: int = 10,
+    project_id: str = 'fake-project'
+) -> str:
+    """
+    Write a fake gcloud state directory.
+
+    Args:
+        state_dir: Directory to write (created if missing)
+        instances: Number of Compute Engine instances
+        services: Number of Cloud Run services
+        buckets: Number of Cloud Storage buckets
+        members: Number of IAM user members
+        project_id: Project ID used in resource names and roles
+
+    Returns:
+        The state directory path
+
+    Example:
+        generate_fixtures('/tmp/fake-gcloud', instances=1000, members=100)
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    files = {
+        'compute_instances.json': make_instances(instances, project_id),
+        'cloud_run_services.json': make_services(services, project_id),
+        'storage_buckets.json': make_buckets(buckets, project_id),
+        'iam_policy.json': make_iam_policy(members, project_id),
+        'projects.json': [
+            {'projectId': project_id, 'name': project_id, 'projectNumber': '123456789012',
+             'lifecycleState': 'ACTIVE', 'parent': {'type': 'organization', 'id': '42'}},
+        ],
+    }
+    for filename, data in files.items():
+        with open(os.path.join(state_dir, filename), 'w') as f:
+            json.dump(data, f)
+    return state_dir
+
+
+def fake_gcloud_env(
+    state_dir: str,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    failure_rate: float = 0.0,
+    failure: str = 'quota'
+) -> Dict[str, str]:
+    """
+    Environment variables that route the gcp module to the fake gcloud.
+
+    Args:
+        state_dir: Directory written by generate_fixtures()
+        latency_ms: Added latency per call
+        jitter_ms: Random extra latency per call (0..jitter_ms)
+        failure_rate: Probability (0-1) that a call fails
+        failure: Injected failure kind: 'quota', 'unavailable' or 'permission'
+
+    Returns:
+        Dictionary of environment variables
+    """
+    return {
+        'GCLOUD_BIN': f'"{sys.executable}" "{FAKE_GCLOUD_PATH}"',
+        'FAKE_GCLOUD_STATE': state_dir,
+        'FAKE_GCLOUD_LATENCY_MS': str(latency_ms),
+        'FAKE_GCLOUD_JITTER_MS': str(jitter_ms),
+        'FAKE_GCLOUD_FAILURE_RATE': str(failure_rate),
+        'FAKE_GCLOUD_FAILURE': failure,
+    }
+
+
+def reset_gcp_state() -> None:
+    """Clear the gcp module's caches so the next call really hits gcloud."""
+    from ..cache import CommandCache
+    from ..governor import CallGovernor
+    from ..client import clear_cloud_run_region_cache
+
+    CommandCache.reset()
+    CallGovernor.reset()
+    clear_cloud_run_region_cache()
+
+
+@contextmanager
+def inject_gcloud_failures(failure: str = 'permission', rate: float = 1.0) -> Iterator[None]:
+    """
+    Make fake gcloud calls fail inside a use_fake_gcloud() block.
+
+    Cached gcloud results are dropped on entry and exit, so calls in the
+    block really reach the fake and later calls don't see its failures.
+
+    Args:
+        failure: Injected failure kind: 'quota', 'unavailable' or 'permission'
+        rate: Probability (0-1) that a call fails
+
+    Example:
+        with use_fake_gcloud(instances=5):
+            with inject_gcloud_failures('permission'):
+                result = collect_resources()
+    """
+    env = {'FAKE_GCLOUD_FAILURE_RATE': str(rate), 'FAKE_GCLOUD_FAILURE': failure}
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    reset_gcp_state()
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        reset_gcp_state()
+
+
+@contextmanager
+def use_fake_gcloud(
+    state_dir: Optional[str] = None,
+    instances: int = 10,
+    services: int = 10,
+    buckets: int = 10,
+    members: int = 10,
+    project_id: str = 'fake-project',
+    **env_options: Any
+) -> Iterator[str]:
+    """
+    Run a block against the fake gcloud.
+
+    Generates fixtures (into a temporary directory unless state_dir is
+    given), sets the environment and resets the gcp module's caches; the
+    previous environment is restored afterwards.
+
+    Args:
+        state_dir: Existing state directory to use instead of generating one
+        instances, services, buckets, members: Fixture sizes
+        project_id: Project ID (also exported as GCP_PROJECT_ID)
+        **env_options: latency_ms, jitter_ms, failure_rate, failure
+
+    Yields:
+        The state directory
+
+    Example:
+        with use_fake_gcloud(instances=1000, latency_ms=200):
+            resources = list_all_resources()
+    """
+    temp_dir = None
+    if state_dir is None:
+        temp_dir = state_dir = tempfile.mkdtemp(prefix='fake-gcloud-')
+        generate_fixtures(state_dir, instances, services, buckets, members, project_id)
+
+    env = fake_gcloud_env(state_dir, **env_options)
+    env['GCP_PROJECT_ID'] = project_id
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    reset_gcp_state()
+    try:
+        yield state_dir
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        reset_gcp_state()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Fake gcloud executable for local testing and benchmarks.
+
+Serves the JSON written by fixtures.generate_fixtures() for the commands
+the gcp module uses, applies --format="json(...)" projections, and
+supports IAM policy mutations with etag checks. Asset searches report
+each state file's items with the file's modification time as updateTime. Point the gcp module at it
+with GCLOUD_BIN (see fixtures.fake_gcloud_env()).
+
+Environment variables:
+    FAKE_GCLOUD_STATE: State directory (required)
+    FAKE_GCLOUD_LATENCY_MS: Added latency per call (default: 0)
+    FAKE_GCLOUD_JITTER_MS: Random extra latency per call (default: 0)
+    FAKE_GCLOUD_FAILURE_RATE: Probability (0-1) that a call fails (default: 0)
+    FAKE_GCLOUD_FAILURE: 'quota', 'unavailable' or 'permission' (default: quota)
+"""
+
+import os
+import sys
+import json
+import random
+import re
+import time
+
+
+FAILURES = {
+    'quota': "ERROR: (gcloud.{cmd}) HTTPError 429: Quota exceeded for quota metric 'Read requests' and limit 'Read requests per minute'",
+    'unavailable': 'ERROR: (gcloud.{cmd}) HTTPError 503: UNAVAILABLE: The service is currently unavailable.',
+    'permission': 'ERROR: (gcloud.{cmd}) PERMISSION_DENIED: The caller does not have permission',
+}
+
+RUN_REGIONS = ['us-central1', 'europe-north1', 'europe-west1', 'asia-east1']
+
+# Cloud Asset Inventory type -> state file; an asset's updateTime is its
+# file's modification time
+ASSET_FILES = {
+    'compute.googleapis.com/Instance': 'compute_instances.json',
+    'run.googleapis.com/Service': 'cloud_run_services.json',
+    'storage.googleapis.com/Bucket': 'storage_buckets.json',
+    'sqladmin.googleapis.com/Instance': 'sql.json',
+    'container.googleapis.com/Cluster': 'container.json',
+    'pubsub.googleapis.com/Topic': 'pubsub.json',
+    'cloudfunctions.googleapis.com/CloudFunction': 'functions.json',
+}
+
+
+def fail(message: str, code: int = 1) -> None:
+    sys.stderr.write(message + '\n')
+    sys.exit(code)
+
+
+def state_path(name: str) -> str:
+    return os.path.join(os.environ['FAKE_GCLOUD_STATE'], name)
+
+
+def load(name: str, default=None):
+    path = state_path(name)
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(name: str, data) -> None:
+    # Write then rename, so concurrent readers never see a partial file
+    path = state_path(name)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def split_keys(projection: str):
+    """Split 'a,b.c,d(e,f)' at top-level commas."""
+    keys, depth, current = [], 0, ''
+    for ch in projection:
+        if ch == ',' and depth == 0:
+            keys.append(current.strip())
+            current = ''
+            continue
+        depth += ch == '('
+        depth -= ch == ')'
+        current += ch
+    if current.strip():
+        keys.append(current.strip())
+    return keys
+
+
+def project_item(item, keys):
+    """Apply gcloud-style projection keys (dotted paths, [n] indexes, basename())."""
+    out = {}
+    for key in keys:
+        transform = None
+        if key.endswith('.basename()'):
+            key, transform = key[:-len('.basename()')], 'basename'
+
+        parts = key.split('.')
+        value = item
+        path = []
+        for part in parts:
+            match = re.match(r'^([^\[]+)(?:\[(\d+)\])?$', part)
+            if not match or not isinstance(value, dict):
+                value = None
+                break
+            name, index = match.group(1), match.group(2)
+            value = value.get(name)
+            if index is not None:
+                value = value[int(index)] if isinstance(value, list) and len(value) > int(index) else None
+                path.append((name, int(index)))
+            else:
+                path.append((name, None))
+            if value is None:
+                break
+        if value is None:
+            continue
+        if transform == 'basename' and isinstance(value, str):
+            value = value.rsplit('/', 1)[-1]
+
+        # Rebuild the nested structure along the path
+        target = out
+        for i, (name, index) in enumerate(path):
+            last = i == len(path) - 1
+            if index is None:
+                if last:
+                    target[name] = value
+                else:
+                    target = target.setdefault(name, {})
+            else:
+                items = target.setdefault(name, [])
+                while len(items) <= index:
+                    items.append({})
+                if last:
+                    items[index] = value
+                else:
+                    target = items[index]
+    return out
+
+
+def output(data, fmt: str) -> None:
+    match = re.match(r'^json\((.*)\)$', fmt or '')
+    if match:
+        keys = split_keys(match.group(1))
+        if isinstance(data, list):
+            data = [project_item(item, keys) for item in data]
+        else:
+            data = project_item(data, keys)
+    json.dump(data, sys.stdout)
+    sys.stdout.write('\n')
+
+
+def search_assets(asset_types):
+    assets = []
+    for asset_type in asset_types or ASSET_FILES:
+        name = ASSET_FILES.get(asset_type)
+        if not name or not os.path.exists(state_path(name)):
+            continue
+        updated = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(os.path.getmtime(state_path(name))))
+        for item in load(name, []):
+            assets.append({'assetType': asset_type, 'updateTime': f'{updated}.000000Z', 'displayName': item.get('name')})
+    return assets
+
+
+def apply_binding(policy, member: str, role: str, grant: bool) -> None:
+    bindings = policy.setdefault('bindings', [])
+    for binding in bindings:
+        if binding['role'] == role and 'condition' not in binding:
+            if grant and member not in binding['members']:
+                binding['members'].append(member)
+            elif not grant and member in binding['members']:
+                binding['members'].remove(member)
+            break
+    else:
+        if grant:
+            bindings.append({'role': role, 'members': [member]})
+        else:
+            fail('ERROR: Policy binding with the specified principal and role not found!')
+    policy['bindings'] = [b for b in bindings if b['members']]
+
+
+def next_etag(etag: str) -> str:
+    counter = int(re.sub(r'\D', '', etag) or 0) + 1
+    return f'BwY{counter:09d}='
+
+
+def main(argv) -> None:
+    positional = [a for a in argv if not a.startswith('--')]
+    flags = {}
+    for a in argv:
+        if a.startswith('--'):
+            name, _, value = a[2:].partition('=')
+            flags[name] = value
+
+    latency = float(os.getenv('FAKE_GCLOUD_LATENCY_MS', '0')) + random.uniform(0, float(os.getenv('FAKE_GCLOUD_JITTER_MS', '0')))
+    if latency > 0:
+        time.sleep(latency / 1000)
+
+    cmd = '.'.join(positional[:3])
+    if random.random() < float(os.getenv('FAKE_GCLOUD_FAILURE_RATE', '0')):
+        fail(FAILURES.get(os.getenv('FAKE_GCLOUD_FAILURE', 'quota'), FAILURES['quota']).format(cmd=cmd))
+
+    fmt = flags.get('format', '')
+    command = ' '.join(positional[:3])
+
+    if command == 'compute instances list':
+        output(load('compute_instances.json', []), fmt)
+    elif command == 'run regions list':
+        output([{'locationId': r, 'name': f'projects/fake/locations/{r}', 'displayName': r} for r in RUN_REGIONS], fmt)
+    elif command == 'run services list':
+        services = load('cloud_run_services.json', [])
+        region = flags.get('region')
+        if region:
+            services = [s for s in services if s['metadata']['labels'].get('cloud.googleapis.com/location') == region]
+        output(services, fmt)
+    elif command == 'storage buckets list':
+        output(load('storage_buckets.json', []), fmt)
+    elif command in ('sql instances list', 'container clusters list', 'pubsub topics list'):
+        output(load(positional[0] + '.json', []), fmt)
+    elif positional[:2] == ['functions', 'list']:
+        output(load('functions.json', []), fmt)
+    elif positional[:2] == ['asset', 'search-all-resources']:
+        output(search_assets([t for t in flags.get('asset-types', '').split(',') if t]), fmt)
+    elif positional[:2] == ['projects', 'list']:
+        output(load('projects.json', []), fmt)
+    elif command == 'resource-manager folders list':
+        output([], fmt)
+    elif positional[:2] == ['projects', 'get-iam-policy']:
+        output(load('iam_policy.json', {'bindings': [], 'etag': 'BwY000000000=', 'version': 1}), fmt)
+    elif positional[:2] == ['projects', 'set-iam-policy']:
+        with open(positional[3]) as f:
+            new_policy = json.load(f)
+        current = load('iam_policy.json', {'bindings': [], 'etag': 'BwY000000000='})
+        if new_policy.get('etag') and new_policy['etag'] != current.get('etag'):
+            fail('ERROR: (gcloud.projects.set-iam-policy) ABORTED: There were concurrent policy changes. '
+                 'Please retry the whole read-modify-write with exponential backoff.')
+        new_policy['etag'] = next_etag(current.get('etag', ''))
+        save('iam_policy.json', new_policy)
+        output(new_policy, fmt)
+    elif positional[:2] in (['projects', 'add-iam-policy-binding'], ['projects', 'remove-iam-policy-binding']):
+        policy = load('iam_policy.json', {'bindings': [], 'etag': 'BwY000000000='})
+        apply_binding(policy, flags['member'], flags['role'], positional[1].startswith('add'))
+        policy['etag'] = next_etag(policy.get('etag', ''))
+        save('iam_policy.json', policy)
+        output(policy, fmt)
+    else:
+        fail(f'ERROR: (gcloud) Invalid choice: fake gcloud does not implement "{command}"', code=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
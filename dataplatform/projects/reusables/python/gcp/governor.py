@@ -0,0 +1,447 @@
+"""
+Call governor for gcloud commands in Noah Sjursen Cloud.
+Client-side rate limiting per API family, error classification,
+retries with jittered exponential backoff, and caller deadlines.
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional, Dict, Any, Callable, Iterator
+
+from .cache import parse_command
+from .telemetry import emit
+
+
+# Quota / rate limit rejections: the request was not processed, safe to retry
+THROTTLE_PATTERNS = re.compile(
+    r'\b429\b|RESOURCE_EXHAUSTED|RATE_LIMIT_EXCEEDED|rateLimitExceeded|'
+    r'quotaExceeded|Quota exceeded|userRateLimitExceeded|Too Many Requests',
+    re.IGNORECASE
+)
+
+# Server-side or network failures that usually succeed on retry
+TRANSIENT_PATTERNS = re.compile(
+    r'\b50[0234]\b|UNAVAILABLE|DEADLINE_EXCEEDED|INTERNAL|backendError|internalError|'
+    r'Internal error|Service Unavailable|timed out|Connection reset|Connection aborted|'
+    r'TransportError|ServerNotFoundError',
+    re.IGNORECASE
+)
+
+# Errors that will never succeed on retry, checked first
+PERMANENT_PATTERNS = re.compile(
+    r'PERMISSION_DENIED|NOT_FOUND|INVALID_ARGUMENT|ALREADY_EXISTS|FAILED_PRECONDITION|'
+    r'UNAUTHENTICATED|\b40[0134]\b',
+    re.IGNORECASE
+)
+
+
+# Per-family default rates (calls per second) where GCLOUD_RATE_LIMIT is too
+# low: Cloud Run's read quota is per region, and a GCP_RUN_REGIONS fan-out
+# spreads its calls over the regions
+DEFAULT_FAMILY_RATES: Dict[str, float] = {'run': 40}
+
+# time.monotonic() by which the current caller needs its gcloud calls done
+_deadline: ContextVar[Optional[float]] = ContextVar('gcloud_deadline', default=None)
+
+
+@contextmanager
+def gcloud_deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound every gcloud command run inside the block to `seconds` from now.
+
+    Commands get their subprocess timeout cut to the time left (the
+    process is killed at the deadline), aren't retried once the backoff
+    would overrun it, and fail right away when it has passed. A nested
+    deadline never extends an outer one.
+
+    Example:
+        with gcloud_deadline(10):
+            instances = list_compute_instances('my-project')
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current gcloud deadline (None without one)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def with_deadline(func: Callable) -> Callable:
+    """
+    Carry the caller's gcloud deadline into a function run on another thread.
+
+    Example:
+        executor.map(with_deadline(query_region), regions)
+    """
+    deadline = _deadline.get()
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        token = _deadline.set(deadline)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+    return run
+
+
+def _deadline_result(error: str, attempts: int) -> Dict[str, Any]:
+    """Result dict for a command given up on at the caller's deadline."""
+    return {
+        'success': False,
+        'data': None,
+        'error': error,
+        'error_class': 'deadline',
+        'attempts': attempts,
+    }
+
+
+def classify_error(error: Optional[str]) -> str:
+    """
+    Classify a gcloud error message.
+
+    Args:
+        error: stderr / error message from a failed command
+
+    Returns:
+        'throttled' (429/quota), 'transient' (5xx, network, timeout) or 'permanent'
+
+    Example:
+        classify_error('ERROR: (gcloud.compute.instances.list) Quota exceeded')
+        # 'throttled'
+    """
+    error = error or ''
+    if THROTTLE_PATTERNS.search(error):
+        return 'throttled'
+    if PERMANENT_PATTERNS.search(error):
+        return 'permanent'
+    if TRANSIENT_PATTERNS.search(error):
+        return 'transient'
+    return 'permanent'
+
+
+def command_family(command: str) -> str:
+    """
+    Get the API family of a gcloud command (its top-level group).
+
+    Example:
+        command_family('compute instances list --project=a')  # 'compute'
+    """
+    _, family, _ = parse_command(command)
+    return family.split(' ')[0] if family else 'gcloud'
+
+
+def _parse_rate_limits(value: str) -> Dict[str, float]:
+    """Parse 'compute=10,run=5' into {'compute': 10.0, 'run': 5.0}."""
+    limits = {}
+    for part in value.split(','):
+        if '=' in part:
+            family, rate = part.split('=', 1)
+            limits[family.strip()] = float(rate)
+    return limits
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Usage:
+        bucket = TokenBucket(rate=5, burst=10)
+        bucket.acquire()  # Blocks until a token is available
+        bucket.acquire(timeout=2)  # None if no token within 2 seconds
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second (0 or less: unlimited)
+            burst: Bucket capacity (default: max(1, rate); at least 1)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available.
+
+        Returns:
+            0.0 if tokens were taken, otherwise seconds to wait before retrying
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Block until tokens are available.
+
+        Args:
+            tokens: Tokens to take
+            timeout: Longest total wait in seconds (None: no limit)
+
+        Returns:
+            Total seconds spent waiting, or None if the tokens wouldn't be
+            available within the timeout (nothing is taken then)
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                return None
+            time.sleep(wait)
+            waited += wait
+
+
+class CallGovernor:
+    """
+    Rate limits and retries gcloud commands.
+
+    Every command takes a token from its API family's bucket before it
+    runs. Failed read commands are retried on throttled and transient
+    errors; mutating commands only on throttled errors (the request was
+    rejected before it was processed), so a create is never replayed
+    after a server-side failure. A command killed at its own subprocess
+    timeout is only retried (reads only) under a gcloud_deadline(), so a
+    hung call can't be repeated for minutes. Nothing is retried, or waits
+    for a rate limit token, past the caller's gcloud_deadline().
+
+    Usage:
+        from reusables.python.gcp.governor import get_governor
+
+        result = get_governor().call('compute instances list', run)
+        print(get_governor().stats())
+    """
+
+    _instance: Optional['CallGovernor'] = None
+
+    @classmethod
+    def get_governor(cls) -> 'CallGovernor':
+        """
+        Get or create the shared governor.
+
+        Environment variables:
+            GCLOUD_RATE_LIMIT: Default calls per second per API family (default: 10; 0: unlimited)
+            GCLOUD_RATE_LIMITS: Per-family overrides (e.g., 'compute=20,projects=5,run=0';
+                                on top of DEFAULT_FAMILY_RATES)
+            GCLOUD_MAX_RETRIES: Retries per command (default: 4)
+            GCLOUD_BACKOFF_BASE: First backoff ceiling in seconds (default: 0.5)
+            GCLOUD_BACKOFF_MAX: Backoff ceiling in seconds (default: 20)
+
+        Returns:
+            Shared CallGovernor instance
+        """
+        if cls._instance is None:
+            default_rate = float(os.getenv('GCLOUD_RATE_LIMIT', '10'))
+            # Family defaults only ever raise a (limited) default rate
+            rates = {} if default_rate <= 0 else {
+                family: max(rate, default_rate) for family, rate in DEFAULT_FAMILY_RATES.items()
+            }
+            rates.update(_parse_rate_limits(os.getenv('GCLOUD_RATE_LIMITS', '')))
+            cls._instance = cls(
+                default_rate=default_rate,
+                rates=rates,
+                max_retries=int(os.getenv('GCLOUD_MAX_RETRIES', '4')),
+                backoff_base=float(os.getenv('GCLOUD_BACKOFF_BASE', '0.5')),
+                backoff_max=float(os.getenv('GCLOUD_BACKOFF_MAX', '20'))
+            )
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        """Reset the singleton instance (useful for testing)."""
+        cls._instance = None
+
+    def __init__(
+        self,
+        default_rate: float = 10,
+        rates: Optional[Dict[str, float]] = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20
+    ):
+        self.default_rate = default_rate
+        self.rates = rates or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _bucket(self, family: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(family)
+            if bucket is None:
+                rate = self.rates.get(family, self.default_rate)
+                # A rate of 0 or less disables the limit for the family
+                bucket = self._buckets[family] = TokenBucket(rate, burst=rate * 2)
+            return bucket
+
+    def _record(self, family: str, **counts: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(family, {
+                'calls': 0, 'retries': 0, 'throttled': 0, 'throttle_seconds': 0.0,
+                'throttled_errors': 0, 'transient_errors': 0, 'permanent_errors': 0, 'timeout_errors': 0, 'gave_up': 0,
+                'deadline_exceeded': 0,
+            })
+            for name, value in counts.items():
+                stats[name] += value
+
+    def acquire(self, command: str) -> Optional[float]:
+        """
+        Wait for a rate limit token for a command without running it.
+
+        Never waits past the caller's gcloud_deadline().
+
+        Args:
+            command: gcloud command (without 'gcloud' prefix)
+
+        Returns:
+            Seconds spent waiting, or None if no token could be had before
+            the deadline
+        """
+        family = command_family(command)
+        left = time_left()
+        waited = self._bucket(family).acquire(timeout=None if left is None else max(0.0, left))
+        if waited is None:
+            self._record(family, deadline_exceeded=1)
+            return None
+        if waited > 0:
+            self._record(family, throttled=1, throttle_seconds=waited)
+            emit('gcloud.throttle', waited, family=family)
+        return waited
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a retry attempt (1-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, command: str, run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a command under the rate limit, retrying retryable failures.
+
+        Args:
+            command: gcloud command (without 'gcloud' prefix)
+            run: Function executing the command, returning a result dict
+                 with 'success' and 'error'
+
+        Returns:
+            Result dictionary of the last attempt, with 'error_class' and
+            'attempts' added
+        """
+        family = command_family(command)
+        _, _, is_read = parse_command(command)
+        retryable = ('throttled', 'transient') if is_read else ('throttled',)
+
+        attempt = 0
+        while True:
+            left = time_left()
+            if left is not None and left <= 0:
+                self._record(family, deadline_exceeded=1)
+                return _deadline_result('Deadline exceeded before the command ran', attempt)
+            if self.acquire(command) is None:
+                return _deadline_result('Deadline exceeded waiting for the rate limit', attempt)
+
+            attempt += 1
+            self._record(family, calls=1)
+
+            result = run()
+            if result.get('success'):
+                result['attempts'] = attempt
+                return result
+
+            error_class = 'timeout' if result.get('timed_out') else classify_error(result.get('error'))
+            self._record(family, **{f'{error_class}_errors': 1})
+            result['error_class'] = error_class
+            result['attempts'] = attempt
+
+            if error_class == 'timeout':
+                # Only a deadline bounds how long retrying a hung call can take
+                if not is_read or time_left() is None:
+                    return result
+            elif error_class not in retryable:
+                return result
+            if attempt > self.max_retries:
+                self._record(family, gave_up=1)
+                return result
+
+            delay = self.backoff(attempt)
+            left = time_left()
+            if left is not None and delay >= left:
+                # The retry couldn't finish before the caller gives up on it
+                self._record(family, deadline_exceeded=1)
+                return result
+
+            self._record(family, retries=1)
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get throttle and retry counters.
+
+        Returns:
+            Dictionary with 'total' and 'by_family' counters
+
+        Example:
+            stats = get_governor().stats()
+            print(stats['total']['retries'], stats['by_family']['compute'])
+        """
+        with self._lock:
+            by_family = {family: dict(stats) for family, stats in self._stats.items()}
+        total: Dict[str, float] = {}
+        for stats in by_family.values():
+            for name, value in stats.items():
+                total[name] = total.get(name, 0) + value
+        return {'total': total, 'by_family': by_family}
+
+
+# Convenience functions
+def get_governor() -> CallGovernor:
+    """
+    Get the shared gcloud call governor.
+
+    Returns:
+        Shared CallGovernor instance
+    """
+    return CallGovernor.get_governor()
+
+
+def get_governor_stats() -> Dict[str, Any]:
+    """
+    Get gcloud throttle and retry counts.
+
+    Returns:
+        Dictionary with 'total' and 'by_family' counters
+
+    Example:
+        print(get_governor_stats()['total'])
+        # {'calls': 42, 'retries': 3, 'throttled': 5, 'throttle_seconds': 1.2, ...}
+    """
+    return get_governor().stats()
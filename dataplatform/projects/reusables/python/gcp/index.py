@@ -0,0 +1,378 @@
+"""
+In-memory resource index for Noah Sjursen Cloud.
+Indexes an inventory snapshot on name prefix, status, location, labels and
+type, so filtered, sorted and paginated queries never re-list resources.
+"""
+
+import base64
+import bisect
+import json
+import threading
+from typing import Optional, Dict, Any, List, Set, Tuple, Iterable, Union
+
+from .inventory import resource_key, _get_path
+
+
+# (resource_type, resource_key)
+Ident = Tuple[str, str]
+
+SORT_FIELDS = ('name', 'type', 'status', 'location', 'project')
+
+
+def _basename(value: Any) -> str:
+    return str(value).rsplit('/', 1)[-1] if value else ''
+
+
+def index_fields(resource_type: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the indexed fields of a resource.
+
+    Works with full documents and summary projections of every built-in
+    resource type; unknown types fall back to top-level 'name', 'status'
+    or 'state', 'location' or 'region', and 'labels'.
+
+    Args:
+        resource_type: Resource type key
+        item: Resource dictionary
+
+    Returns:
+        Dictionary with 'name', 'status', 'location', 'labels' and 'project'
+
+    Example:
+        index_fields('compute_instances', instance)
+        # {'name': 'web-1', 'status': 'RUNNING', 'location': 'us-central1-a', ...}
+    """
+    name = _basename(item.get('name') or _get_path(item, 'metadata.name') or item.get('id'))
+
+    status = item.get('status') or item.get('state')
+    if isinstance(status, dict):
+        # Cloud Run: status.conditions[0] is the Ready condition
+        conditions = status.get('conditions') or [{}]
+        ready = conditions[0].get('status')
+        status = {'True': 'READY', 'False': 'FAILED'}.get(ready, 'UNKNOWN') if ready else None
+
+    labels = item.get('labels') or _get_path(item, 'metadata.labels') or {}
+    if not isinstance(labels, dict):
+        labels = {}
+
+    location = item.get('zone') or item.get('region') or item.get('location')
+    if not location and resource_type == 'cloud_run_services':
+        location = labels.get('cloud.googleapis.com/location')
+
+    return {
+        'name': name,
+        'status': str(status) if status else '',
+        'location': _basename(location),
+        'labels': labels,
+        'project': item.get('project_id') or '',
+    }
+
+
+def encode_cursor(position: Tuple) -> str:
+    """Encode a sort position as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(position)).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, str]:
+    """Decode a cursor from encode_cursor() (raises ValueError if malformed)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    # Positions are (sort value, type, key); anything else can't be compared with them
+    if not isinstance(position, list) or len(position) != 3 or not all(isinstance(p, str) for p in position):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return tuple(position)
+
+
+class ResourceIndex:
+    """
+    Queryable in-memory index over an inventory snapshot.
+
+    Keeps a sorted name list (prefix lookups and name-ordered pages) and
+    inverted indexes for type, status, location and labels. Filters are
+    answered by intersecting index sets, smallest first.
+
+    Usage:
+        from reusables.python.gcp import InventoryStore, ResourceIndex
+
+        store = InventoryStore('my-project')
+        index = ResourceIndex()
+        index.apply(store.sync())  # Or index.build(store.snapshot())
+
+        page = index.search(status='RUNNING', labels=['env=prod'], limit=50)
+        more = index.search(status='RUNNING', labels=['env=prod'], cursor=page['next_cursor'])
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._docs: Dict[Ident, Dict[str, Any]] = {}
+        self._names: List[Tuple[str, str, str]] = []
+        self._by_type: Dict[str, Set[Ident]] = {}
+        self._by_status: Dict[str, Set[Ident]] = {}
+        self._by_location: Dict[str, Set[Ident]] = {}
+        self._by_label: Dict[str, Set[Ident]] = {}
+        self._orders: Dict[str, List[Tuple[str, str, str]]] = {}
+
+    def _postings(self, doc: Dict[str, Any]) -> Iterable[Tuple[Dict[str, Set[Ident]], str]]:
+        yield self._by_type, doc['type']
+        yield self._by_status, doc['status'].lower()
+        yield self._by_location, doc['location'].lower()
+        for key, value in doc['labels'].items():
+            # Labels are matched by key ('env') or key=value ('env=prod')
+            yield self._by_label, str(key).lower()
+            yield self._by_label, f'{key}={value}'.lower()
+
+    def _add(self, resource_type: str, key: str, item: Dict[str, Any], keep_sorted: bool = True) -> None:
+        ident = (resource_type, key)
+        if ident in self._docs:
+            self._remove(ident)
+
+        doc = {'type': resource_type, 'key': key, **index_fields(resource_type, item), 'resource': item}
+        self._docs[ident] = doc
+        self._orders.clear()
+        entry = (doc['name'].lower(), resource_type, key)
+        if keep_sorted:
+            bisect.insort(self._names, entry)
+        else:
+            # Bulk loads append and sort once at the end
+            self._names.append(entry)
+        for postings, value in self._postings(doc):
+            postings.setdefault(value, set()).add(ident)
+
+    def _remove(self, ident: Ident) -> None:
+        doc = self._docs.pop(ident, None)
+        if doc is None:
+            return
+        self._orders.clear()
+        entry = (doc['name'].lower(), ident[0], ident[1])
+        position = bisect.bisect_left(self._names, entry)
+        if position < len(self._names) and self._names[position] == entry:
+            del self._names[position]
+        for postings, value in self._postings(doc):
+            members = postings.get(value)
+            if members is not None:
+                members.discard(ident)
+                if not members:
+                    del postings[value]
+
+    def build(self, snapshot: Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]]) -> None:
+        """
+        Replace the index contents with a snapshot.
+
+        Args:
+            snapshot: {resource_type: {key: item}} (InventoryStore.snapshot())
+                      or {resource_type: [items]} (list_all_resources())
+        """
+        with self._lock:
+            self._clear()
+            for resource_type, items in snapshot.items():
+                if isinstance(items, dict):
+                    pairs = items
+                else:
+                    # Duplicate keys (last one wins) would leave stale entries in the name list
+                    pairs = {resource_key(resource_type, item): item for item in items}
+                for key, item in pairs.items():
+                    self._add(resource_type, key, item, keep_sorted=False)
+            self._names.sort()
+
+    def apply(self, deltas: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Apply InventoryStore.sync() deltas.
+
+        Args:
+            deltas: {resource_type: {'added': {key: item}, 'changed': {key: item},
+                    'removed': [keys]}}
+        """
+        with self._lock:
+            # Remove everything that goes away or gets replaced (including
+            # re-added keys) while the name list is still sorted, then
+            # bulk-add and sort once
+            upserts = []
+            for resource_type, delta in deltas.items():
+                replaced = {**delta.get('added', {}), **delta.get('changed', {})}
+                for key in [*delta.get('removed', []), *replaced]:
+                    self._remove((resource_type, key))
+                upserts.extend((resource_type, key, item) for key, item in replaced.items())
+
+            for resource_type, key, item in upserts:
+                self._add(resource_type, key, item, keep_sorted=len(upserts) < 64)
+            if len(upserts) >= 64:
+                self._names.sort()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get resource counts per type, status and location (for filter facets).
+
+        Returns:
+            Dictionary with 'type', 'status' and 'location' count dicts
+        """
+        with self._lock:
+            return {
+                'type': {value: len(members) for value, members in self._by_type.items()},
+                'status': {value: len(members) for value, members in self._by_status.items() if value},
+                'location': {value: len(members) for value, members in self._by_location.items() if value},
+            }
+
+    def _candidates(
+        self,
+        types: Optional[List[str]],
+        name_prefix: Optional[str],
+        statuses: Optional[List[str]],
+        locations: Optional[List[str]],
+        labels: Optional[List[str]]
+    ) -> Optional[Set[Ident]]:
+        """Intersect the filter sets (None means no filter at all)."""
+        def union(postings: Dict[str, Set[Ident]], values: List[str], lower: bool = True) -> Set[Ident]:
+            result: Set[Ident] = set()
+            for value in values:
+                result |= postings.get(value.lower() if lower else value, set())
+            return result
+
+        sets: List[Set[Ident]] = []
+        if types:
+            sets.append(union(self._by_type, types, lower=False))
+        if statuses:
+            sets.append(union(self._by_status, statuses))
+        if locations:
+            sets.append(union(self._by_location, locations))
+        for label in labels or []:
+            sets.append(self._by_label.get(label.lower(), set()))
+        if name_prefix:
+            start, end = self._prefix_range(name_prefix)
+            sets.append({(t, k) for _, t, k in self._names[start:end]})
+
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            if not result:
+                break
+            result &= other
+        return result
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._names, (prefix,))
+        end = bisect.bisect_left(self._names, (prefix + '\uffff',))
+        return start, end
+
+    def _sort_key(self, ident: Ident, field: str) -> Tuple[str, str, str]:
+        doc = self._docs[ident]
+        return (str(doc[field]).lower(), ident[0], ident[1])
+
+    def _order(self, field: str) -> List[Tuple[str, str, str]]:
+        """All sort keys for a field in ascending order (cached until the next change)."""
+        if field == 'name':
+            return self._names
+        order = self._orders.get(field)
+        if order is None:
+            order = self._orders[field] = sorted(self._sort_key(ident, field) for ident in self._docs)
+        return order
+
+    def search(
+        self,
+        types: Optional[List[str]] = None,
+        name_prefix: Optional[str] = None,
+        status: Optional[Union[str, List[str]]] = None,
+        location: Optional[Union[str, List[str]]] = None,
+        labels: Optional[List[str]] = None,
+        sort: str = 'name',
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_resource: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Query the index.
+
+        Values within one filter are OR'ed; different filters (and each
+        label) are AND'ed. Matching is case-insensitive except for types.
+
+        Args:
+            types: Resource type keys (e.g., ['compute_instances'])
+            name_prefix: Resource name prefix
+            status: Status value(s) (e.g., 'RUNNING', 'READY')
+            location: Zone/region/location value(s) (e.g., 'us-central1-a')
+            labels: 'key' (label present) or 'key=value' filters
+            sort: One of SORT_FIELDS, '-' prefix for descending
+            limit: Page size
+            cursor: next_cursor from the previous page
+            include_resource: Include the indexed resource document per result
+
+        Returns:
+            Dictionary with 'items' (indexed fields per match), 'total'
+            (matches across all pages) and 'next_cursor' (None on the last page)
+
+        Raises:
+            ValueError: Unknown sort field or malformed cursor
+
+        Example:
+            page = index.search(types=['compute_instances'], name_prefix='web-', sort='-status')
+            print(page['total'], [r['name'] for r in page['items']])
+        """
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in SORT_FIELDS:
+            raise ValueError(f'Invalid sort field: {field} (expected one of {", ".join(SORT_FIELDS)})')
+        limit = max(1, limit)
+        after = decode_cursor(cursor) if cursor else None
+
+        if isinstance(status, str):
+            status = [status]
+        if isinstance(location, str):
+            location = [location]
+
+        with self._lock:
+            candidates = self._candidates(types, name_prefix, status, location, labels)
+            total = len(self._docs) if candidates is None else len(candidates)
+
+            order = self._order(field)
+            if name_prefix and field == 'name':
+                lo, hi = self._prefix_range(name_prefix)
+            else:
+                lo, hi = 0, len(order)
+
+            page: List[Tuple[str, str, str]] = []
+            if candidates is None or len(candidates) * 8 >= hi - lo:
+                # Broad match: walk the presorted order and stop after one page
+                if descending:
+                    if after is not None:
+                        hi = min(hi, bisect.bisect_left(order, after))
+                    positions = range(hi - 1, lo - 1, -1)
+                else:
+                    if after is not None:
+                        lo = max(lo, bisect.bisect_right(order, after))
+                    positions = range(lo, hi)
+                for position in positions:
+                    entry = order[position]
+                    if candidates is None or (entry[1], entry[2]) in candidates:
+                        page.append(entry)
+                        if len(page) > limit:
+                            break
+            else:
+                # Narrow match: sorting the few matches is cheaper
+                ordered = sorted((self._sort_key(ident, field) for ident in candidates), reverse=descending)
+                if after is not None:
+                    ordered = [e for e in ordered if (e < after if descending else e > after)]
+                page = ordered[:limit + 1]
+
+            has_more = len(page) > limit
+            page = page[:limit]
+            items = []
+            for _, resource_type, key in page:
+                doc = self._docs[(resource_type, key)]
+                items.append(dict(doc) if include_resource else {k: v for k, v in doc.items() if k != 'resource'})
+
+        return {
+            'items': items,
+            'total': total,
+            'next_cursor': encode_cursor(page[-1]) if has_more and page else None,
+        }
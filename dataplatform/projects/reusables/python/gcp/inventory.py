@@ -0,0 +1,423 @@
+"""
+Inventory snapshots and diffs for Noah Sjursen Cloud.
+Keeps the last snapshot per resource type and reports added/removed/changed
+deltas between refreshes. Refreshes are incremental where Cloud Asset
+Inventory is available: only types with assets updated (or deleted) since
+they were last listed are re-listed. Otherwise each type is listed in full
+and diffed by change marker or content hash.
+"""
+
+import os
+import json
+import time
+import hashlib
+import secrets
+import threading
+from typing import Optional, Dict, Any, List, Callable
+
+from .providers import collect_resources, get_providers, AssetChangeDetector, INCREMENTAL_SYNC
+
+
+# Fields that change whenever the resource changes, checked before hashing
+CHANGE_MARKERS: Dict[str, List[str]] = {
+    'cloud_run_services': ['metadata.resourceVersion'],
+    'storage_buckets': ['update_time', 'updated'],
+    'sql_instances': ['etag'],
+    'cloud_functions': ['updateTime'],
+}
+
+
+def _get_path(item: Dict[str, Any], path: str) -> Any:
+    """Read a dotted path (e.g. 'metadata.name') from a nested dictionary."""
+    value: Any = item
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def resource_key(resource_type: str, item: Dict[str, Any]) -> str:
+    """
+    Build a stable identity key for a resource.
+
+    Args:
+        resource_type: Resource type key (e.g., 'compute_instances')
+        item: Resource dictionary (full or projected)
+
+    Returns:
+        Key unique within the resource type (e.g., 'us-central1-a/web-1')
+
+    Example:
+        key = resource_key('cloud_run_services', service)
+        # 'europe-north1/api'
+    """
+    name = item.get('name') or _get_path(item, 'metadata.name') or item.get('id')
+
+    if resource_type == 'compute_instances':
+        location = (item.get('zone') or '').split('/')[-1]
+    elif resource_type == 'cloud_run_services':
+        location = item.get('region') or ''
+    elif resource_type == 'gke_clusters':
+        location = item.get('location') or ''
+    else:
+        location = ''
+
+    parts = [item.get('project_id') or '', location, str(name) if name else '']
+    if not parts[2]:
+        # No identity field at all: fall back to the content itself
+        parts[2] = resource_fingerprint(resource_type, item, use_markers=False)
+    return '/'.join(p for p in parts if p)
+
+
+def resource_fingerprint(resource_type: str, item: Dict[str, Any], use_markers: bool = True) -> str:
+    """
+    Fingerprint a resource so changes can be detected without storing it.
+
+    Uses a change marker (resourceVersion, update time) when the resource
+    has one, otherwise a SHA-1 hash of the canonical JSON document.
+
+    Args:
+        resource_type: Resource type key
+        item: Resource dictionary
+        use_markers: Prefer change markers over hashing
+
+    Returns:
+        Fingerprint string
+
+    Example:
+        if resource_fingerprint('storage_buckets', old) != resource_fingerprint('storage_buckets', new):
+            print('Bucket changed')
+    """
+    if use_markers:
+        for path in CHANGE_MARKERS.get(resource_type, []):
+            marker = _get_path(item, path)
+            if marker:
+                return f'v:{marker}'
+
+    canonical = json.dumps(item, sort_keys=True, separators=(',', ':'), default=str)
+    return 'h:' + hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def diff_resources(
+    resource_type: str,
+    previous: Dict[str, str],
+    items: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Diff a fresh resource list against previous fingerprints.
+
+    Args:
+        resource_type: Resource type key
+        previous: Mapping of resource key -> fingerprint from the last sync
+        items: Freshly listed resources
+
+    Returns:
+        Dictionary with 'added' and 'changed' ({key: item}), 'removed'
+        ([keys]) and 'fingerprints' (the new key -> fingerprint mapping)
+
+    Example:
+        delta = diff_resources('storage_buckets', {}, buckets)
+        print(f"{len(delta['added'])} new buckets")
+    """
+    added: Dict[str, Any] = {}
+    changed: Dict[str, Any] = {}
+    fingerprints: Dict[str, str] = {}
+
+    for item in items:
+        key = resource_key(resource_type, item)
+        fingerprint = resource_fingerprint(resource_type, item)
+        fingerprints[key] = fingerprint
+
+        if key not in previous:
+            added[key] = item
+        elif previous[key] != fingerprint:
+            changed[key] = item
+
+    removed = [key for key in previous if key not in fingerprints]
+
+    return {
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+        'fingerprints': fingerprints,
+    }
+
+
+class MemorySnapshotBackend:
+    """
+    In-process snapshot storage (default).
+
+    Usage:
+        store = InventoryStore(backend=MemorySnapshotBackend())
+    """
+
+    def __init__(self):
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._fingerprints: Dict[str, Dict[str, str]] = {}
+        self._version = 0
+        self._epoch = secrets.token_hex(4)
+
+    def resource_types(self) -> List[str]:
+        return list(self._items)
+
+    def load_fingerprints(self, resource_type: str) -> Dict[str, str]:
+        return dict(self._fingerprints.get(resource_type, {}))
+
+    def load_items(self, resource_type: str) -> Dict[str, Any]:
+        return dict(self._items.get(resource_type, {}))
+
+    def apply(self, resource_type: str, delta: Dict[str, Any]) -> None:
+        items = self._items.setdefault(resource_type, {})
+        items.update(delta['added'])
+        items.update(delta['changed'])
+        for key in delta['removed']:
+            items.pop(key, None)
+        self._fingerprints[resource_type] = delta['fingerprints']
+
+    def get_version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        self._version += 1
+        return self._version
+
+    def get_epoch(self) -> str:
+        # Versions count from 0 in every process
+        return self._epoch
+
+
+class RedisSnapshotBackend:
+    """
+    Snapshot storage in the shared Redis, so every instance sees the same
+    last snapshot. Each resource type is stored as two hashes (items and
+    fingerprints); a sync only writes the keys that changed.
+
+    Usage:
+        store = InventoryStore(backend=RedisSnapshotBackend('my-project'))
+    """
+
+    def __init__(self, namespace: str):
+        """
+        Args:
+            namespace: Key namespace, usually the project ID
+        """
+        from ..redis import get_redis_client, make_key
+
+        self._redis = get_redis_client()
+        self._make_key = lambda *parts: make_key('gcp', 'inventory', namespace, *parts)
+
+    def resource_types(self) -> List[str]:
+        return list(self._redis.smembers(self._make_key('types')))
+
+    def load_fingerprints(self, resource_type: str) -> Dict[str, str]:
+        return self._redis.hgetall(self._make_key(resource_type, 'fingerprints'))
+
+    def load_items(self, resource_type: str) -> Dict[str, Any]:
+        data = self._redis.hgetall(self._make_key(resource_type, 'items'))
+        return {key: json.loads(value) for key, value in data.items()}
+
+    def apply(self, resource_type: str, delta: Dict[str, Any]) -> None:
+        items_key = self._make_key(resource_type, 'items')
+        fingerprints_key = self._make_key(resource_type, 'fingerprints')
+
+        pipe = self._redis.pipeline()
+        pipe.sadd(self._make_key('types'), resource_type)
+        upserts = {**delta['added'], **delta['changed']}
+        if upserts:
+            pipe.hset(items_key, mapping={k: json.dumps(v) for k, v in upserts.items()})
+            pipe.hset(fingerprints_key, mapping={k: delta['fingerprints'][k] for k in upserts})
+        if delta['removed']:
+            pipe.hdel(items_key, *delta['removed'])
+            pipe.hdel(fingerprints_key, *delta['removed'])
+        pipe.execute()
+
+    def get_version(self) -> int:
+        return int(self._redis.get(self._make_key('version')) or 0)
+
+    def bump_version(self) -> int:
+        return self._redis.incr(self._make_key('version'))
+
+    def get_epoch(self) -> str:
+        # Shared by every instance; a new one starts if Redis loses the keys
+        # (and with them the version counter)
+        key = self._make_key('epoch')
+        self._redis.set(key, secrets.token_hex(4), nx=True)
+        return self._redis.get(key)
+
+
+class InventoryStore:
+    """
+    Last-known inventory snapshot with change detection.
+
+    Each sync first asks Cloud Asset Inventory which resource types changed
+    since they were last listed (see AssetChangeDetector) and lists only
+    those; the first sync, periodic full syncs, and syncs where the asset
+    search fails list every type. Listed types are fingerprinted (change
+    markers where the resource has one, content hashes otherwise) and
+    diffed against the stored fingerprints, so only added/changed/removed
+    resources are written and reported. Types are always listed in full
+    with a custom lister, or resources passed to sync().
+
+    A type whose listing failed (reported in errors) or that wasn't listed
+    at all keeps its previous snapshot: it is never diffed, so a failure
+    can't show up as every resource being removed.
+
+    Usage:
+        from reusables.python.gcp import InventoryStore
+
+        store = InventoryStore('my-project')
+        deltas = store.sync()
+        for resource_type, delta in deltas.items():
+            print(resource_type, len(delta['added']), len(delta['changed']), len(delta['removed']))
+    """
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        backend: Optional[Any] = None,
+        lister: Optional[Callable[[], Dict[str, List[Dict[str, Any]]]]] = None,
+        projection: Optional[Any] = 'summary',
+        incremental: bool = INCREMENTAL_SYNC
+    ):
+        """
+        Args:
+            project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+            backend: Snapshot backend (default: Redis if INVENTORY_BACKEND=redis,
+                     otherwise in-memory)
+            lister: Function returning {resource_type: [items]}, leaving
+                    out types it failed to list (default: every registered
+                    provider for the project, with their errors passed to
+                    sync())
+            projection: Projection used when there is no lister
+            incremental: Skip unchanged types when there is no lister
+                         (GCP_INCREMENTAL_SYNC, default on)
+        """
+        self.project_id = project_id or os.getenv('GCP_PROJECT_ID')
+
+        if backend is None:
+            if os.getenv('INVENTORY_BACKEND', 'memory').lower() == 'redis':
+                backend = RedisSnapshotBackend(self.project_id)
+            else:
+                backend = MemorySnapshotBackend()
+        self.backend = backend
+
+        self.lister = lister
+        self.projection = projection
+        self.detector = AssetChangeDetector(self.project_id) if incremental and lister is None else None
+        # Resource types listed by the last sync (None if resources were passed in)
+        self.last_listed: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Snapshot version, incremented on every sync that found changes."""
+        return self.backend.get_version()
+
+    @property
+    def epoch(self) -> str:
+        """
+        Identifies the version sequence: versions are only comparable within
+        an epoch (an in-memory snapshot starts a new one in every process).
+        """
+        return self.backend.get_epoch()
+
+    def sync(
+        self,
+        resources: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Refresh the snapshot and return what changed.
+
+        Only types present in `resources` and not in `errors` are diffed;
+        every other type keeps its previous snapshot.
+
+        Args:
+            resources: Freshly listed resources (default: call the lister,
+                       or collect the registered providers that changed)
+            errors: Types whose listing failed ({resource_type: message},
+                    e.g. collect_resources()['errors'])
+
+        Returns:
+            Dictionary of resource_type -> {'added': {key: item},
+            'changed': {key: item}, 'removed': [keys]}; types without
+            changes are omitted
+
+        Example:
+            deltas = store.sync()
+            if not deltas:
+                print('Nothing changed')
+        """
+        errors = dict(errors or {})
+        self.last_listed = None
+        if resources is None:
+            if self.lister is not None:
+                resources = self.lister()
+                self.last_listed = list(resources)
+            else:
+                keys = [provider.key for provider in get_providers()]
+                if self.detector:
+                    keys = self.detector.changed(keys)
+                started = time.time()
+                result = collect_resources(self.project_id, providers=keys, projection=self.projection)
+                resources = result['resources']
+                errors.update(result['errors'])
+                self.last_listed = keys
+                if self.detector:
+                    for resource_type, items in resources.items():
+                        self.detector.record(resource_type, started, len(items))
+
+        with self._lock:
+            known_types = set(self.backend.resource_types())
+            deltas = {}
+            for resource_type, items in resources.items():
+                if resource_type in errors:
+                    # A failed listing says nothing about what exists
+                    continue
+                previous = self.backend.load_fingerprints(resource_type)
+                delta = diff_resources(resource_type, previous, items)
+
+                if delta['added'] or delta['changed'] or delta['removed']:
+                    self.backend.apply(resource_type, delta)
+                    deltas[resource_type] = {
+                        'added': delta['added'],
+                        'changed': delta['changed'],
+                        'removed': delta['removed'],
+                    }
+                elif resource_type not in known_types:
+                    # Record empty types so they appear in the snapshot
+                    self.backend.apply(resource_type, delta)
+
+            if deltas:
+                self.backend.bump_version()
+
+            return deltas
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the stored snapshot.
+
+        Returns:
+            Dictionary of resource_type -> {key: item}
+
+        Example:
+            for key, instance in store.snapshot()['compute_instances'].items():
+                print(key, instance['status'])
+        """
+        return {
+            resource_type: self.backend.load_items(resource_type)
+            for resource_type in sorted(self.backend.resource_types())
+        }
+
+    def items(self, resource_type: str) -> List[Dict[str, Any]]:
+        """
+        Get the stored resources of one type as a list.
+
+        Args:
+            resource_type: Resource type key
+
+        Returns:
+            List of resource dictionaries
+        """
+        return list(self.backend.load_items(resource_type).values())
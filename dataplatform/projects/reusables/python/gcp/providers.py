@@ -0,0 +1,609 @@
+"""
+Resource provider registry for Noah Sjursen Cloud.
+Each resource type registers a lister, a summary projection and a refresh
+interval; collection runs every provider concurrently with per-provider
+timeouts. Providers that name their Cloud Asset Inventory types can be
+skipped when nothing of theirs changed (see AssetChangeDetector).
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from .cache import get_command_cache
+from .governor import gcloud_deadline, with_deadline
+from .client import (
+    SUMMARY_PROJECTIONS,
+    resolve_projection,
+    list_compute_instances,
+    list_cloud_run_services,
+    list_storage_buckets,
+    list_sql_instances,
+    list_gke_clusters,
+    list_pubsub_topics,
+    list_cloud_functions,
+    list_asset_update_times,
+)
+
+
+# Skip providers whose Cloud Asset Inventory types haven't changed since
+# they were last listed ('false' lists every due provider in full)
+INCREMENTAL_SYNC = os.getenv('GCP_INCREMENTAL_SYNC', 'true').lower() not in ('0', 'false', 'off')
+
+# Seconds after which a type is listed in full even without asset changes
+FULL_SYNC_INTERVAL = float(os.getenv('GCP_FULL_SYNC_INTERVAL', '3600'))
+
+# Seconds to wait before searching assets again after the search failed
+ASSET_RETRY_AFTER = float(os.getenv('GCP_ASSET_RETRY_AFTER', '600'))
+
+# Allowed clock difference between this machine and GCP update times
+ASSET_CLOCK_SKEW = float(os.getenv('GCP_ASSET_CLOCK_SKEW', '60'))
+
+# Asset API service -> gcloud command group, where they differ
+_ASSET_COMMAND_GROUPS = {'sqladmin': 'sql', 'cloudfunctions': 'functions'}
+
+
+class ResourceProvider:
+    """
+    A registered resource type.
+
+    Attributes:
+        key: Resource type key (e.g., 'compute_instances')
+        lister: Function(project_id, projection=None) returning a list of
+                dictionaries; raises when the listing fails
+        summary_projection: Projection keys used for projection='summary'
+        refresh_interval: Seconds between scheduled refreshes
+        timeout: Seconds to wait for the lister during collection
+        label: Human-readable name
+        asset_types: Cloud Asset Inventory types the lister returns (None:
+                     always listed in full)
+    """
+
+    def __init__(
+        self,
+        key: str,
+        lister: Callable[..., List[Dict[str, Any]]],
+        summary_projection: Optional[List[str]] = None,
+        refresh_interval: float = 60,
+        timeout: float = 60,
+        label: Optional[str] = None,
+        asset_types: Optional[List[str]] = None
+    ):
+        self.key = key
+        self.lister = lister
+        self.summary_projection = summary_projection
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.label = label or key.replace('_', ' ').title()
+        self.asset_types = list(asset_types) if asset_types else None
+
+    def __repr__(self) -> str:
+        return f"ResourceProvider({self.key!r}, refresh_interval={self.refresh_interval})"
+
+
+# What list_all_resources() lists by default (its result before providers
+# were pluggable); pass resource_types='all' for every registered provider
+DEFAULT_RESOURCE_TYPES = ['compute_instances', 'cloud_run_services', 'storage_buckets']
+
+_providers: Dict[str, ResourceProvider] = {}
+_providers_lock = threading.Lock()
+
+# Shared pool for provider collection; listers run under a gcloud deadline
+# at their timeout, so one that times out frees its worker (its gcloud
+# process is killed and not retried) instead of holding it
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('GCP_PROVIDER_WORKERS', '16')),
+            thread_name_prefix='gcp-provider'
+        )
+    return _executor
+
+
+def register_provider(
+    key: str,
+    lister: Callable[..., List[Dict[str, Any]]],
+    summary_projection: Optional[List[str]] = None,
+    refresh_interval: float = 60,
+    timeout: float = 60,
+    label: Optional[str] = None,
+    asset_types: Optional[List[str]] = None
+) -> ResourceProvider:
+    """
+    Register (or replace) a resource provider.
+
+    The lister must raise when gcloud fails: an empty list means the
+    project has no resources of this type, and inventory syncs treat
+    everything it had as removed.
+
+    Args:
+        key: Resource type key, used as the key in collected results
+        lister: Function(project_id, projection=None) returning a list of
+                dictionaries; raises when the listing fails
+        summary_projection: Projection keys for projection='summary'
+        refresh_interval: Seconds between scheduled refreshes
+        timeout: Seconds to wait for the lister during collection
+        label: Human-readable name (default: derived from key)
+        asset_types: Cloud Asset Inventory types the lister returns, so
+                     incremental syncs can skip it when none changed; the
+                     lister must return one item per asset
+
+    Returns:
+        The registered ResourceProvider
+
+    Example:
+        def list_disks(project_id, projection=None):
+            result = execute_gcloud_command(f'compute disks list --project={project_id}')
+            if not result['success']:
+                raise RuntimeError(result['error'])
+            return result['data']
+
+        register_provider(
+            'compute_disks',
+            list_disks,
+            summary_projection=['name', 'sizeGb', 'zone.basename()'],
+            refresh_interval=300,
+            asset_types=['compute.googleapis.com/Disk']
+        )
+    """
+    provider = ResourceProvider(key, lister, summary_projection, refresh_interval, timeout, label, asset_types)
+    with _providers_lock:
+        _providers[key] = provider
+        if summary_projection:
+            SUMMARY_PROJECTIONS[key] = list(summary_projection)
+    return provider
+
+
+def unregister_provider(key: str) -> bool:
+    """
+    Remove a resource provider.
+
+    Args:
+        key: Resource type key
+
+    Returns:
+        True if a provider was removed
+    """
+    with _providers_lock:
+        return _providers.pop(key, None) is not None
+
+
+def get_provider(key: str) -> Optional[ResourceProvider]:
+    """
+    Get a registered provider by key.
+
+    Args:
+        key: Resource type key
+
+    Returns:
+        ResourceProvider or None
+    """
+    return _providers.get(key)
+
+
+def get_providers(keys: Optional[List[str]] = None) -> List[ResourceProvider]:
+    """
+    Get registered providers in registration order.
+
+    Args:
+        keys: Only these resource types (default: all)
+
+    Returns:
+        List of ResourceProvider
+    """
+    with _providers_lock:
+        providers = list(_providers.values())
+    if keys is not None:
+        providers = [p for p in providers if p.key in keys]
+    return providers
+
+
+def collect_resources(
+    project_id: Optional[str] = None,
+    providers: Optional[List[str]] = None,
+    projection: Optional[Any] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run resource providers concurrently.
+
+    Every provider is submitted at once to a shared pool, so total latency
+    is that of the slowest provider rather than the sum. A provider's
+    timeout counts from when a worker picks it up, not from submission, so
+    time spent queued behind other collections doesn't count against it.
+    A provider that exceeds its timeout or raises (the built-in listers
+    raise when gcloud fails) is reported in 'errors' and left out of
+    'resources'; its gcloud commands run under a gcloud_deadline() at the
+    timeout, so they are killed then rather than left running.
+
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        providers: Resource type keys to collect (default: all registered)
+        projection: None for full documents or 'summary'
+        timeout: Override every provider's timeout (seconds)
+
+    Returns:
+        Dictionary with 'resources' ({key: [items]}), 'errors' ({key: message})
+        and 'durations' ({key: seconds since its worker started})
+
+    Raises:
+        ValueError: If the projection has invalid keys
+
+    Example:
+        result = collect_resources(projection='summary')
+        for key, error in result['errors'].items():
+            print(f"{key} failed: {error}")
+    """
+    if not project_id:
+        project_id = os.getenv('GCP_PROJECT_ID')
+
+    # Reject a bad projection up front rather than once per provider
+    resolve_projection('', projection)
+
+    selected = get_providers(providers)
+    executor = _get_executor()
+    # key -> time.monotonic() when a worker started the provider
+    started: Dict[str, float] = {}
+
+    def run(provider: ResourceProvider) -> List[Dict[str, Any]]:
+        started[provider.key] = time.monotonic()
+        with gcloud_deadline(timeout if timeout is not None else provider.timeout):
+            return provider.lister(project_id, projection=projection)
+
+    futures = {provider.key: (provider, executor.submit(with_deadline(run), provider)) for provider in selected}
+
+    resources: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, str] = {}
+    durations: Dict[str, float] = {}
+
+    for key, (provider, future) in futures.items():
+        limit = timeout if timeout is not None else provider.timeout
+        while True:
+            began = started.get(key)
+            # Still queued: wait a full timeout, then look again
+            remaining = limit if began is None else max(0.0, began + limit - time.monotonic())
+            try:
+                resources[key] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                if began is None:
+                    continue
+                errors[key] = f'Timed out after {limit} seconds'
+            except Exception as e:
+                errors[key] = str(e)
+            break
+        durations[key] = round(time.monotonic() - started.get(key, time.monotonic()), 3)
+
+    for key, error in errors.items():
+        print(f"❌ Provider {key} failed: {error}")
+
+    return {'resources': resources, 'errors': errors, 'durations': durations}
+
+
+def list_all_resources(
+    project_id: Optional[str] = None,
+    projection: Optional[Any] = None,
+    resource_types: Optional[Any] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    List the major resource types in a GCP project.
+
+    Args:
+        project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        projection: None for full documents or 'summary' for SUMMARY_PROJECTIONS
+        resource_types: Provider keys to list, or 'all' for every registered
+                        provider (default: DEFAULT_RESOURCE_TYPES)
+
+    Returns:
+        Dictionary with resource types as keys (failed providers map to [])
+
+    Example:
+        resources = list_all_resources()
+        print(f"Compute instances: {len(resources['compute_instances'])}")
+        print(f"Cloud Run services: {len(resources['cloud_run_services'])}")
+
+        # Only the fields the dashboard shows, for every registered type
+        summary = list_all_resources(projection='summary', resource_types='all')
+    """
+    if resource_types is None:
+        resource_types = DEFAULT_RESOURCE_TYPES
+    keys = None if resource_types == 'all' else list(resource_types)
+    result = collect_resources(project_id, providers=keys, projection=projection)
+    return {provider.key: result['resources'].get(provider.key, []) for provider in get_providers(keys)}
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse an RFC 3339 timestamp ('2024-05-01T12:00:00.123456789Z') to UNIX seconds."""
+    if not value:
+        return None
+    try:
+        head, _, fraction = value.replace('Z', '+00:00').partition('.')
+        if fraction:
+            # Python parses at most microseconds
+            digits = fraction[:len(fraction) - len(fraction.lstrip('0123456789'))]
+            head += '.' + digits[:6].ljust(6, '0') + fraction[len(digits):]
+        return datetime.fromisoformat(head).timestamp()
+    except ValueError:
+        return None
+
+
+class AssetChangeDetector:
+    """
+    Finds resource types that changed since they were last listed.
+
+    One Cloud Asset Inventory search returns the type and update time of
+    every asset, so types without newer updates and with the same number
+    of assets as last listed (no deletions) can be skipped. Types are still
+    listed in full when first seen, every FULL_SYNC_INTERVAL seconds,
+    when their provider has no asset_types, and whenever the search fails
+    (e.g. the Cloud Asset API isn't enabled).
+
+    Usage:
+        detector = AssetChangeDetector('my-project')
+        keys = detector.changed(['compute_instances', 'storage_buckets'])
+        started = time.time()
+        result = collect_resources('my-project', providers=keys)
+        for key, items in result['resources'].items():
+            detector.record(key, started, len(items))
+    """
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        full_sync_interval: float = FULL_SYNC_INTERVAL,
+        clock_skew: float = ASSET_CLOCK_SKEW
+    ):
+        self.project_id = project_id or os.getenv('GCP_PROJECT_ID')
+        self.full_sync_interval = full_sync_interval
+        self.clock_skew = clock_skew
+        # key -> (wall time the listing started, number of items listed)
+        self._listed: Dict[str, Tuple[float, int]] = {}
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+
+    def changed(self, keys: List[str]) -> List[str]:
+        """
+        Narrow resource types down to those that need listing.
+
+        Args:
+            keys: Resource type keys due for a refresh
+
+        Returns:
+            The keys (in order) that may have changed; all of them if the
+            asset search failed
+        """
+        now = time.time()
+        providers = {p.key: p for p in get_providers(keys)}
+        with self._lock:
+            listed = dict(self._listed)
+            available = now >= self._unavailable_until
+
+        needed = {
+            key for key in keys
+            if key not in providers or not providers[key].asset_types or key not in listed
+            or now - listed[key][0] >= self.full_sync_interval
+        }
+        candidates = [key for key in keys if key not in needed]
+        if not candidates or not available:
+            return list(keys)
+
+        asset_types = sorted({t for key in candidates for t in providers[key].asset_types})
+        try:
+            assets = list_asset_update_times(self.project_id, asset_types, raise_on_error=True)
+        except RuntimeError as e:
+            print(f"⚠️ Asset search failed, listing every type in full for {ASSET_RETRY_AFTER:.0f}s: {e}")
+            with self._lock:
+                self._unavailable_until = now + ASSET_RETRY_AFTER
+            return list(keys)
+
+        counts: Dict[str, int] = {}
+        latest: Dict[str, float] = {}
+        undated = set()
+        for asset in assets:
+            asset_type = asset.get('assetType')
+            counts[asset_type] = counts.get(asset_type, 0) + 1
+            updated = _parse_timestamp(asset.get('updateTime'))
+            if updated is None:
+                undated.add(asset_type)
+            else:
+                latest[asset_type] = max(latest.get(asset_type, 0.0), updated)
+
+        cache = get_command_cache()
+        for key in candidates:
+            listed_at, count = listed[key]
+            types = providers[key].asset_types
+            if (
+                sum(counts.get(t, 0) for t in types) != count
+                or any(t in undated for t in types)
+                or max(latest.get(t, 0.0) for t in types) > listed_at - self.clock_skew
+            ):
+                needed.add(key)
+                # A cached listing from before the change would be recorded
+                # as up to date
+                for service in {t.split('.')[0] for t in types}:
+                    cache.invalidate(_ASSET_COMMAND_GROUPS.get(service, service))
+
+        return [key for key in keys if key in needed]
+
+    def record(self, key: str, listed_at: float, count: int) -> None:
+        """
+        Record a successful listing.
+
+        Args:
+            key: Resource type key
+            listed_at: time.time() when the listing started
+            count: Number of items it returned
+        """
+        with self._lock:
+            self._listed[key] = (listed_at, count)
+
+
+class ProviderScheduler:
+    """
+    Collects providers on their own refresh intervals.
+
+    Each collect() call only re-runs providers whose refresh interval has
+    elapsed (all of them, concurrently, when forced) and merges the fresh
+    results with the last known results of the others. With incremental
+    on, due providers whose assets didn't change are skipped (and count as
+    refreshed); forced collects always list everything.
+
+    Usage:
+        scheduler = ProviderScheduler('my-project', projection='summary')
+        snapshot = scheduler.collect()
+        print(snapshot['collected'], snapshot['resources'].keys())
+    """
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        projection: Optional[Any] = 'summary',
+        providers: Optional[List[str]] = None,
+        incremental: bool = INCREMENTAL_SYNC
+    ):
+        self.project_id = project_id or os.getenv('GCP_PROJECT_ID')
+        self.projection = projection
+        self.providers = providers
+        self.detector = AssetChangeDetector(self.project_id) if incremental else None
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+        self._last_run: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def due_providers(self, now: Optional[float] = None) -> List[str]:
+        """
+        Get providers whose refresh interval has elapsed.
+
+        Returns:
+            List of resource type keys
+        """
+        now = time.monotonic() if now is None else now
+        return [
+            p.key for p in get_providers(self.providers)
+            if now - self._last_run.get(p.key, float('-inf')) >= p.refresh_interval
+        ]
+
+    def next_due_in(self) -> float:
+        """
+        Seconds until the next provider is due (0 if one is due now).
+        """
+        now = time.monotonic()
+        waits = [
+            self._last_run.get(p.key, float('-inf')) + p.refresh_interval - now
+            for p in get_providers(self.providers)
+        ]
+        return max(0.0, min(waits)) if waits else 60.0
+
+    def collect(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Collect due providers (or all when forced).
+
+        Args:
+            force: Refresh every provider regardless of its interval
+
+        Returns:
+            Dictionary with 'resources' (merged, all known types), 'errors'
+            and 'durations' of this run, and 'collected' (keys refreshed)
+        """
+        with self._lock:
+            keys = [p.key for p in get_providers(self.providers)] if force else self.due_providers()
+            if keys and self.detector and not force:
+                changed = self.detector.changed(keys)
+                now = time.monotonic()
+                for key in keys:
+                    if key not in changed and key in self._results:
+                        self._last_run[key] = now
+                keys = [key for key in keys if key in changed or key not in self._results]
+            if not keys:
+                return {'resources': dict(self._results), 'errors': {}, 'durations': {}, 'collected': []}
+
+            started = time.time()
+            result = collect_resources(self.project_id, providers=keys, projection=self.projection)
+            now = time.monotonic()
+            for key in keys:
+                # Failed providers are retried on the next collect
+                if key in result['resources']:
+                    self._results[key] = result['resources'][key]
+                    self._last_run[key] = now
+                    if self.detector:
+                        self.detector.record(key, started, len(result['resources'][key]))
+
+            return {
+                'resources': dict(self._results),
+                'errors': result['errors'],
+                'durations': result['durations'],
+                'collected': list(result['resources']),
+            }
+
+
+# ============================================================================
+# BUILT-IN PROVIDERS
+# ============================================================================
+
+# Listers run with raise_on_error=True, so a failed gcloud call lands in
+# collect_resources() 'errors' instead of reading as an empty project
+
+register_provider(
+    'compute_instances',
+    partial(list_compute_instances, raise_on_error=True),
+    SUMMARY_PROJECTIONS['compute_instances'],
+    refresh_interval=30,
+    label='Compute Engine instances',
+    asset_types=['compute.googleapis.com/Instance']
+)
+register_provider(
+    'cloud_run_services',
+    lambda project_id, projection=None: list_cloud_run_services(
+        project_id, region='all', projection=projection, raise_on_error=True
+    ),
+    SUMMARY_PROJECTIONS['cloud_run_services'],
+    refresh_interval=30,
+    label='Cloud Run services',
+    asset_types=['run.googleapis.com/Service']
+)
+register_provider(
+    'storage_buckets',
+    partial(list_storage_buckets, raise_on_error=True),
+    SUMMARY_PROJECTIONS['storage_buckets'],
+    refresh_interval=300,
+    label='Cloud Storage buckets',
+    asset_types=['storage.googleapis.com/Bucket']
+)
+register_provider(
+    'sql_instances',
+    partial(list_sql_instances, raise_on_error=True),
+    SUMMARY_PROJECTIONS['sql_instances'],
+    refresh_interval=120,
+    label='Cloud SQL instances',
+    asset_types=['sqladmin.googleapis.com/Instance']
+)
+register_provider(
+    'gke_clusters',
+    partial(list_gke_clusters, raise_on_error=True),
+    SUMMARY_PROJECTIONS['gke_clusters'],
+    refresh_interval=120,
+    label='GKE clusters',
+    asset_types=['container.googleapis.com/Cluster']
+)
+register_provider(
+    'pubsub_topics',
+    partial(list_pubsub_topics, raise_on_error=True),
+    SUMMARY_PROJECTIONS['pubsub_topics'],
+    refresh_interval=300,
+    label='Pub/Sub topics',
+    asset_types=['pubsub.googleapis.com/Topic']
+)
+register_provider(
+    'cloud_functions',
+    partial(list_cloud_functions, raise_on_error=True),
+    SUMMARY_PROJECTIONS['cloud_functions'],
+    refresh_interval=120,
+    label='Cloud Functions',
+    asset_types=['cloudfunctions.googleapis.com/CloudFunction', 'cloudfunctions.googleapis.com/Function']
+)
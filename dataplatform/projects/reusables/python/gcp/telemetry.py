@@ -0,0 +1,60 @@
+"""
+Telemetry hooks for the GCP utilities in Noah Sjursen Cloud.
+Lets services export gcloud timings and cache counters (e.g. to
+Prometheus) without this package depending on a metrics library.
+"""
+
+from typing import Dict, List, Callable
+
+
+# observer(event, value, labels)
+Observer = Callable[[str, float, Dict[str, str]], None]
+
+# Events emitted by this package:
+#   'gcloud.command'  value=seconds, labels: family, outcome ('success'/'error'/'timeout')
+#   'gcloud.stream'   value=seconds, labels: family, outcome (iter_gcloud_command)
+#   'gcloud.throttle' value=seconds waited for a rate limit token, labels: family
+#   'gcloud.cache'    value=1, labels: result ('hit'/'miss'/'coalesced'/'bypassed')
+EVENTS = ('gcloud.command', 'gcloud.stream', 'gcloud.throttle', 'gcloud.cache')
+
+_observers: List[Observer] = []
+
+
+def add_observer(observer: Observer) -> None:
+    """
+    Register a function called for every telemetry event.
+
+    Observers run inline on the calling thread, so keep them cheap
+    (increment a counter, observe a histogram).
+
+    Example:
+        def log_slow(event, value, labels):
+            if event == 'gcloud.command' and value > 5:
+                print(f"🐢 {labels['family']} took {value:.1f}s")
+
+        add_observer(log_slow)
+    """
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    """Unregister an observer added with add_observer()."""
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def emit(event: str, value: float = 1.0, **labels: str) -> None:
+    """
+    Send an event to all observers (no-op when there are none).
+
+    Args:
+        event: Event name (see EVENTS)
+        value: Seconds for timings, 1 for counts
+        **labels: Event labels
+    """
+    for observer in _observers:
+        try:
+            observer(event, value, labels)
+        except Exception as e:
+            print(f"⚠️ Telemetry observer failed for {event}: {e}")
@@ -6,6 +6,8 @@ from .client import (
     # Core client
     get_redis_client,
     RedisClient,
+    get_async_redis_client,
+    AsyncRedisClient,
     
     # Key helpers
     make_key,
@@ -45,6 +47,8 @@ __all__ = [
     # Core
     'get_redis_client',
     'RedisClient',
+    'get_async_redis_client',
+    'AsyncRedisClient',
     
     # Key helpers
     'make_key',
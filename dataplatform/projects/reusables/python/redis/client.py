@@ -5,10 +5,27 @@ Shared Redis connection and utilities used across all services.
 
 import os
 import redis
-from typing import Optional, Any, List, Dict
+import redis.asyncio
+from typing import Optional, Any, List, Dict, Tuple
 import json
 
 
+def _connection_settings() -> Tuple[str, int]:
+    """Resolve (host, port) from REDIS_HOST / REDIS_PORT / ENVIRONMENT."""
+    # Determine environment
+    environment = os.getenv('ENVIRONMENT', 'local').lower()
+    
+    # Set host based on environment
+    if environment == 'production':
+        default_host = '10.128.0.3'  # Internal VPC IP
+    else:
+        default_host = '34.66.188.104'  # External IP for local development
+    
+    host = os.getenv('REDIS_HOST', default_host)
+    port = int(os.getenv('REDIS_PORT', '6379'))
+    return host, port
+
+
 class RedisClient:
     """
     Shared Redis client with automatic environment-based configuration.
@@ -37,17 +54,7 @@ class RedisClient:
             Configured Redis client
         """
         if cls._instance is None:
-            # Determine environment
-            environment = os.getenv('ENVIRONMENT', 'local').lower()
-            
-            # Set host based on environment
-            if environment == 'production':
-                default_host = '10.128.0.3'  # Internal VPC IP
-            else:
-                default_host = '34.66.188.104'  # External IP for local development
-            
-            host = os.getenv('REDIS_HOST', default_host)
-            port = int(os.getenv('REDIS_PORT', '6379'))
+            host, port = _connection_settings()
             
             cls._instance = redis.Redis(
                 host=host,
@@ -88,6 +95,73 @@ def get_redis_client() -> redis.Redis:
     return RedisClient.get_client()
 
 
+class AsyncRedisClient:
+    """
+    Shared asyncio Redis client (same configuration as RedisClient).
+    
+    Connections are opened lazily on first command, so creating the client
+    never blocks the event loop.
+    
+    Usage:
+        from reusables.python.redis import get_async_redis_client
+        
+        r = get_async_redis_client()
+        await r.set('key', 'value')
+        value = await r.get('key')
+    """
+    
+    _instance: Optional[redis.asyncio.Redis] = None
+    
+    @classmethod
+    def get_client(cls) -> redis.asyncio.Redis:
+        """
+        Get or create the asyncio Redis client singleton.
+        
+        Environment variables:
+            REDIS_HOST, REDIS_PORT, ENVIRONMENT: as for RedisClient
+        
+        Returns:
+            Configured asyncio Redis client
+        """
+        if cls._instance is None:
+            host, port = _connection_settings()
+            
+            cls._instance = redis.asyncio.Redis(
+                host=host,
+                port=port,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            print(f"✅ Async Redis client configured for {host}:{port}")
+        
+        return cls._instance
+    
+    @classmethod
+    async def close(cls):
+        """Close the asyncio client's connections (call on shutdown)."""
+        if cls._instance:
+            await cls._instance.aclose()
+        cls._instance = None
+    
+    @classmethod
+    def reset(cls):
+        """Drop the singleton instance without awaiting (useful for testing)."""
+        cls._instance = None
+
+
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """
+    Get the shared asyncio Redis client.
+    
+    Returns:
+        Configured asyncio Redis client
+    """
+    return AsyncRedisClient.get_client()
+
+
 # ============================================================================
 # KEY NAMING HELPERS
 # ============================================================================